@@ -0,0 +1,248 @@
+import gc
+import json
+import os
+import sys
+import time
+from binascii import crc32
+
+class AppCatalog:
+    """
+    Verzeichnis der Makrodateien mit wahlweise verzögertem Laden.
+
+    Beim Start werden nur Dateinamen und Reihenfolge ermittelt. Mit cache_size = 0 werden
+    sofort alle Apps importiert (bisheriges Verhalten). Mit cache_size > 0 wird eine App erst
+    bei ihrer ersten Aktivierung importiert; sind mehr als cache_size Apps geladen, wird die am
+    längsten nicht aktivierte verworfen, ihr Modul aus sys.modules entfernt und der Speicher
+    eingesammelt. Die Listener (Handler mit load_app und unload_app) legen ihre vorberechneten
+    Tabellen je App an bzw. geben sie frei.
+
+    Liegt ein mit build_macro_bundle.py erzeugtes Bundle vor, werden die Apps daraus gelesen,
+    statt ihre Quelldateien auf dem Gerät zu übersetzen. Das Bundle ist ASCII-Text im Format
+    JSON Lines: Die erste Zeile enthält je Quelldatei Name, Größe, Änderungszeit und CRC32 sowie
+    Lage und Länge ihres Eintrags, jede weitere Zeile das app-Dictionary einer Datei. Beim Start
+    werden nur Größe und Änderungszeit per os.stat verglichen, keine Quelldatei gelesen. Stimmt
+    nur die Größe (z.B. weil das Kopieren die Änderungszeit neu gesetzt hat), wird die CRC32 der
+    Quelldatei erst beim Laden dieser App geprüft. Geänderte, neue oder fehlerhafte Einträge
+    werden wie bisher aus der Quelldatei importiert.
+    """
+    BUNDLE_VERSION = 2
+
+    def __init__(self, folder, app_class, cache_size=0, bundle=None):
+        """
+        Durchsucht das Makroverzeichnis, ohne Dateien zu importieren.
+
+        :param folder: Das Makroverzeichnis.
+        :param app_class: Klasse, die aus dem app-Dictionary eines Moduls und der Anzahl der Apps die App erzeugt.
+        :param cache_size: Höchstzahl geladener Apps, 0 = alle beim Start laden.
+        :param bundle: Pfad des Makro-Bundles, None = nur Quelldateien.
+        """
+        self.folder = folder
+        self.app_class = app_class
+        self.cache_size = cache_size
+        start = time.monotonic()
+        files = [name for name in os.listdir(folder) if name.endswith('.py') and not name.startswith('._')]
+        files.sort()
+        self.modules = [folder + '/' + name[:-3] for name in files]
+        self.apps = [None] * len(self.modules)
+        self.bundle = bundle
+        self.bundle_base = 0
+        self.bundle_entries = [None] * len(self.modules)  # (Lage, Länge, zu prüfende CRC32 oder None)
+        self.bundle_text = None
+        self.bundle_loads = 0
+        if bundle:
+            self._open_bundle(files)
+        self.recent = []  # Indizes geladener Apps, zuletzt aktivierte am Ende
+        self.listeners = []
+        self.loads = 0
+        self.evictions = 0
+        self.failures = 0
+        self.load_time = 0.0
+        self.last_load_time = 0.0
+        self.scan_time = time.monotonic() - start
+
+    def __len__(self):
+        return len(self.apps)
+
+    def add_listener(self, listener):
+        """
+        Meldet einen Handler an, der je App vorberechnete Tabellen führt (load_app, unload_app),
+        und übergibt ihm sofort alle bereits geladenen Apps.
+
+        :param listener: Der Handler.
+        """
+        self.listeners.append(listener)
+        for index in range(len(self.apps)):
+            if self.apps[index] is not None:
+                listener.load_app(index, self.apps[index])
+
+    def load_all(self):
+        """
+        Importiert alle Apps (cache_size = 0). Fehlerhafte Dateien werden aus dem Verzeichnis
+        entfernt, damit die App-Indizes lückenlos bleiben.
+        """
+        if any(self.bundle_entries):
+            # Das ganze Bundle mit einem Lesezugriff
+            with open(self.bundle) as stream:
+                self.bundle_text = stream.read()
+        for index in range(len(self.modules)):
+            self._import(index)
+        self.bundle_text = None
+        keep = [index for index in range(len(self.apps)) if self.apps[index] is not None]
+        self.modules = [self.modules[index] for index in keep]
+        self.apps = [self.apps[index] for index in keep]
+        self.bundle_entries = [self.bundle_entries[index] for index in keep]
+        self.recent = list(range(len(self.apps)))
+
+    def get(self, index):
+        """
+        Liefert die App zum Index, lädt sie bei Bedarf und verdrängt danach ggf. die am
+        längsten nicht aktivierten Apps.
+
+        :param index: Der Index der App.
+        :return: Die App oder None, wenn ihre Datei nicht geladen werden kann.
+        """
+        app = self.apps[index]
+        if app is None:
+            # Erst laden, dann verdrängen: schlägt der Import fehl, bleibt die aktive App geladen
+            app = self._import(index)
+            if app is None:
+                return None
+            for listener in self.listeners:
+                listener.load_app(index, app)
+        if self.cache_size:
+            if index in self.recent:
+                self.recent.remove(index)
+            self.recent.append(index)
+            while len(self.recent) > self.cache_size:
+                self._evict(self.recent[0])
+        return app
+
+    def _open_bundle(self, files):
+        """
+        Liest den Kopf des Bundles und vermerkt die Einträge, deren Quelldatei laut os.stat
+        unverändert ist. Quelldateien werden dabei nicht gelesen.
+
+        :param files: Die Dateinamen im Makroverzeichnis, in App-Reihenfolge.
+        """
+        try:
+            with open(self.bundle) as stream:
+                header = json.loads(stream.readline())
+                self.bundle_base = stream.tell()
+        except (OSError, ValueError):
+            return
+        if header.get('version') != self.BUNDLE_VERSION:
+            return
+        entries = {}
+        for name, size, mtime, checksum, offset, length in header['files']:
+            entries[name] = (size, mtime, checksum, offset, length)
+        for index in range(len(files)):
+            entry = entries.get(files[index])
+            if entry is None:
+                continue
+            size, mtime, checksum, offset, length = entry
+            stat = os.stat(self.folder + '/' + files[index])
+            if stat[6] != size:
+                continue
+            # Gleiche Änderungszeit: frisch; sonst CRC32 beim ersten Laden prüfen (_bundle_fresh)
+            self.bundle_entries[index] = (offset, length, None if stat[8] == mtime else checksum)
+
+    def _bundle_fresh(self, index):
+        """
+        Prüft bei Bedarf die CRC32 der Quelldatei gegen den Bundle-Eintrag; das Ergebnis wird vermerkt.
+
+        :return: True, wenn der Bundle-Eintrag verwendet werden kann.
+        """
+        offset, length, checksum = self.bundle_entries[index]
+        if checksum is None:
+            return True
+        with open(self.modules[index] + '.py', 'rb') as stream:
+            fresh = crc32(stream.read()) == checksum
+        self.bundle_entries[index] = (offset, length, None) if fresh else None
+        return fresh
+
+    def _read_bundle(self, index):
+        """
+        Liefert das app-Dictionary einer App aus dem Bundle.
+
+        :return: Das Dictionary oder None, wenn der Eintrag nicht gelesen werden kann.
+        """
+        offset, length, _ = self.bundle_entries[index]
+        try:
+            if self.bundle_text is not None:
+                start = self.bundle_base + offset
+                text = self.bundle_text[start:start + length]
+            else:
+                with open(self.bundle) as stream:
+                    stream.seek(self.bundle_base + offset)
+                    text = stream.read(length)
+            return json.loads(text)
+        except (OSError, ValueError) as err:
+            print("ERROR in", self.bundle, err)
+            return None
+
+    def _import(self, index):
+        """
+        Erzeugt eine App aus ihrem Bundle-Eintrag oder, falls keiner gültig ist, aus ihrem Modul.
+
+        :return: Die App oder None bei einem Fehler in der Makrodatei.
+        """
+        name = self.modules[index]
+        start = time.monotonic()
+        if self.bundle_entries[index] is not None and self._bundle_fresh(index):
+            appdata = self._read_bundle(index)
+            if appdata is not None:
+                try:
+                    app = self.app_class(appdata, len(self.modules))
+                    self.bundle_loads += 1
+                    return self._loaded(index, app, start)
+                except (KeyError, IndexError, TypeError) as err:
+                    print("ERROR in", self.bundle, name, err)
+        try:
+            module = __import__(name)
+            app = self.app_class(module.app, len(self.modules))
+        except (SyntaxError, ImportError, AttributeError, KeyError, NameError,
+                IndexError, TypeError) as err:
+            print("ERROR in", name)
+            import traceback
+            traceback.print_exception(err, err, err.__traceback__)
+            self.failures += 1
+            return None
+        return self._loaded(index, app, start)
+
+    def _loaded(self, index, app, start):
+        self.apps[index] = app
+        self.loads += 1
+        self.last_load_time = time.monotonic() - start
+        self.load_time += self.last_load_time
+        return app
+
+    def _evict(self, index):
+        """
+        Verwirft eine geladene App samt Modul und den Tabellen der Listener.
+        """
+        self.recent.remove(index)
+        self.apps[index] = None
+        for listener in self.listeners:
+            listener.unload_app(index)
+        sys.modules.pop(self.modules[index], None)
+        self.evictions += 1
+        gc.collect()
+
+    @staticmethod
+    def _mem_free():
+        mem_free = getattr(gc, 'mem_free', None)
+        return mem_free() if mem_free else None
+
+    def stats(self):
+        """
+        Gibt die Ladestatistik zurück.
+
+        :return: Dictionary mit Anzahl Apps, geladenen Apps, Ladevorgängen (davon aus dem Bundle),
+                 Verdrängungen, Fehlern, Dauer des Verzeichnis-Scans, gesamter und letzter
+                 Ladedauer in s und freiem RAM.
+        """
+        return {'apps': len(self.apps), 'resident': len([app for app in self.apps if app is not None]),
+                'loads': self.loads, 'bundle_loads': self.bundle_loads,
+                'evictions': self.evictions, 'failures': self.failures,
+                'scan_time': self.scan_time, 'load_time': self.load_time,
+                'last_load_time': self.last_load_time, 'mem_free': self._mem_free()}
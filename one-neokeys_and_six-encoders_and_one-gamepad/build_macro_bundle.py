@@ -0,0 +1,184 @@
+"""
+Hostseitiges Werkzeug: prüft alle Makrodateien und schreibt das Makro-Bundle.
+
+Aufruf unter CPython im Projektverzeichnis (bzw. auf dem CIRCUITPY-Laufwerk):
+
+    python3 build_macro_bundle.py [Makroverzeichnis] [Bundle-Datei]
+
+Standard sind macros und macros/macros.bundle. Benötigt adafruit_hid auf dem Host
+(pip install adafruit-circuitpython-hid). Jede Makrodatei wird auf dem Host ausgeführt,
+wodurch alle Keycode-Namen zu Zahlen aufgelöst werden; danach wird die Struktur des
+app-Dictionaries geprüft; Namen unter 'controls', die in config.py keinem Drehknopf bzw.
+keiner Seitentaste entsprechen, werden gemeldet. Das Gerät liest das Bundle mit dem eingebauten json-Modul, statt
+die Quelldateien beim Start zu übersetzen (siehe AppCatalog).
+"""
+import json
+import os
+import sys
+from binascii import crc32
+
+BUNDLE_VERSION = 2
+APP_KEYS = ('name', 'macros', 'enter_macro', 'exit_macro')
+MOUSE_KEYS = ('buttons', 'x', 'y', 'wheel')
+SPECIAL_STRINGS = ('wheel up', 'wheel down', 'mouse right', 'mouse left')
+
+
+def _check_keycode():
+    """
+    Prüft, dass adafruit_hid.keycode auf dem Host installiert ist; die Makrodateien importieren
+    daraus Keycode. lib/ enthält die Bibliothek nur als .mpy, die CPython nicht laden kann.
+
+    :return: Fehlermeldung oder None.
+    """
+    try:
+        import adafruit_hid.keycode # noqa: F401
+    except ImportError as err:
+        return ("adafruit_hid.keycode nicht importierbar (%s); auf dem Host mit "
+                "'pip install adafruit-circuitpython-hid' installieren" % err)
+    return None
+
+
+def _check_sequence(filename, position, sequence, errors, warnings):
+    if not isinstance(sequence, (list, tuple)):
+        errors.append("%s: Makro %s: Sequenz ist keine Liste" % (filename, position))
+        return
+    for item in sequence:
+        if isinstance(item, bool) or not isinstance(item, (int, str, dict)):
+            errors.append("%s: Makro %s: ungültiger Eintrag %r" % (filename, position, item))
+        elif isinstance(item, int) and not -0xFF <= item <= 0xFF:
+            errors.append("%s: Makro %s: Keycode %d außerhalb 0-255" % (filename, position, item))
+        elif isinstance(item, dict):
+            for key, value in item.items():
+                if key not in MOUSE_KEYS or not isinstance(value, int):
+                    errors.append("%s: Makro %s: ungültiger Mauseintrag %r" % (filename, position, item))
+                    break
+        elif isinstance(item, str):
+            name = item.lower()
+            if name.startswith('appswitch_'):
+                if not name.split('_')[-1].isdigit():
+                    errors.append("%s: Makro %s: ungültige App-Nummer in %r" % (filename, position, item))
+            elif name not in SPECIAL_STRINGS:
+                warnings.append("%s: Makro %s: Text %r wird auf dem Gerät ignoriert" % (filename, position, item))
+
+
+def _check_entry(filename, position, entry, errors, warnings):
+    if not isinstance(entry, (list, tuple)) or len(entry) != 3:
+        errors.append("%s: Makro %s: erwartet (Farbe, Label, Sequenz)" % (filename, position))
+        return
+    color, label, sequence = entry
+    if color is not None and (not isinstance(color, int) or not 0 <= color <= 0xFFFFFF):
+        errors.append("%s: Makro %s: ungültige Farbe %r" % (filename, position, color))
+    if not isinstance(label, str):
+        errors.append("%s: Makro %s: Label ist kein Text" % (filename, position))
+    _check_sequence(filename, position, sequence, errors, warnings)
+
+
+def _control_names():
+    """
+    Liefert die Namen aller benannten Bedienelemente laut config.py, z.B. 'knob_1L.forward'.
+
+    :return: Menge der Namen oder None, wenn config.py nicht importiert werden kann.
+    """
+    try:
+        from config import Config
+    except ImportError:
+        return None
+    names = set()
+    for entry in Config.SideKnob.sideknob_list:
+        names.update(entry[0] + '.' + slot for slot in ('forward', 'reverse', 'button'))
+    for entry in Config.SideKeys.sidekey_list:
+        names.update('%s.key%d' % (entry[0], key + 1) for key in range(Config.SideKeys.count_keys))
+    return names
+
+
+def load_app(folder, filename, errors, warnings):
+    """
+    Führt eine Makrodatei aus und prüft ihr app-Dictionary.
+
+    :return: Das app-Dictionary oder None bei einem Fehler.
+    """
+    path = os.path.join(folder, filename)
+    namespace = {'__name__': filename[:-3]}
+    try:
+        with open(path, encoding='utf-8') as stream:
+            exec(compile(stream.read(), path, 'exec'), namespace)
+    except Exception as err: # Jeder Fehler der Makrodatei wird gemeldet
+        errors.append("%s: %s: %s" % (filename, type(err).__name__, err))
+        return None
+    app = namespace.get('app')
+    if not isinstance(app, dict):
+        errors.append("%s: kein Dictionary 'app'" % filename)
+        return None
+    for key in APP_KEYS:
+        if key not in app:
+            errors.append("%s: Schlüssel %r fehlt" % (filename, key))
+            return None
+    if not isinstance(app['name'], str):
+        errors.append("%s: 'name' ist kein Text" % filename)
+    for position, entry in enumerate(app['macros']):
+        _check_entry(filename, position, entry, errors, warnings)
+    controls = app.get('controls', {})
+    if not isinstance(controls, dict):
+        errors.append("%s: 'controls' ist kein Dictionary" % filename)
+        controls = {}
+    names = _control_names()
+    for name, entry in controls.items():
+        if names is not None and name not in names:
+            warnings.append("%s: Bedienelement %r ist nicht konfiguriert und wird ignoriert" % (filename, name))
+        _check_entry(filename, name, entry, errors, warnings)
+    _check_sequence(filename, -1, app['enter_macro'], errors, warnings)
+    _check_sequence(filename, -1, app['exit_macro'], errors, warnings)
+    result = {key: app[key] for key in APP_KEYS}
+    if controls:
+        result['controls'] = controls
+    return result
+
+
+def build(folder, bundle):
+    """
+    Prüft alle Makrodateien und schreibt das Bundle.
+
+    :return: Liste der Fehlermeldungen; bei Fehlern wird kein Bundle geschrieben.
+    """
+    error = _check_keycode()
+    if error:
+        return [error]
+    errors, warnings = [], []
+    files = sorted(name for name in os.listdir(folder) if name.endswith('.py') and not name.startswith('._'))
+    header, lines, offset = [], [], 0
+    for filename in files:
+        app = load_app(folder, filename, errors, warnings)
+        if app is None:
+            continue
+        path = os.path.join(folder, filename)
+        with open(path, 'rb') as stream:
+            source = stream.read()
+        # ASCII, damit Zeichen- und Byte-Positionen auf dem Gerät übereinstimmen
+        line = json.dumps(app, ensure_ascii=True, separators=(',', ':'))
+        # Größe und Änderungszeit prüft das Gerät beim Start, die CRC32 nur bei abweichender Zeit
+        header.append([filename, len(source), int(os.stat(path).st_mtime), crc32(source), offset, len(line)])
+        lines.append(line)
+        offset += len(line) + 1
+    for warning in warnings:
+        print("Warnung:", warning)
+    if errors:
+        return errors
+    with open(bundle, 'w', encoding='ascii', newline='\n') as stream:
+        stream.write(json.dumps({'version': BUNDLE_VERSION, 'files': header}, separators=(',', ':')) + '\n')
+        for line in lines:
+            stream.write(line + '\n')
+    print("%d Apps nach %s geschrieben (%d Bytes)" % (len(lines), bundle, os.path.getsize(bundle)))
+    return errors
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else 'macros'
+    bundle = sys.argv[2] if len(sys.argv) > 2 else os.path.join(folder, 'macros.bundle')
+    errors = build(folder, bundle)
+    for error in errors:
+        print("Fehler:", error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import time
+from adafruit_seesaw.seesaw import read_pipelined
+from config import Config
+
+# Prioritätsklassen, kleinere Zahl = früher ausgeführt
+PRIORITY_KEYS = 0
+PRIORITY_ENCODER = 1
+PRIORITY_JOYSTICK = 2
+PRIORITY_LED = 3
+
+class BusScheduler:
+    """
+    Priorisierender Scheduler für die Transaktionen auf dem gemeinsamen I2C-Bus.
+
+    Handler reichen ihre Zugriffe als Jobs ein: Tasten vor Encodern vor Joystick vor
+    LED-Schreibzugriffen. Pro Durchlauf (run_tick) werden Jobs nur so lange ausgeführt,
+    wie das Zeitbudget reicht; der Rest bleibt für den nächsten Durchlauf stehen.
+    Ein Job pro Besitzer und Kennung: ein erneutes Einreichen ersetzt den wartenden Job,
+    sodass z.B. nur die zuletzt gewünschte LED-Farbe geschrieben wird.
+
+    Poll-Jobs liefern nur Generatoren; ihre Buszugriffe laufen erst danach gemeinsam in
+    read_pipelined. Damit auch sie unter das Budget fallen, wird je Prioritätsklasse die
+    gemessene Dauer pro Poll (gleitender Mittelwert) vorab für jeden bereits gestarteten
+    Generator angerechnet. Der erste Job eines Durchlaufs läuft immer.
+
+    Budget und Poll-Dauer werden mit get_millis/ticks_diff in Millisekunden gemessen; ein
+    time.monotonic()-Float verliert auf dem Gerät mit wachsender Laufzeit seine Auflösung.
+    """
+    POLL_COST_WEIGHT = 0.25  # Gewicht einer neuen Messung im gleitenden Mittelwert
+    def __init__(self, budget):
+        """
+        Initialisiert einen leeren Scheduler.
+
+        :param budget: Zeitbudget pro Durchlauf in Sekunden.
+        """
+        self.budget = budget * 1000  # Millisekunden
+        self.queues = [[] for _ in range(PRIORITY_LED + 1)]
+        self.jobs = {}
+        self.pollers = []  # Wiederverwendete Liste der gestarteten Poll-Generatoren
+        self.ticks = 0
+        self.deferred = 0
+        self.last_tick_time = 0.0  # Sekunden, nur Statistik
+        self.poll_costs = [0.0] * (PRIORITY_LED + 1)  # Millisekunden pro Poll-Job je Prioritätsklasse
+
+    def submit(self, priority, owner, tag, func, *args):
+        """
+        Reicht einen Job ein bzw. ersetzt den wartenden Job mit gleichem Besitzer und Kennung.
+
+        Liefert func einen Generator (z.B. eine poll-Methode), werden alle Generatoren
+        einer Prioritätsklasse gemeinsam mit überlappenden Settle-Zeiten abgearbeitet.
+
+        :param priority: Prioritätsklasse (PRIORITY_*).
+        :param owner: Der Handler, dem das angesprochene Gerät gehört.
+        :param tag: Kennung des Jobs innerhalb des Besitzers (z.B. 'poll' oder 'led').
+        :param func: Die auszuführende Funktion.
+        :param args: Argumente für func.
+        """
+        key = (owner, tag)
+        old = self.jobs.get(key)
+        job = (priority, owner, func, args, key)
+        self.jobs[key] = job
+        if old is not None and old[0] == priority:
+            # Wartender Job behält seinen Platz, damit zurückgestellte Geräte nicht verhungern
+            queue = self.queues[priority]
+            queue[queue.index(old)] = job
+            return
+        if old is not None:
+            self.queues[old[0]].remove(old)
+        self.queues[priority].append(job)
+
+    def pending(self):
+        """
+        Gibt die Anzahl der wartenden Jobs zurück.
+        """
+        return len(self.jobs)
+
+    def run_tick(self):
+        """
+        Führt wartende Jobs in Prioritätsreihenfolge aus, bis das Zeitbudget verbraucht ist.
+        Gestartete Poll-Generatoren werden mit ihrer erwarteten Dauer angerechnet, die übrigen
+        Polls der Klasse bleiben für den nächsten Durchlauf stehen.
+        Jobs eines Besitzers, der gerade eine geteilte Leseoperation offen hat (polling),
+        werden übersprungen, damit der Register-Select nicht überschrieben wird.
+        """
+        get_millis = Config.GlobalFunctions.get_millis
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        start_time = time.monotonic()
+        start = get_millis()
+        self.ticks += 1
+        started = False
+        pollers = self.pollers
+        for priority in range(len(self.queues)):
+            queue = self.queues[priority]
+            poll_cost = self.poll_costs[priority]
+            # Nur die zu Beginn wartenden Jobs; während des Durchlaufs eingereichte folgen im nächsten
+            index = 0
+            end = len(queue)
+            while index < end:
+                job = queue[index]
+                if started and ticks_diff(get_millis(), start) + len(pollers) * poll_cost >= self.budget:
+                    break
+                if getattr(job[1], 'polling', False):
+                    index += 1
+                    continue
+                queue.pop(index)
+                end -= 1
+                del self.jobs[job[4]]
+                started = True
+                result = job[2](*job[3])
+                if result is not None:
+                    pollers.append(result)
+            if pollers:
+                batch_start = get_millis()
+                read_pipelined(pollers)
+                self._measure_poll_cost(priority, ticks_diff(get_millis(), batch_start) / len(pollers))
+                pollers.clear()
+            if ticks_diff(get_millis(), start) >= self.budget:
+                break
+        self.deferred += len(self.jobs)
+        self.last_tick_time = time.monotonic() - start_time
+
+    def _measure_poll_cost(self, priority, cost):
+        """
+        Übernimmt die gemessene Dauer pro Poll in den gleitenden Mittelwert der Klasse.
+        """
+        previous = self.poll_costs[priority]
+        self.poll_costs[priority] = cost if not previous else previous + (cost - previous) * self.POLL_COST_WEIGHT
+
+    def update(self):
+        """
+        Alias für run_tick, damit der Scheduler als Task in der Runtime laufen kann.
+        """
+        self.run_tick()
@@ -0,0 +1,83 @@
+import displayio # type: ignore
+import bitmaptools # type: ignore
+
+class CellLabel(displayio.Group):
+    """
+    Einzeiliges Label mit fest vorallokierter Bitmap für eine Zelle des OLED-Displays.
+
+    Wie adafruit_display_text.bitmap_label werden die Glyphen mit bitmaptools.blit in eine
+    einzige Bitmap gezeichnet, statt je Zeichen eine TileGrid-Kachel zu halten. Anders als
+    bitmap_label, das bei jeder Textänderung eine neue, passend große Bitmap anlegt, wird die
+    Bitmap hier nur einmal in Zellengröße erzeugt: Ein neuer Text löscht die Zelle und wird an
+    derselben Stelle neu gezeichnet. Texte, die breiter als die Zelle sind, werden abgeschnitten.
+    """
+    def __init__(self, font, width, color, align=0.0, x=0, y=0, text=''):
+        """
+        Initialisiert ein leeres Label.
+
+        :param font: Die Schriftart (z.B. terminalio.FONT oder eine adafruit_bitmap_font).
+        :param width: Breite der Zelle in Pixeln.
+        :param color: Textfarbe als 0xRRGGBB, der Hintergrund ist transparent.
+        :param align: Horizontale Ausrichtung in der Zelle (0.0 = links, 0.5 = mittig, 1.0 = rechts).
+        :param x: Linke Kante der Zelle auf dem Display.
+        :param y: Obere Kante der Zelle auf dem Display.
+        :param text: Der anfängliche Text.
+        """
+        super().__init__(x=x, y=y)
+        self.font = font
+        self.align = align
+        glyph = font.get_glyph(ord('M'))
+        self.ascent = glyph.height + glyph.dy
+        height = max(font.get_bounding_box()[1], self.ascent)
+        self.bitmap = displayio.Bitmap(width, height, 2)
+        self.palette = displayio.Palette(2)
+        self.palette.make_transparent(0)
+        self.palette[1] = color
+        self.append(displayio.TileGrid(self.bitmap, pixel_shader=self.palette))
+        self._text = ''
+        self.text = text
+
+    @property
+    def color(self):
+        return self.palette[1]
+
+    @color.setter
+    def color(self, color):
+        self.palette[1] = color
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text == self._text:
+            return
+        self._text = text
+        bitmap = self.bitmap
+        bitmap.fill(0)
+        font = self.font
+        # Erst die Breite der darstellbaren Zeichen bestimmen, dann ausgerichtet zeichnen
+        width = 0
+        for char in text:
+            glyph = font.get_glyph(ord(char))
+            if glyph is None:
+                continue
+            if width + glyph.shift_x > bitmap.width:
+                break
+            width += glyph.shift_x
+        x = int((bitmap.width - width) * self.align)
+        end = x + width
+        for char in text:
+            glyph = font.get_glyph(ord(char))
+            if glyph is None:
+                continue
+            if x + glyph.shift_x > end:
+                break
+            # Bei terminalio.FONT liegen alle Glyphen nebeneinander in einer Bitmap (tile_index)
+            source_x = glyph.tile_index * glyph.width
+            bitmaptools.blit(bitmap, glyph.bitmap, max(x + glyph.dx, 0),
+                             max(self.ascent - glyph.height - glyph.dy, 0),
+                             x1=source_x, y1=0, x2=source_x + glyph.width, y2=glyph.height,
+                             skip_source_index=0)
+            x += glyph.shift_x
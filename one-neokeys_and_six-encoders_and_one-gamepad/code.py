@@ -1,7 +1,15 @@
-import os, board # type: ignore
+import board # type: ignore
 import displayio, terminalio # type: ignore
 from adafruit_display_shapes.rect import Rect # type: ignore
 from adafruit_display_text import label
+from adafruit_seesaw.seesaw import read_pipelined
+from adafruit_bus_device.i2c_device import I2CRecorder
+from bus_scheduler import BusScheduler
+from led_manager import LedManager
+from idle_manager import IdleManager
+from display_manager import DisplayManager
+from macro_program import compile_macro, MacroRunner
+from app_catalog import AppCatalog
 from config import Config # Configuration management in a separate file (config.py)
 
 # CLASSES AND FUNCTIONS ----------------
@@ -9,39 +17,64 @@ class App:
     """
     Klasse, die eine hostseitige Anwendung darstellt, für die wir eine Reihe von Makrosequenzen nutzen.
     """
-    def __init__(self, appdata):
+    def __init__(self, appdata, app_count=None):
         """
         Initialisiert eine neue Instanz der App-Klasse.
 
+        Drehknöpfe und Seitentasten können statt über feste Positionen in 'macros' auch im
+        optionalen Dictionary 'controls' mit dem Namen des Bedienelements belegt werden,
+        z.B. 'knob_1L.forward': (COLOR, LABEL, SEQUENCE). Ein benannter Eintrag hat Vorrang
+        vor der Position; nicht belegte Bedienelemente entfallen.
+
         :param appdata: Ein Dictionary, das die Anwendungsdaten enthält.
                         Muss die Schlüssel 'name', 'macros', 'enter_macro' und 'exit_macro' enthalten.
+        :param app_count: Anzahl der Apps, gegen die 'AppSwitch_N' beim Übersetzen geprüft wird.
         """
         self.name = appdata['name']
         self.macros = appdata['macros']
+        self.programs = [compile_macro(macro[2], app_count) for macro in self.macros]  # Übersetzt beim Laden
+        # Benannte Bedienelemente: Name -> (Farbe, übersetztes Makro)
+        self.controls = {}
+        for name, entry in appdata.get('controls', {}).items():
+            self.controls[name] = (entry[0], compile_macro(entry[2], app_count))
         self.enter_macro = appdata['enter_macro']
         self.exit_macro = appdata['exit_macro']
     
-    def switch(self, macropad, display_group):
+    def control(self, name, index):
+        """
+        Liefert die Belegung eines Bedienelements, benannt oder über seine Position in 'macros'.
+
+        :param name: Der Name des Bedienelements, z.B. 'knob_1L.forward'.
+        :param index: Die Position in 'macros' oder None ohne positionale Belegung.
+        :return: Paar (Farbe, CompiledMacro) oder None, wenn das Bedienelement nicht belegt ist.
+        """
+        entry = self.controls.get(name)
+        if entry is None and index is not None and index < len(self.macros):
+            entry = (self.macros[index][0], self.programs[index])
+        return entry
+
+    def switch(self, macropad, display):
         """
         Aktiviert Anwendungseinstellungen; aktualisiert OLED-Labels und LED-Farben.
+        Nur geänderte Labels werden gesetzt, der Refresh folgt mit dem nächsten Display-Frame.
+        Die LED-Farben aller Geräte werden ohne Überblendung auf die vorberechneten
+        Paletten der neuen App gesetzt (eine Pufferkopie je Gerät).
 
         :param macropad: Das MacroPad-Objekt, das die Eingaben und LED-Steuerung ermöglicht.
-        :param display_group: Die Display-Gruppe, die die Labels auf dem OLED-Bildschirm enthält.
+        :param display: Der DisplayManager, der die Labels auf dem OLED-Bildschirm verwaltet.
         """
-        display_group[13].text = self.name   # Application name
+        display.show_group(Config.Globals.app_index)  # Cached group of this app, if enabled
+        display.set_text(13, self.name)   # Application name
+        macropad.main.leds.show_app(Config.Globals.app_index)
 
         for i in range(Config.MacroPad.count_keys):
-            if i < len(self.macros):  # Key in use, set label + LED color
-                macropad.pixels[i] = self.macros[i][0]
-                display_group[i].text = self.macros[i][1]
-            else:  # Key not in use, no label or LED
-                macropad.pixels[i] = 0
-                display_group[i].text = ''
+            if i < len(self.macros):  # Key in use, set label
+                display.set_text(i, self.macros[i][1])
+            else:  # Key not in use, no label
+                display.set_text(i, '')
 
         macropad.keyboard.release_all()
         macropad.mouse.release_all()
-        macropad.pixels.show()
-        macropad.display.refresh()
 
 class Main:
     """
@@ -58,85 +91,170 @@ class Main:
         """
         Initialisiert die Hardwarekomponenten wie i2c-Bus, MacroPad, Display und Steuerungsschnittstellen.
         """
-        # Initialize i2c Board
-        self.i2c_bus = board.I2C()
+        # Initialize i2c buses
+        self._initialize_buses()
+        # Initialize shared seesaw interrupt line
+        self._initialize_interrupt_line()
+        # Initialize priority scheduler for the shared bus
+        self.bus_scheduler = BusScheduler(Config.Globals.bus_budget) if Config.Globals.bus_budget else None
+        # Initialize central LED frame manager
+        self.leds = LedManager(Config.Globals.led_frame_period, Config.Globals.led_enabled,
+                               Config.Globals.led_brightness, Config.Globals.led_color_off, self.bus_scheduler,
+                               Config.Globals.led_animation_budget, Config.Globals.led_bus_writes_per_frame,
+                               Config.Globals.led_min_write_spacing)
+        self.idle = IdleManager(self.leds, Config.Globals.idle_dim_timeout, Config.Globals.idle_off_timeout,
+                                Config.Globals.idle_dim_brightness, Config.Globals.idle_fade_time)
         # Initialize MacroPad incl. settings
         self._initialize_macropad()
         # Initialize Display
         self._initialize_display()
         # Load macros from macros folder
         self._load_macros()
+        self.catalog.add_listener(self.macropad)
+        self.macro_runner = MacroRunner(self.macropad.keyboard, self.macropad.mouse, self._switch_app)
         # Initialize Controll Interfaces 
         self._initialize_control_interfaces()
+        # Handlers precompute their tables for every loaded app and for apps loaded later
+        for interface in list(self.sideknobs.values()) + list(self.sidekeys.values()):
+            self.catalog.add_listener(interface)
+        # Initialize optional i2c transaction recording
+        self._initialize_recorder()
         # Switch to default App
-        self.apps[Config.Globals.app_index].switch(self.macropad, self.display_group)
+        self.apps[Config.Globals.app_index].switch(self.macropad, self.display)
+
+    def _initialize_buses(self):
+        """
+        Erstellt die in Config.Globals.i2c_buses konfigurierten I2C-Busse. self.i2c_bus ist
+        der Standardbus für Geräte ohne Busangabe.
+        """
+        self.i2c_buses = {}
+        for name, spec in Config.Globals.i2c_buses.items():
+            if spec is None:
+                bus = board.I2C()
+            elif isinstance(spec, str):
+                bus = getattr(board, spec)()
+            else:
+                import busio # type: ignore
+                scl, sda, frequency = spec
+                bus = busio.I2C(getattr(board, scl), getattr(board, sda), frequency=frequency)
+            self.i2c_buses[name] = bus
+        self.i2c_bus = self.i2c_buses[Config.Globals.default_bus]
+
+    def _entry_bus(self, entry, position):
+        """
+        Liefert den Bus eines Config-Listeneintrags; ohne Busangabe den Standardbus.
+
+        :param entry: Der Listeneintrag, z.B. ("knob_1L", 0x36, [12, 13, 14], 'gp').
+        :param position: Die Position der optionalen Busangabe im Eintrag.
+        :return: Das I2C-Bus-Objekt.
+        """
+        return self.i2c_buses[entry[position]] if len(entry) > position else self.i2c_bus
+
+    def _initialize_interrupt_line(self):
+        """
+        Initialisiert die gemeinsame INT-Leitung der Seesaw-Geräte (open drain, low aktiv),
+        sofern in Config.Globals.interrupt_pin ein Pin angegeben ist.
+        """
+        self.interrupt_line = None
+        if Config.Globals.interrupt_pin:
+            import digitalio # type: ignore
+            self.interrupt_line = digitalio.DigitalInOut(getattr(board, Config.Globals.interrupt_pin))
+            self.interrupt_line.switch_to_input(pull=digitalio.Pull.UP)
 
     def _initialize_display(self):
+        """
+        Erstellt den DisplayManager, der die Displaygruppe des Macropads mit
+        _build_display_group aufbaut. Ist der Gruppen-Cache aktiv (Config.Globals.display_cache_size),
+        baut der DisplayManager je App eine eigene Gruppe.
+        """
+        self.display = DisplayManager(self.macropad.display, None, Config.Globals.display_frame_period,
+                                      self._build_display_group, Config.Globals.display_cache_size,
+                                      Config.Globals.display_cache_min_free)
+
+        # Zeige die Gruppe auf dem Display des Macropads an
+        self.macropad.display.show(self.display.group)
+
+    def _build_display_group(self):
         """
         Erstellt eine Displaygruppe für ein Macropad und fügt Labels für die Tasten und eine Kopfzeile hinzu.
+        Die Art der Labels bestimmt Config.Globals.display_label_backend.
 
-        Args:
-            macropad: Das Macropad-Objekt, das die Displayattribute enthält.
+        :return: Die neue Displaygruppe mit leeren Labels.
         """
         # Definiere Konstanten für die Farben und die Schriftart
         BACKGROUND_COLOR = 0xFFFFFF  # Weiß
         TEXT_COLOR = 0x000000  # Schwarz
         FONT = terminalio.FONT  # Standard Monospace-Schriftart
 
-        self.display_group = displayio.Group()  # Erstelle eine neue Gruppe für die Displayelemente
+        display_group = displayio.Group()  # Erstelle eine neue Gruppe für die Displayelemente
+        width = self.macropad.display.width
 
         # Erstelle Labels für die 12 Tasten des Macropads
         for key_index in range(Config.MacroPad.count_keys):
             x = key_index % 3  # Position in der Reihe (0, 1, 2)
             y = key_index // 3  # Position in der Spalte (0, 1, 2, 3)
             # Berechne die verankerte Position jedes Labels
-            anchored_position = ((self.macropad.display.width - 1) * x / 2,
+            anchored_position = ((width - 1) * x / 2,
                                 self.macropad.display.height - 1 - (3 - y) * Config.MacroPad.count_keys)
             # Füge jedes Label zur Gruppe hinzu
-            self.display_group.append(label.Label(FONT, text='', color=BACKGROUND_COLOR,
-                                            anchored_position=anchored_position,
-                                            anchor_point=(x / 2, 1.0)))
+            display_group.append(self._create_label(FONT, BACKGROUND_COLOR, anchored_position,
+                                                    (x / 2, 1.0), width // 3))
 
         # Füge ein Rechteck als Kopfzeile am oberen Rand des Displays hinzu
-        self.display_group.append(Rect(0, 0, self.macropad.display.width, Config.MacroPad.count_keys, fill=BACKGROUND_COLOR))
+        display_group.append(Rect(0, 0, width, Config.MacroPad.count_keys, fill=BACKGROUND_COLOR))
         # Füge ein zentrales Label in der Kopfzeile hinzu
-        self.display_group.append(label.Label(FONT, text='', color=TEXT_COLOR,
-                                        anchored_position=(self.macropad.display.width//2, -2),
-                                        anchor_point=(0.5, 0.0)))
+        display_group.append(self._create_label(FONT, TEXT_COLOR, (width // 2, -2), (0.5, 0.0), width))
+        return display_group
 
-        # Zeige die Gruppe auf dem Display des Macropads an
-        self.macropad.display.show(self.display_group)
+    @staticmethod
+    def _create_label(font, color, anchored_position, anchor_point, cell_width):
+        """
+        Erstellt ein leeres Label mit dem in Config.Globals.display_label_backend gewählten Backend.
+
+        :param font: Die Schriftart.
+        :param color: Die Textfarbe.
+        :param anchored_position: Die Position des Ankerpunkts auf dem Display.
+        :param anchor_point: Der Ankerpunkt relativ zum Label (0.0 bis 1.0 je Achse).
+        :param cell_width: Breite der Zelle in Pixeln (nur für das Backend 'cell').
+        :return: Das neue Label.
+        """
+        backend = Config.Globals.display_label_backend
+        if backend == 'cell':
+            from cell_label import CellLabel
+            cell_height = font.get_bounding_box()[1]
+            return CellLabel(font, cell_width, color, align=anchor_point[0],
+                             x=round(anchored_position[0] - anchor_point[0] * cell_width),
+                             y=round(anchored_position[1] - anchor_point[1] * (cell_height - 1)))
+        if backend == 'bitmap_label':
+            from adafruit_display_text import bitmap_label
+            return bitmap_label.Label(font, text='', color=color, anchored_position=anchored_position,
+                                      anchor_point=anchor_point)
+        return label.Label(font, text='', color=color, anchored_position=anchored_position,
+                           anchor_point=anchor_point)
 
     def _load_macros(self):
-        """ Lädt alle Makroeinstellungen aus Python-Dateien im konfigurierten Makroverzeichnis.
-        
-        Raises:
-            SyntaxError, ImportError, AttributeError, KeyError, NameError, IndexError, TypeError:
-                Fängt und protokolliert Ausnahmen, die beim Laden der Makrodateien auftreten.
-        """
-        self.app = None
-        self.apps = []
-        self.app_map = {}
-        files = os.listdir(Config.Globals.macro_folder)
-        files.sort()
-        idx = 0
-        for filename in files:
-            if filename.endswith('.py') and not filename.startswith('._'):
-                try:
-                    module = __import__(Config.Globals.macro_folder + '/' + filename[:-3])
-                    self.app = App(module.app)
-                    self.apps.append(self.app)
-                    self.app_map[self.app.name] = idx
-                    idx += 1
-                except (SyntaxError, ImportError, AttributeError, KeyError, NameError,
-                        IndexError, TypeError) as err:
-                    print("ERROR in", filename)
-                    import traceback
-                    traceback.print_exception(err, err, err.__traceback__)
-                    pass
-        if not self.apps:
-            self.display_group[13].text = 'NO MACRO FILES FOUND'
-            self.macropad.display.refresh()
+        """ Durchsucht das konfigurierte Makroverzeichnis und lädt die Makroeinstellungen.
+
+        Apps, deren Quelldatei seit dem Erstellen des Makro-Bundles (Config.Globals.macro_bundle)
+        unverändert ist, werden aus dem Bundle gelesen statt übersetzt.
+        Mit Config.Globals.macro_cache_size = 0 werden alle Apps sofort geladen. Sonst werden
+        beim Start nur Namen und Reihenfolge der Dateien ermittelt und allein die Start-App geladen;
+        weitere Apps folgen bei ihrer ersten Aktivierung (AppCatalog).
+        """
+        self.catalog = AppCatalog(Config.Globals.macro_folder, App, Config.Globals.macro_cache_size,
+                                  Config.Globals.macro_bundle)
+        if not Config.Globals.macro_cache_size:
+            self.catalog.load_all()
+        self.apps = self.catalog.apps
+        # Erste ladbare App ab dem Start-Index aktivieren
+        for offset in range(len(self.apps)):
+            index = (Config.Globals.app_index + offset) % len(self.apps)
+            if self.catalog.get(index) is not None:
+                Config.Globals.app_index = index
+                break
+        if not any(self.apps):
+            self.display.set_text(13, 'NO MACRO FILES FOUND')
+            self.display.refresh(force=True)
             while True:
                 pass
     
@@ -159,24 +277,55 @@ class Main:
         from handler_joystick import JoyStickHandler
         self.sideknobs, self.sidekeys, self.joysticks  = {}, {}, {}
         
-        for name, address, macroindices in Config.SideKnob.sideknob_list:
+        for entry in Config.SideKnob.sideknob_list:
+            name, address, macroindices = entry[:3]
             # Erstelle eine neue SideKnob-Instanz mit der gegebenen I2C-Adresse
-            sideknob = SideKnobHandler(self, address, macroindices)
+            sideknob = SideKnobHandler(self, address, macroindices, self._entry_bus(entry, 3), name)
             # Füge die neue Instanz dem Dictionary hinzu, wobei der Name als Schlüssel dient
             self.sideknobs[name] = sideknob
         
-        for name, address, macroindices in Config.SideKeys.sidekey_list:
+        for entry in Config.SideKeys.sidekey_list:
+            name, address, macroindices = entry[:3]
             # Erstelle eine neue Sidekey-Instanz mit der gegebenen I2C-Adresse
-            sidekey = SideKeysHandler(self, address, macroindices)
+            sidekey = SideKeysHandler(self, address, macroindices, self._entry_bus(entry, 3), name)
             # Füge die neue Instanz dem Dictionary hinzu, wobei der Name als Schlüssel dient
             self.sidekeys[name] = sidekey
         
-        for name, address in Config.JoyStick.joystick_list:
+        for entry in Config.JoyStick.joystick_list:
+            name, address = entry[:2]
             # Erstelle eine neue Joystick-Instanz mit der gegebenen I2C-Adresse
-            joystick = JoyStickHandler(self, address)
+            joystick = JoyStickHandler(self, address, self._entry_bus(entry, 2))
             # Füge die neue Instanz dem Dictionary hinzu, wobei der Name als Schlüssel dient
             self.joysticks[name] = joystick
 
+        self.poll_order = self._interleave_by_bus(self.sideknobs, self.sidekeys, self.joysticks)
+
+    @staticmethod
+    def _interleave_by_bus(*interface_dicts):
+        """
+        Ordnet die Schnittstellen abwechselnd nach Bus an (Round Robin), damit aufeinander
+        folgende Transaktionen möglichst verschiedene Busse ansprechen.
+
+        :param interface_dicts: Dictionaries mit Schnittstellenobjekten.
+        :return: Liste der Schnittstellen in Abfragereihenfolge.
+        """
+        groups = []
+        for interface_dict in interface_dicts:
+            for interface in interface_dict.values():
+                bus = getattr(interface, 'i2c_bus', None)
+                for group in groups:
+                    if group[0] is bus:
+                        group[1].append(interface)
+                        break
+                else:
+                    groups.append((bus, [interface]))
+        order = []
+        for index in range(max([len(group[1]) for group in groups] or [0])):
+            for group in groups:
+                if index < len(group[1]):
+                    order.append(group[1][index])
+        return order
+
     @staticmethod
     def _control_interfaces_update(*interface_dicts):
         """
@@ -192,38 +341,170 @@ class Main:
             combined_interfaces.update(interface_dict)
         for interface in combined_interfaces.values():
             # Prüfe, ob das Interface eine 'update' Methode hat, bevor du sie aufrufst
-            if hasattr(interface, 'update'):
+            if hasattr(interface, 'update') and Main._poll_due(interface):
                 interface.update()
 
-    def _control_interfaces_update_macros(self, appindex, *interface_dicts):
+    @staticmethod
+    def _poll_due(interface):
         """
-        Erwartet Object Dicts mit Interface Elementen die mit initialize_* erzeugt wurden und verwendet die update Methode.
-        Überspringt Klassen ohne .update Methode.
+        Prüft die adaptive Abfragerate einer Schnittstelle. Ohne poll_rate ist jede Abfrage fällig.
 
-        Aufruf: _control_interfaces_update_macros(AppIndex, dict1, dict2, dict3)
+        :param interface: Das Schnittstellenobjekt.
+        :return: True, wenn die Schnittstelle jetzt abgefragt werden soll.
+        """
+        poll_rate = getattr(interface, 'poll_rate', None)
+        return poll_rate is None or poll_rate.due()
+
+    def _initialize_recorder(self):
+        """
+        Zeichnet die I2C-Transaktionen aller Steuerungsschnittstellen in einem Ringpuffer auf,
+        wenn Config.Globals.i2c_record_size gesetzt ist. Der Mitschnitt kann mit
+        self.i2c_recorder.dump() ausgegeben und unter CPython mit i2c_sim.ReplayI2C abgespielt werden.
+        """
+        self.i2c_recorder = None
+        if not Config.Globals.i2c_record_size:
+            return
+        self.i2c_recorder = I2CRecorder(Config.Globals.i2c_record_size)
+        for interface in self.poll_order:
+            interface.record_i2c(self.i2c_recorder)
+
+    def poll_rates(self):
+        """
+        Gibt die aktuellen Soll-Abfrageraten aller Geräte mit adaptiver Abfragerate zurück,
+        z.B. um die eingesparte Buszeit zu messen.
+
+        :return: Dictionary Name -> (Rate in Hz, Anzahl Abfragen, Anzahl gegenüber fester Abfrage
+                 mit poll_period eingesparter Abfragen).
+        """
+        rates = {}
+        for interface_dict in (self.sideknobs, self.sidekeys, self.joysticks):
+            for name, interface in interface_dict.items():
+                poll_rate = getattr(interface, 'poll_rate', None)
+                if poll_rate:
+                    rates[name] = (poll_rate.rate, poll_rate.polls, poll_rate.skipped)
+        return rates
+
+    @staticmethod
+    def _control_interfaces_poll_pipelined(interfaces):
+        """
+        Fragt alle Schnittstellen mit poll-Methode gemeinsam ab: Die Register-Selects aller
+        Geräte gehen zuerst auf die Busse, danach wird nur einmal die Settle-Zeit abgewartet.
+        Schnittstellen ohne poll-Methode werden über update aktualisiert.
+
+        Aufruf: _control_interfaces_poll_pipelined(self.poll_order)
+
+        :param interfaces: Schnittstellenobjekte in Abfragereihenfolge.
+        """
+        pollers = []
+        for interface in interfaces:
+            if not Main._poll_due(interface):
+                continue
+            if hasattr(interface, 'poll'):
+                pollers.append(interface.poll())
+            elif hasattr(interface, 'update'):
+                interface.update()
+        read_pipelined(pollers)
+
+    def _control_interfaces_submit(self, interfaces):
+        """
+        Reicht die Abfrage aller Schnittstellen mit poll-Methode beim Bus-Scheduler ein,
+        jeweils in der Prioritätsklasse des Handlers (BUS_PRIORITY).
+
+        Aufruf: _control_interfaces_submit(self.poll_order)
+
+        :param interfaces: Schnittstellenobjekte in Abfragereihenfolge.
+        """
+        for interface in interfaces:
+            if hasattr(interface, 'poll') and self._poll_due(interface):
+                self.bus_scheduler.submit(interface.BUS_PRIORITY, interface, 'poll', interface.poll)
+
+    def _control_interfaces_update_macros(self, appindex):
+        """
+        Aktiviert eine App. Die Handler haben ihre Belegung für jede App beim Laden der Makros
+        vorberechnet und lesen sie über Config.Globals.app_index; der Wechsel setzt nur diesen
+        Index und aktualisiert Display und LED-Paletten.
+
+        Ist die App noch nicht geladen, wird sie zuvor importiert; lässt sie sich nicht laden,
+        bleibt die bisherige App aktiv.
 
         :param appindex: Der Index der zu aktivierenden Anwendung.
-        :param interface_dicts: Dictionaries mit Schnittstellenobjekten, die aktualisiert werden sollen.
         """
+        app = self.catalog.get(appindex)
+        if app is None:
+            return
         Config.Globals.app_index = appindex
-        self.apps[appindex].switch(self.macropad, self.display_group)
+        app.switch(self.macropad, self.display)
 
-        combined_interfaces = {}
-        for interface_dict in interface_dicts:
-            combined_interfaces.update(interface_dict)
-        for interface in combined_interfaces.values():
-            # Prüfe, ob das Interface eine 'update' Methode hat, bevor du sie aufrufst
-            if hasattr(interface, 'set_macros'):
-                interface.set_macros()
+    def _switch_app(self, app_number):
+        """
+        Wechselt zur App mit dem angegebenen Index (Opcode OP_APP_SWITCH eines Makros).
+        Die App-Nummer ist beim Laden geprüft; sie kann nur noch ungültig sein, wenn beim
+        Laden aller Apps fehlerhafte Makrodateien entfallen sind.
+
+        :param app_number: Der Index der App.
+        """
+        if app_number >= len(self.apps):
+            print("Fehler: Ungültige App-Nummer in Makro", app_number)
+            return
+        self._control_interfaces_update_macros(app_number)
 
     def run(self):
+        """
+        Startet die in Config.Globals.runtime gewählte Ausführungsart. Ist asyncio nicht
+        verfügbar, wird auf die klassische Hauptschleife zurückgefallen.
+        """
+        if Config.Globals.runtime == 'asyncio':
+            try:
+                from runtime import Runtime
+            except ImportError as err:
+                print("runtime = 'asyncio' gewählt, aber", err, "- asyncio nach lib/ kopieren;",
+                      "verwende die Hauptschleife (runtime = 'loop')")
+            else:
+                self._run_async(Runtime())
+                return
+        self._run_loop()
+
+    def _run_async(self, runtime):
+        """
+        Betreibt jeden Handler als eigenen asyncio-Task mit der konfigurierten Abfrageperiode.
+        Die MacroPad-Tasten laufen dadurch mit voller Rate, während langsame I2C-Geräte
+        in ihren Wartezeiten die Kontrolle abgeben.
+
+        :param runtime: Die Runtime-Instanz, in der die Tasks registriert werden.
+        """
+        for name, sideknob in self.sideknobs.items():
+            runtime.add(name, sideknob, Config.SideKnob.poll_period)
+        for name, sidekey in self.sidekeys.items():
+            runtime.add(name, sidekey, Config.SideKeys.poll_period)
+        for name, joystick in self.joysticks.items():
+            runtime.add(name, joystick, Config.JoyStick.poll_period)
+        runtime.add('macropad', self.macropad, Config.MacroPad.poll_period)
+        runtime.add('leds', self.leds, Config.Globals.led_frame_period)
+        runtime.add('idle', self.idle, Config.Globals.led_frame_period)
+        runtime.add('display', self.display, Config.Globals.display_frame_period)
+        if self.bus_scheduler:
+            # Eingaben laufen als eigene Tasks, der Scheduler arbeitet die LED-Jobs ab
+            runtime.add('bus', self.bus_scheduler, Config.Globals.bus_period)
+        self.runtime = runtime
+        runtime.run()
+
+    def _run_loop(self):
         """
         Führt die Hauptschleife der Anwendung aus, die die Steuerungsschnittstellen aktualisiert und das MacroPad überwacht.
         """
         while True:
             # ----------- Controller Interfaces --------------------
-            self._control_interfaces_update(self.sideknobs, self.sidekeys, self.joysticks)
+            if self.bus_scheduler:
+                self._control_interfaces_submit(self.poll_order)
+                self.bus_scheduler.run_tick()
+            elif Config.Globals.pipelined_reads:
+                self._control_interfaces_poll_pipelined(self.poll_order)
+            else:
+                self._control_interfaces_update(self.sideknobs, self.sidekeys, self.joysticks)
             self.macropad.update()
+            self.idle.update()
+            self.leds.update()
+            self.display.update()
             # ----------- END Controller Interfaces --------------------
 
 if __name__ == '__main__':
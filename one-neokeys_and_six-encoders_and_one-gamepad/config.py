@@ -1,4 +1,12 @@
 import time
+try:
+    from adafruit_ticks import ticks_ms as _ticks_ms, ticks_diff as _ticks_diff
+except ImportError:  # Host (CPython) ohne adafruit_ticks
+    def _ticks_ms():
+        return time.monotonic_ns() // 1000000
+
+    def _ticks_diff(ticks1, ticks2):
+        return ticks1 - ticks2
 
 class Config:
     """
@@ -11,16 +19,49 @@ class Config:
         Globale Einstellungen für das Macropad-System.
         """
         macro_folder = '/macros'
+        macro_cache_size = 0 # Höchstzahl gleichzeitig geladener Apps (LRU, Laden bei erster Aktivierung), 0 = alle beim Start laden
+        macro_bundle = '/macros/macros.bundle' # Mit build_macro_bundle.py erzeugtes Bundle; fehlt es oder ist es veraltet, gelten die Quelldateien
         led_color_off = 0x000000
+        led_enabled = True # Globale LED-Freigabe, der Encoder-Taster des MacroPads schaltet um
+        led_brightness = 1.0 # Globaler Helligkeitsfaktor, wirkt zusätzlich zur Gerätehelligkeit (Maxwert 1.0)
+        led_frame_period = 0.02 # Sekunden zwischen zwei LED-Frames, jedes Gerät höchstens ein show pro Frame
+        led_fade_time = 150 # Millisekunden Überblendung beim Tastenfeedback (App-Wechsel immer sofort), 0 = sofort
+        led_animation_budget = 0.002 # Sekunden Rechenzeit pro Frame für LED-Animationen
+        led_bus_writes_per_frame = 4 # Höchstens so viele I2C-Geräte (NeoKey, Drehknöpfe) pro Frame beschreiben
+        led_min_write_spacing = 0.005 # Sekunden Mindestabstand zwischen zwei LED-Schreibzugriffen auf dasselbe Seesaw
+        idle_dim_timeout = 60 # Sekunden ohne Eingabe, bis alle LEDs abgedunkelt werden, 0 = nie
+        idle_off_timeout = 600 # Sekunden ohne Eingabe, bis alle LEDs aus sind und nicht mehr beschrieben werden, 0 = nie
+        idle_dim_brightness = 0.15 # Helligkeitsfaktor im abgedunkelten Zustand (Maxwert 1.0)
+        idle_fade_time = 2.0 # Sekunden für das Abdunkeln
+        display_frame_period = 0.1 # Sekunden Mindestabstand zwischen zwei OLED-Refreshs
+        display_cache_size = 0 # Vorgebaute Display-Gruppen (eine je App, LRU-Verdrängung), 0 = eine gemeinsame Gruppe; kostet je Gruppe einen Label-Baum RAM, vor dem Einschalten display.stats() vergleichen
+        display_cache_min_free = 16384 # Bytes freier RAM, unter denen der Cache ältere Gruppen verwirft
+        display_label_backend = 'label' # 'label' = TileGrid-Kachel je Zeichen, 'bitmap_label' = eine Bitmap je Label, 'cell' = vorallokierte Bitmap je Tastenzelle
         app_index = 0 # Default setzen, ändert sich zur Laufzeit
+        runtime = 'loop' # 'loop' = klassische Hauptschleife, 'asyncio' = ein Task je Handler (benötigt asyncio in lib/)
+        i2c_buses = {  # "Name": None = board.I2C(), 'STEMMA_I2C' = board.STEMMA_I2C(), ('SCL', 'SDA', Frequenz) = busio.I2C
+            'main': None,
+            # 'gp': ('GP1', 'GP0', 400000),
+        }
+        default_bus = 'main' # Bus für Einträge ohne Busangabe
+        interrupt_pin = None # Board-Pin der gemeinsamen INT-Leitung aller Seesaw-Geräte (z.B. 'D0'), None = ohne
+        pipelined_reads = True # Hauptschleife: Register-Selects aller Geräte zuerst, dann eine gemeinsame Wartezeit
+        bus_budget = 0.025 # Sekunden Buszeit pro Durchlauf für den I2C-Scheduler, None = ohne Scheduler
+        bus_period = 0.01 # Sekunden zwischen zwei Scheduler-Durchläufen (nur asyncio-Runtime)
+        adaptive_polling = True # Unberührte Geräte mit idle_poll_period statt poll_period abfragen
+        poll_quiet_time = 3.0 # Sekunden ohne Änderung, bis ein Gerät zurück in den Leerlauf fällt
+        calibrate_read_delays = True # Beim Start kürzeste stabile Wartezeit je Seesaw und Registergruppe ermitteln
+        i2c_record_size = 0 # Einträge im I2C-Mitschnitt (Ringpuffer, Ausgabe mit i2c_recorder.dump()), 0 = ohne
 
     class JoyStick:
         """
         Konfigurationen für die Joysticks, die am Macropad angeschlossen sind.
         """
         joystick_list = [
-            ("joystick_1R", 0x20)  # "Name", "HardwareAdresse" 
+            ("joystick_1R", 0x20)  # "Name", "HardwareAdresse"[, "Bus"]
         ]
+        poll_period = 0.02 # Sekunden zwischen zwei Abfragen bei Aktivität
+        idle_poll_period = 0.1 # Sekunden zwischen zwei Abfragen im Leerlauf (adaptive_polling)
 
     class SideKeys:
         """
@@ -30,11 +71,13 @@ class Config:
         key_states = [0b00010000, 0b00100000, 0b01000000, 0b10000000]  # Pin-Zustände
         led_pixels_color_default = 0x000580
         led_pixels_color_pressed_default = 0xFF2000
-        led_pixels_color_enabled = True 
         led_pixels_color_brightness = 0.9 #Maxwert 1.0
         sidekey_list = [
-            ("neokey1", 0x30, [30, 31, 32, 33])  # "Name", "HardwareAdresse", "MacroIndices" 
-        ]
+            ("neokey1", 0x30, [30, 31, 32, 33])  # "Name", "HardwareAdresse", "MacroIndices"[, "Bus"]
+        ]  # Benannte Belegung in der Makrodatei: 'controls': {'neokey1.key1': ...} bis 'neokey1.key4'; MacroIndices None = nur benannt
+        poll_period = 0.01 # Sekunden zwischen zwei Abfragen bei Aktivität
+        idle_poll_period = 0.05 # Sekunden zwischen zwei Abfragen im Leerlauf (adaptive_polling)
+        interrupt_gating = True # Tasten nur lesen, wenn die INT-Leitung eine Änderung meldet
 
     class SideKnob:
         """
@@ -42,16 +85,18 @@ class Config:
         """
         led_pixels_color_default = 0x000580 #Wird aus Macro Datei geladen
         led_pixels_color_pressed_default = 0xFF2000
-        led_pixels_color_enabled = True
         led_pixels_color_brightness = 0.2 #Maxwert 1.0
         sideknob_list = [
-            ("knob_1L", 0x36, [12, 13, 14]),  # "Name", "HardwareAdresse", "MacroIndices"
+            ("knob_1L", 0x36, [12, 13, 14]),  # "Name", "HardwareAdresse", "MacroIndices"[, "Bus"]
             ("knob_1R", 0x37, [15, 16, 17]),
             ("knob_2L", 0x38, [18, 19, 20]),
             ("knob_2R", 0x39, [21, 22, 23]),
             ("knob_3L", 0x3A, [24, 25, 26]),  # 1 = lowest row!
             ("knob_3R", 0x3B, [27, 28, 29])
-        ]
+        ]  # Benannte Belegung in der Makrodatei: 'controls': {'knob_1L.forward': ..., '.reverse', '.button'}; MacroIndices None = nur benannt
+        poll_period = 0.02 # Sekunden zwischen zwei Abfragen bei Aktivität
+        idle_poll_period = 0.1 # Sekunden zwischen zwei Abfragen im Leerlauf (adaptive_polling)
+        interrupt_gating = True # Encoder/Taster nur lesen, wenn die INT-Leitung eine Änderung meldet
 
     class MacroPad:
         """
@@ -62,8 +107,8 @@ class Config:
         key_to_app_map = { 1 : 'Lisa.LIMS', 0 : 'Quanta' }
         led_pixels_color_default = 0x000580 #Wird aus Macro Datei geladen
         led_pixels_color_pressed_default = 0xFF2000
-        led_pixels_color_enabled = True
         led_pixels_color_brightness = 0.9 #Maxwert 1.0
+        poll_period = 0.0 # Sekunden zwischen zwei Abfragen (nur asyncio-Runtime), 0 = so oft wie möglich
     
     class GlobalFunctions: 
         """
@@ -72,11 +117,24 @@ class Config:
         @staticmethod
         def get_millis():
             """
-            Gibt die aktuelle Zeit in Millisekunden zurück.
+            Gibt einen monotonen Millisekunden-Zähler zurück (adafruit_ticks). time.time() ändert
+            sich unter CircuitPython nur einmal pro Sekunde und taugt nicht für kurze Intervalle.
+            Der Zähler läuft nach etwa 6 Tagen über, Differenzen daher nur mit ticks_diff bilden.
 
             :return: Die aktuelle Zeit in Millisekunden.
             """
-            return round(time.time() * 1000)
+            return _ticks_ms()
+
+        @staticmethod
+        def ticks_diff(ticks1, ticks2):
+            """
+            Gibt die Differenz zweier Werte von get_millis in Millisekunden zurück, auch über den Überlauf hinweg.
+
+            :param ticks1: Der spätere Zeitpunkt.
+            :param ticks2: Der frühere Zeitpunkt.
+            :return: ticks1 - ticks2 in Millisekunden.
+            """
+            return _ticks_diff(ticks1, ticks2)
         
 
         
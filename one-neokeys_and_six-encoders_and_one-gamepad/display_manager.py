@@ -0,0 +1,183 @@
+import gc
+import time
+from config import Config
+
+class DisplayManager:
+    """
+    Verwaltung der Labels auf dem OLED-Display mit Refresh-Begrenzung.
+
+    Neue Texte werden mit dem aktuellen Text verglichen; nur geänderte Labels werden
+    gesetzt. Refreshs werden gesammelt und höchstens alle frame_period Sekunden
+    ausgeführt, ohne Änderung entfallen sie ganz. Die Dauer der Refreshs und der Textänderungen
+    sowie der RAM-Bedarf einer Gruppe werden gemessen, um Label-Backends vergleichen zu können.
+
+    Mit cache_size > 0 erhält jede App eine eigene, einmal aufgebaute Gruppe. Ein App-Wechsel
+    tauscht dann nur die angezeigte Gruppe; deren Labels tragen bereits die richtigen Texte.
+    Bei mehr Apps als cache_size oder weniger als min_free Bytes freiem RAM wird die am
+    längsten nicht angezeigte Gruppe verworfen (LRU).
+    """
+    def __init__(self, display, group, frame_period, builder=None, cache_size=0, min_free=0):
+        """
+        Initialisiert die Verwaltung für eine Display-Gruppe.
+
+        :param display: Das Display-Objekt (mit auto_refresh = False).
+        :param group: Die angezeigte Display-Gruppe mit den Labels, None = mit builder erstellen.
+        :param frame_period: Mindestabstand zwischen zwei Refreshs in Sekunden.
+        :param builder: Funktion, die eine neue, leere Display-Gruppe erstellt (für den Cache).
+        :param cache_size: Höchstzahl gecachter Gruppen, 0 = ohne Cache.
+        :param min_free: Bytes freier RAM, die der Cache mindestens übrig lässt.
+        """
+        self.display = display
+        self.frame_period = frame_period * 1000  # Millisekunden, Vergleich über ticks_diff
+        self.builder = builder
+        self.cache_size = cache_size if builder else 0
+        self.min_free = min_free
+        self.cache = []  # Einträge [Schlüssel, Gruppe], zuletzt angezeigte am Ende
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.evictions = 0
+        self.group_bytes = 0
+        self.group = group if group is not None else self._build()
+        self.spare = self.group if self.cache_size else None  # Startgruppe, wird die erste gecachte
+        self.text_updates_time = 0.0
+        self.max_text_update_time = 0.0
+        self.switch_start = None  # get_millis() zu Beginn des App-Wechsels
+        self.last_switch_time = 0.0
+        self.dirty = False
+        self.last_refresh = None  # get_millis() nach dem letzten Refresh
+        self.refreshes = 0
+        self.label_updates = 0
+        self.unchanged = 0
+        self.last_refresh_time = 0.0
+        self.max_refresh_time = 0.0
+        self.total_refresh_time = 0.0
+
+    @staticmethod
+    def _mem_free():
+        mem_free = getattr(gc, 'mem_free', None)
+        return mem_free() if mem_free else None
+
+    def show_group(self, key):
+        """
+        Zeigt die gecachte Gruppe zu key an und baut sie bei Bedarf auf. Ohne Cache wird nur
+        der Beginn des Wechsels für die Messung der Umschaltzeit vermerkt.
+
+        :param key: Schlüssel der Gruppe, z.B. der App-Index.
+        """
+        self.switch_start = Config.GlobalFunctions.get_millis()
+        if not self.cache_size:
+            return
+        entry = None
+        for item in self.cache:
+            if item[0] == key:
+                entry = item
+                break
+        if entry is not None:
+            self.cache.remove(entry)
+            self.cache_hits += 1
+        else:
+            self._evict()
+            entry = [key, self.spare or self._build()]
+            self.spare = None
+            self.cache_misses += 1
+        self.cache.append(entry)
+        if entry[1] is not self.group:
+            self.group = entry[1]
+            self.display.show(self.group)
+            self.dirty = True
+
+    def _build(self):
+        """
+        Baut eine neue Gruppe mit dem builder und merkt sich ihren RAM-Bedarf.
+
+        :return: Die neue Gruppe.
+        """
+        gc.collect()
+        before = self._mem_free()
+        group = self.builder()
+        after = self._mem_free()
+        if before is not None and after is not None:
+            self.group_bytes = before - after
+        return group
+
+    def _evict(self):
+        """
+        Verwirft die am längsten nicht angezeigten Gruppen, bis Platz für eine weitere ist.
+        """
+        while self.cache and len(self.cache) >= self.cache_size:
+            self.cache.pop(0)
+            self.evictions += 1
+        mem_free = self._mem_free()
+        if mem_free is None or mem_free >= self.min_free:
+            return
+        gc.collect()
+        while self.cache and self._mem_free() < self.min_free:
+            self.cache.pop(0)
+            self.evictions += 1
+            gc.collect()
+
+    def set_text(self, index, text):
+        """
+        Setzt den Text eines Labels, sofern er sich ändert.
+
+        :param index: Der Index des Labels in der Display-Gruppe.
+        :param text: Der neue Text.
+        """
+        item = self.group[index]
+        if item.text == text:
+            self.unchanged += 1
+            return
+        start = time.monotonic()
+        item.text = text
+        elapsed = time.monotonic() - start
+        self.text_updates_time += elapsed
+        self.max_text_update_time = max(self.max_text_update_time, elapsed)
+        self.label_updates += 1
+        self.dirty = True
+
+    def refresh(self, force=False):
+        """
+        Führt einen anstehenden Refresh aus, sofern seit dem letzten frame_period vergangen ist.
+
+        :param force: True aktualisiert sofort, unabhängig von Änderungen und Bildrate.
+        """
+        if not self.dirty and not force:
+            return
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        now = Config.GlobalFunctions.get_millis()
+        if not force and self.last_refresh is not None and ticks_diff(now, self.last_refresh) < self.frame_period:
+            return
+        self.display.refresh()
+        self.last_refresh = Config.GlobalFunctions.get_millis()
+        self.dirty = False
+        self.refreshes += 1
+        self.last_refresh_time = ticks_diff(self.last_refresh, now) / 1000
+        self.max_refresh_time = max(self.max_refresh_time, self.last_refresh_time)
+        self.total_refresh_time += self.last_refresh_time
+        if self.switch_start is not None:
+            self.last_switch_time = ticks_diff(self.last_refresh, self.switch_start) / 1000
+            self.switch_start = None
+
+    def update(self):
+        """
+        Alias für refresh, damit die Verwaltung als Task in der Runtime laufen kann.
+        """
+        self.refresh()
+
+    def stats(self):
+        """
+        Gibt die Refresh- und Cache-Statistik zurück.
+
+        :return: Dictionary mit Anzahl Refreshs, mittlerer und längster Refreshdauer in s,
+                 übersprungenen Label-Updates, mittlerer und längster Dauer einer Textänderung in s,
+                 Dauer des letzten App-Wechsels bis zum Refresh in s,
+                 Cache-Treffern/-Fehlern/-Verdrängungen, RAM der zuletzt gebauten Gruppe in Bytes
+                 und freiem RAM.
+        """
+        mean = self.total_refresh_time / self.refreshes if self.refreshes else 0.0
+        text_mean = self.text_updates_time / self.label_updates if self.label_updates else 0.0
+        return {'refreshes': self.refreshes, 'refresh_mean': mean, 'refresh_max': self.max_refresh_time,
+                'unchanged': self.unchanged, 'text_update_mean': text_mean,
+                'text_update_max': self.max_text_update_time, 'switch_time': self.last_switch_time,
+                'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses,
+                'evictions': self.evictions, 'group_bytes': self.group_bytes, 'mem_free': self._mem_free()}
@@ -1,6 +1,9 @@
 import math, time
 import sparkfun_qwiicjoystick
+from adafruit_bus_device.i2c_device import RecordingI2CDevice
 from config import Config
+from bus_scheduler import PRIORITY_JOYSTICK
+from poll_rate import AdaptivePollRate
 
 class JoyStickHandler:
     """
@@ -13,17 +16,20 @@ class JoyStickHandler:
     MAX_VALUE = 1023
     MOVEMENT_THRESHOLD = 2
     DEBOUNCE_TIME = 0.1  
+    BUS_PRIORITY = PRIORITY_JOYSTICK  # Prioritätsklasse von poll() im Bus-Scheduler
 
-    def __init__(self, main_instance, hw_address):
+    def __init__(self, main_instance, hw_address, i2c_bus=None):
         """
         Initialisiert eine neue Instanz der JoyStick-Klasse.
         
         :param joystick: Das Joystick-Objekt für die Eingabe.
         :param macroPad: Das Macropad-Objekt für die Aktionen.
+        :param i2c_bus: Der I2C-Bus des Joysticks; None = Standardbus der Hauptinstanz.
         """
         self.main = main_instance
         self.address = hw_address
-        self.joystick = sparkfun_qwiicjoystick.Sparkfun_QwiicJoystick(self.main.i2c_bus, hw_address)
+        self.i2c_bus = i2c_bus if i2c_bus is not None else self.main.i2c_bus
+        self.joystick = sparkfun_qwiicjoystick.Sparkfun_QwiicJoystick(self.i2c_bus, hw_address)
         self.initialize_joystick()
 
     def initialize_joystick(self):
@@ -34,8 +40,9 @@ class JoyStickHandler:
         self.last_x = 0
         self.last_y = 0
         #Initialisiert die Startposition des Joysticks.
-        self.start_x = self.MAX_VALUE - self.joystick.horizontal
-        self.start_y = self.MAX_VALUE - self.joystick.vertical
+        x, y, _ = self.joystick.read_state()
+        self.start_x = self.MAX_VALUE - x
+        self.start_y = self.MAX_VALUE - y
         #Mousespeed x/y auf Null setzen
         self.mo_xspeed = None
         self.mo_yspeed = None
@@ -43,6 +50,11 @@ class JoyStickHandler:
         self.last_movement_time = time.monotonic()  
         #Initialisiere Button
         self.button_was_pressed = False
+        #Adaptive Abfragerate
+        self.poll_rate = None
+        if Config.Globals.adaptive_polling:
+            self.poll_rate = AdaptivePollRate(Config.JoyStick.idle_poll_period, Config.JoyStick.poll_period,
+                                              Config.Globals.poll_quiet_time)
 
     def calculate_relative_position(self, current, start):
         """
@@ -68,13 +80,17 @@ class JoyStickHandler:
         speed = math.ceil((5 * math.log(relative_position)) + (relative_position / 20))
         return speed * sign
 
-    def _update_movement(self):
+    def _update_movement(self, x, y):
         """
         Verarbeitet die Bewegung des Joysticks und simuliert entsprechende Mausbewegungen.
+
+        :param x: Gelesene horizontale Position des Joysticks.
+        :param y: Gelesene vertikale Position des Joysticks.
+        :return: True, wenn eine Mausbewegung ausgelöst wurde.
         """
         current_time = time.monotonic()
-        x_rel_pos = self.calculate_relative_position(self.joystick.horizontal, self.start_x)
-        y_rel_pos = self.calculate_relative_position(self.joystick.vertical, self.start_y)
+        x_rel_pos = self.calculate_relative_position(x, self.start_x)
+        y_rel_pos = self.calculate_relative_position(y, self.start_y)
         y_rel_pos = -y_rel_pos  # Y-Position invertieren
 
         # Überprüfen, ob genügend Zeit seit der letzten Bewegung vergangen ist UND
@@ -90,14 +106,17 @@ class JoyStickHandler:
             self.last_movement_time = current_time
             self.last_x = x_rel_pos
             self.last_y = y_rel_pos
-        else:
-            self.main.macropad.mouse.release(self.main.macropad.Mouse.MIDDLE_BUTTON)
+            return True
+        self.main.macropad.mouse.release(self.main.macropad.Mouse.MIDDLE_BUTTON)
+        return False
 
-    def _handle_joystick_click(self):
+    def _handle_joystick_click(self, button):
         """
         Verarbeitet den Joystick-Klick und führt eine Aktion aus, wenn der Button gedrückt wurde.
+
+        :param button: Gelesener Zustand des Buttons (0 = gedrückt).
         """
-        button_pressed = self.joystick.button == 0
+        button_pressed = button == 0
 
         if button_pressed and not self.button_was_pressed:
             # Der Button wurde gerade gedrückt; führe die Aktion aus
@@ -106,10 +125,33 @@ class JoyStickHandler:
         # Aktualisiere den gespeicherten Zustand für das nächste Update
         self.button_was_pressed = button_pressed
 
+    def poll(self):
+        """
+        Generator, der den Joystick mit einem einzigen Burst-Read abfragt. Nach dem Lesen
+        wird die Kontrolle an den Aufrufer zurückgegeben (Wartezeit 0).
+        """
+        x, y, button = self.joystick.read_state()
+        yield 0
+        moved = self._update_movement(x, y)
+        clicked = (button == 0) != self.button_was_pressed
+        self._handle_joystick_click(button)
+        if moved or clicked:
+            self.main.idle.touch()
+        if self.poll_rate:
+            self.poll_rate.record(moved or clicked)
+
     def update(self):
         """
         Aktualisiert die Position des Joysticks und führt die entsprechende Aktion aus. 
         Beinhaltet auch die Joystick Klickfunktionalität.
         """
-        self._update_movement()
-        self._handle_joystick_click()
+        for delay in self.poll():
+            time.sleep(delay)
+
+    def record_i2c(self, recorder):
+        """
+        Leitet alle weiteren I2C-Transaktionen des Joysticks über einen Mitschnitt.
+
+        :param recorder: Der I2CRecorder, der die Transaktionen aufnimmt.
+        """
+        self.joystick._device = RecordingI2CDevice(self.joystick._device, recorder)
@@ -18,33 +18,51 @@ class MacroPadHandler(MacroPad):  # Erbt von MacroPad
         """
         super().__init__()  # Initialisiert MacroPad
         self.display.auto_refresh = False
-        self.pixels.auto_write = False
-        self.pixels.brightness = Config.MacroPad.led_pixels_color_brightness
         self.main = main_instance
-        self.last_pixels_enabled_state = True
+        self.leds = self.main.leds.add(self.pixels, Config.MacroPad.count_keys,
+                                       Config.MacroPad.led_pixels_color_brightness)
         self.app_knob_last_position = None
         self.app_knob_position = 0
-        self.led_pixels_color_enabled = Config.MacroPad.led_pixels_color_enabled
+        self.pressed_macros = [None] * Config.MacroPad.count_keys  # Beim Drücken gültige Makros, None = nicht gedrückt
 
-    def update_led_state(self):
+    def load_app(self, index, app):
         """
-        Aktualisiert den Zustand der LEDs auf dem MacroPad.
+        Berechnet beim Laden einer App die LED-Palette der Tasten vor.
+
+        :param index: Der Index der App.
+        :param app: Die geladene App.
         """
-        if self.encoder_switch_debounced.pressed:
-            self.led_pixels_color_enabled = not self.led_pixels_color_enabled
+        self.leds.set_palette(index, self._app_colors(app.macros))
+
+    def unload_app(self, index):
+        """
+        Gibt die Palette einer verdrängten App frei.
 
-            if self.led_pixels_color_enabled != self.last_pixels_enabled_state:
-                self.last_pixels_enabled_state = self.led_pixels_color_enabled
-                self.update_led_colors()
+        :param index: Der Index der App.
+        """
+        self.leds.drop_palette(index)
 
-    def update_led_colors(self):
+    def _app_colors(self, app_macros):
         """
-        Setzt die LED-Farben entsprechend dem aktuellen Modus.
+        Liefert die LED-Farben der Tasten für eine App; unbelegte Tasten und Tasten
+        mit der Farbe None bleiben aus.
+
+        :param app_macros: Die Makroliste der App.
+        :return: Liste der Farben, eine je Taste.
         """
-        color = Config.Globals.led_color_off if not self.led_pixels_color_enabled else None
+        colors = []
         for i in range(Config.MacroPad.count_keys):
-            self.pixels[i] = color if color else self.main.apps[Config.Globals.app_index].macros[i][0]
-        self.pixels.show()
+            color = app_macros[i][0] if i < len(app_macros) else None
+            colors.append(color if color is not None else Config.Globals.led_color_off)
+        return colors
+
+    def update_led_state(self):
+        """
+        Schaltet mit dem Encoder-Taster die LEDs aller Geräte ein oder aus.
+        """
+        if self.encoder_switch_debounced.pressed:
+            self.main.idle.touch()
+            self.main.leds.toggle()
 
     def handle_encoder_input(self):
         """
@@ -52,8 +70,9 @@ class MacroPadHandler(MacroPad):  # Erbt von MacroPad
         """
         self.app_knob_position = self.encoder
         if self.app_knob_position != self.app_knob_last_position:
+            self.main.idle.touch()
             app_number = self.app_knob_position % len(self.main.apps)
-            self.main._control_interfaces_update_macros(app_number, self.main.sideknobs, self.main.sidekeys)
+            self.main._control_interfaces_update_macros(app_number)
             self.app_knob_last_position = self.app_knob_position
 
     def handle_key_events(self):
@@ -61,57 +80,38 @@ class MacroPadHandler(MacroPad):  # Erbt von MacroPad
         Verarbeitet Tastendruckereignisse und führt zugehörige Makros aus.
         """
         event = self.keys.events.get()
-        if event and event.key_number < len(self.main.apps[Config.Globals.app_index].macros):
-            key_number = event.key_number
-            sequence = self.main.apps[Config.Globals.app_index].macros[key_number][2]
-            if event.pressed:
-                self.execute_macro(sequence, key_number, pressed=True)
-            else:
-                self.execute_macro(sequence, key_number, pressed=False)
+        if not event:
+            return
+        self.main.idle.touch()
+        key_number = event.key_number
+        if event.pressed:
+            programs = self.main.apps[Config.Globals.app_index].programs
+            if key_number < len(programs):
+                self.pressed_macros[key_number] = programs[key_number]
+                self.execute_macro(programs[key_number], key_number, pressed=True)
+        else:
+            # Losgelassen wird das beim Drücken gültige Makro, auch nach einem App-Wechsel
+            macro = self.pressed_macros[key_number]
+            if macro is not None:
+                self.pressed_macros[key_number] = None
+                self.execute_macro(macro, key_number, pressed=False)
 
-    def execute_macro(self, sequence, key_number, pressed):
+    def execute_macro(self, macro, key_number, pressed):
         """
-        Führt das Makro für eine gegebene Sequenz aus.
+        Führt das übersetzte Makro einer Taste aus.
 
-        :param sequence: Die Makrosequenz, die ausgeführt werden soll.
+        :param macro: Das CompiledMacro der Taste.
         :param key_number: Die Nummer der Taste, die das Makro auslöst.
         :param pressed: Boolescher Wert, ob die Taste gedrückt (True) oder losgelassen (False) wurde.
         """
         if pressed:
-            self.pixels[key_number] = Config.MacroPad.led_pixels_color_pressed_default
-            self.process_macro_sequence(sequence, press=True)
+            self.leds[key_number] = Config.MacroPad.led_pixels_color_pressed_default
+            self.main.macro_runner.run(macro.press)
         else:
-            self.process_macro_sequence(sequence, press=False)
-            self.pixels[key_number] = (self.led_pixels_color_enabled and self.main.apps[Config.Globals.app_index].macros[key_number][0]) or Config.Globals.led_color_off
-        self.pixels.show()
-
-    def process_macro_sequence(self, sequence, press):
-        """
-        Verarbeitet eine gegebene Makrosequenz, entweder Drücken oder Loslassen.
-
-        :param sequence: Die Makrosequenz, die ausgeführt werden soll.
-        :param press: Boolescher Wert, ob die Aktion ein Drücken (True) oder Loslassen (False) ist.
-        """
-        for item in sequence:
-            if isinstance(item, int):
-                if item >= 0 and press:
-                    self.keyboard.press(item)
-                elif item < 0 or not press:
-                    self.keyboard.release(abs(item))
-            elif isinstance(item, dict):
-                self.handle_complex_input(item, press)
-
-    def handle_complex_input(self, item, press):
-        """
-        Handhabt komplexe Eingabeaktionen wie Mausbewegungen und Tastenkombinationen.
-
-        :param item: Ein Dictionary, das die komplexe Eingabeaktion beschreibt.
-        :param press: Boolescher Wert, ob die Aktion ein Drücken (True) oder Loslassen (False) ist.
-        """
-        if 'buttons' in item and (press or item['buttons'] < 0):
-            method = self.mouse.press if press else self.mouse.release
-            method(abs(item['buttons']))
-        self.mouse.move(item.get('x', 0), item.get('y', 0), item.get('wheel', 0))
+            self.main.macro_runner.run(macro.release)
+            self.main.leds.animator.fade(self.leds, key_number, self.leds[key_number],
+                                         self.leds.app_color(Config.Globals.app_index, key_number),
+                                         Config.Globals.led_fade_time)
 
     def update(self):
         """
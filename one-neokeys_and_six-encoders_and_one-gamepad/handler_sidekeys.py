@@ -1,6 +1,10 @@
 from config import Config  # Configuration management in a separate file (config.py)
 from adafruit_neokey.neokey1x4 import NeoKey1x4
+from adafruit_bus_device.i2c_device import RecordingI2CDevice
 import time
+from bus_scheduler import PRIORITY_KEYS
+from poll_rate import AdaptivePollRate
+from macro_program import EMPTY_MACRO
 
 class SideKeysHandler:
     """
@@ -11,22 +15,31 @@ class SideKeysHandler:
     und führt konfigurierte Tastenbefehle aus.
     """
     PIN_MASK = 0b11110000  # Maske, um die relevanten Pins zu isolieren
+    BUS_PRIORITY = PRIORITY_KEYS  # Prioritätsklasse von poll() im Bus-Scheduler
 
-    def __init__(self, main_instance, hw_address, macroIndices):
+    def __init__(self, main_instance, hw_address, macroIndices, i2c_bus=None, name=''):
         """
         Initialisiert eine neue Instanz der SideKeysHandler-Klasse.
         
         :param main_instance: Die Hauptinstanz der Anwendung, die das Macropad und 
                               andere Komponenten verwaltet.
         :param hw_address: Die Hardware-Adresse des NeoKey-Objekts auf dem I2C-Bus.
-        :param macroIndices: Eine Liste von Indizes, die den Tasten zugewiesene Makros darstellen.
+        :param macroIndices: Eine Liste von Indizes, die den Tasten zugewiesene Makros darstellen;
+                             None = nur benannte Belegung.
+        :param i2c_bus: Der I2C-Bus des Geräts; None = Standardbus der Hauptinstanz.
+        :param name: Der Name der NeoKey für die benannte Belegung, z.B. 'neokey1' ('neokey1.key1' bis '.key4').
         """
         self.main = main_instance
-        self.macroindices = macroIndices
-        self.neoKey = NeoKey1x4(self.main.i2c_bus, addr=hw_address)
+        self.i2c_bus = i2c_bus if i2c_bus is not None else self.main.i2c_bus
+        count_keys = Config.SideKeys.count_keys
+        self.macroindices = macroIndices if macroIndices is not None else [None] * count_keys
+        self.control_names = ['%s.key%d' % (name, key + 1) for key in range(count_keys)]
+        self.polling = False
+        self.neoKey = NeoKey1x4(self.i2c_bus, addr=hw_address)
+        if Config.Globals.calibrate_read_delays:
+            self.neoKey.calibrate_read_delays()
         self._initialize_settings()
-        self.set_macros()
-        self._set_all_pixels()
+        self.bindings = [None] * len(self.main.apps)  # Vorberechnete Belegung je App, gefüllt über load_app
 
     def _initialize_settings(self):
         """
@@ -36,34 +49,72 @@ class SideKeysHandler:
         self.debounce_states = [False] * self.count_keys
         self.key_states = Config.SideKeys.key_states
         self.pressed_index = -1
+        self.pressed_macros = [EMPTY_MACRO] * self.count_keys  # Beim Drücken gültige Makros
         self.last_pins = self.PIN_MASK
-        self.led_pixel_color = [ Config.SideKeys.led_pixels_color_default ] * self.count_keys
-        self.led_pixels_color_enabled = Config.SideKeys.led_pixels_color_enabled
-        self.neoKey.pixels.brightness = Config.SideKeys.led_pixels_color_brightness 
-        self.led_pixels_color_off = Config.Globals.led_color_off
+        self.leds = self.main.leds.add(self.neoKey.pixels, self.count_keys,
+                                       Config.SideKeys.led_pixels_color_brightness, owner=self)
         self.pressed_color = Config.SideKeys.led_pixels_color_pressed_default
+        self.interrupt_gating = Config.SideKeys.interrupt_gating and self.main.interrupt_line is not None
+        if self.interrupt_gating:
+            self.neoKey.set_GPIO_interrupts(self.PIN_MASK, True)
+        self.poll_rate = None
+        if Config.Globals.adaptive_polling:
+            self.poll_rate = AdaptivePollRate(Config.SideKeys.idle_poll_period, Config.SideKeys.poll_period,
+                                              Config.Globals.poll_quiet_time)
 
-    def set_macros(self):
+    def load_app(self, index, app):
         """
-        Lädt die Makros für die aktuell ausgewählte App und aktualisiert die Tastenzuweisungen.
+        Löst beim Laden einer App die Tastenbelegung und ihre LED-Palette einmal auf.
+        Zur Laufzeit wird nur noch über Config.Globals.app_index in die Tabellen gegriffen.
+
+        :param index: Der Index der App.
+        :param app: Die geladene App.
         """
-        app_macros = self.main.apps[Config.Globals.app_index].macros
+        entries = [app.control(name, macro_index)
+                   for name, macro_index in zip(self.control_names, self.macroindices)]
+        self.leds.set_palette(index, self._app_colors(entries))
+        self.bindings[index] = self._app_binding(entries)
 
-        # Filtere nur die Makros, die den angegebenen Indizes entsprechen
-        filtered_macros = [app_macros[idx] for idx in self.macroindices if idx < len(app_macros)]
-        self.key_commands = [macro[2] for macro in filtered_macros]
-        self.led_pixel_color = [macro[0] for macro in filtered_macros]
+    def unload_app(self, index):
+        """
+        Gibt Belegung und Palette einer verdrängten App frei.
 
-        self._set_all_pixels()  # Aktualisiere LED-Farben
+        :param index: Der Index der App.
+        """
+        self.leds.drop_palette(index)
+        self.bindings[index] = None
 
-    def _set_all_pixels(self):
+    def _app_binding(self, entries):
         """
-        Setzt die Farbe aller NeoPixel LEDs basierend auf der aktuellen App.
+        Liefert die übersetzten Makros der Tasten für eine App; unbelegte Tasten bleiben ohne Funktion.
+
+        :param entries: Belegung der Tasten, je (Farbe, CompiledMacro) oder None.
+        :return: Tupel der CompiledMacro-Objekte (None = unbelegt), eines je Taste,
+                 oder None, wenn keine Taste belegt ist.
         """
-        for i, color in enumerate(self.led_pixel_color):
-            time.sleep(0.05)
-            self.neoKey.pixels[i] = color if self.led_pixels_color_enabled else self.led_pixels_color_off
-        self.neoKey.pixels.show()
+        binding = tuple(entry[1] if entry is not None else None for entry in entries)
+        return binding if any(binding) else None
+
+    def _app_colors(self, entries):
+        """
+        Liefert die LED-Farben der Tasten für eine App; unbelegte Tasten und Tasten
+        mit der Farbe None bleiben aus.
+
+        :param entries: Belegung der Tasten, je (Farbe, CompiledMacro) oder None.
+        :return: Liste der Farben, eine je Taste.
+        """
+        colors = [entry[0] if entry is not None and entry[0] is not None else Config.Globals.led_color_off
+                  for entry in entries]
+        return (colors + [Config.Globals.led_color_off] * self.count_keys)[:self.count_keys]
+
+    def _set_pixel(self, index, color):
+        """
+        Setzt die Farbe einer NeoPixel LED im Frame-Puffer.
+
+        :param index: Der Index der LED.
+        :param color: Die Farbe, die die LED anzeigen soll.
+        """
+        self.leds[index] = color
 
     def _parse_pins(self, pins):
         """
@@ -80,28 +131,15 @@ class SideKeysHandler:
 
         :param index: Der Index der gedrückten Taste.
         """
-        if index >= len(self.key_commands):
-            print(f"Index {index} is out of range for key_commands")
-            return
+        key_commands = self.bindings[Config.Globals.app_index]
+        if key_commands is None or index >= len(key_commands) or key_commands[index] is None:
+            return  # Taste in dieser App nicht belegt
         
-        self.neoKey.pixels[index] = self.pressed_color
-        self.neoKey.pixels.show()
-
-        key_macro = self.key_commands[index]
-        # Konvertiere den Makro-Befehl in Kleinbuchstaben und prüfe, ob der Befehl ein Appswitcher-Makro ist
-        if key_macro and isinstance(key_macro[0], str) and 'appswitch_' in key_macro[0].lower():
-            # Versuche, die App-Nummer aus dem Makro zu extrahieren
-            try:
-                app_number = int(key_macro[0].split('_')[-1])
-                self.main._control_interfaces_update_macros(app_number, self.main.sideknobs, self.main.sidekeys)
-            except ValueError:
-                print("Fehler: Ungültige App-Nummer in Makro")
-        else:
-            # Normale Makroausführung
-            for command in key_macro:
-                if isinstance(command, int):
-                    self.main.macropad.keyboard.press(command)
+        self._set_pixel(index, self.pressed_color)
 
+        # App-Wechsel ('AppSwitch_N') ist ein Opcode des übersetzten Makros
+        self.pressed_macros[index] = key_commands[index]
+        self.main.macro_runner.run(key_commands[index].press)
 
     def _handle_key_release(self, index):
         """
@@ -110,25 +148,69 @@ class SideKeysHandler:
         :param index: Der Index der losgelassenen Taste.
         """
         if index >= len(self.neoKey.pixels):
-            print(f"Index {index} out of range for NeoPixels")
-            return
-
-        self.neoKey.pixels[index] = self.led_pixel_color[index] if self.led_pixels_color_enabled else self.led_pixels_color_off
-        self.neoKey.pixels.show()
-
-        if index < len(self.key_commands) and self.key_commands[index]:
-            for command in self.key_commands[index]:
-                if isinstance(command, int):
-                    self.main.macropad.keyboard.release(command)
-                else:
-                    print(f"Invalid command type: {command} at index {index}")
-
+            return  # Keine LED zu dieser Taste
+
+        self.main.leds.animator.fade(self.leds, index, self.leds[index],
+                                     self.leds.app_color(Config.Globals.app_index, index),
+                                     Config.Globals.led_fade_time)
+
+        # Losgelassen wird das beim Drücken gültige Makro, auch nach einem App-Wechsel
+        if index < len(self.pressed_macros):
+            self.main.macro_runner.run(self.pressed_macros[index].release)
+            self.pressed_macros[index] = EMPTY_MACRO
+
+    def poll(self):
+        """
+        Generator, der die Seitentasten einmal abfragt und die Ereignisse verarbeitet.
+
+        Liefert nach dem Register-Select die benötigte Wartezeit in Sekunden, damit
+        der Aufrufer in der Zwischenzeit andere Geräte bedienen kann.
+        """
+        if self.interrupt_gating:
+            if self.main.interrupt_line.value:
+                # INT-Leitung inaktiv: keine Änderung, Buszugriffe entfallen
+                self._record_activity(False)
+                return
+            # Flag-Register klärt, ob eine Taste dieses Geräts die Leitung ausgelöst hat
+            self.polling = True
+            yield self.neoKey.get_GPIO_interrupt_flag_start()
+            flags = self.neoKey.get_GPIO_interrupt_flag_finish(self.PIN_MASK)
+            self.polling = False
+            if not flags:
+                self._record_activity(False)
+                return
+        self.polling = True
+        yield self.neoKey.digital_read_bulk_start()
+        pins = self.neoKey.digital_read_bulk_finish(self.PIN_MASK)
+        self.polling = False
+        self._record_activity(pins != self.last_pins)
+        self._process_pins(pins)
+
+    def _record_activity(self, changed):
+        """
+        Meldet das Ergebnis einer Abfrage an die adaptive Abfragerate (falls aktiv) und
+        eine Änderung als Eingabe an die Leerlaufverwaltung.
+
+        :param changed: True, wenn die Abfrage eine Änderung ergeben hat.
+        """
+        if changed:
+            self.main.idle.touch()
+        if self.poll_rate:
+            self.poll_rate.record(changed)
 
     def update(self):
         """
         Aktualisiert den Status der Seitentasten und verarbeitet Ereignisse.
         """
-        pins = self.neoKey.digital_read_bulk(self.PIN_MASK)
+        for delay in self.poll():
+            time.sleep(delay)
+
+    def _process_pins(self, pins):
+        """
+        Wertet die gelesenen Pin-Zustände aus und löst Tastenereignisse aus.
+
+        :param pins: Die gelesenen Pin-Zustände.
+        """
         if pins == self.last_pins:
             return
 
@@ -144,4 +226,12 @@ class SideKeysHandler:
             elif not state and self.debounce_states[i]:
                 self._handle_key_release(i)
                 self.debounce_states[i] = False
-                self.pressed_index = -1
\ No newline at end of file
+                self.pressed_index = -1
+
+    def record_i2c(self, recorder):
+        """
+        Leitet alle weiteren I2C-Transaktionen des NeoKey über einen Mitschnitt.
+
+        :param recorder: Der I2CRecorder, der die Transaktionen aufnimmt.
+        """
+        self.neoKey.i2c_device = RecordingI2CDevice(self.neoKey.i2c_device, recorder)
@@ -1,8 +1,36 @@
 from config import Config  # Configuration management in a separate file (config.py)
 from adafruit_seesaw import neopixel, rotaryio, digitalio
 from adafruit_seesaw import seesaw
+from adafruit_bus_device.i2c_device import RecordingI2CDevice
+from bus_scheduler import PRIORITY_ENCODER
+from poll_rate import AdaptivePollRate
+from macro_program import EMPTY_MACRO, EMPTY_PROGRAM
 import time
 
+class KnobBinding:
+    """
+    Vorberechnete Belegung eines Drehknopfs für eine App.
+    """
+    def __init__(self, forward_macro, reverse_macro, button_macro,
+                 forward_macro_color, reverse_macro_color, button_macro_color, color):
+        """
+        :param forward_macro: tap-Programm für eine Rastung vorwärts.
+        :param reverse_macro: tap-Programm für eine Rastung rückwärts.
+        :param button_macro: CompiledMacro des Tasters.
+        :param forward_macro_color: Aufleuchtfarbe beim Vorwärtsdrehen.
+        :param reverse_macro_color: Aufleuchtfarbe beim Rückwärtsdrehen.
+        :param button_macro_color: Farbe bei gedrücktem Taster.
+        :param color: Grundfarbe der LED.
+        """
+        self.forward_macro = forward_macro
+        self.reverse_macro = reverse_macro
+        self.button_macro = button_macro
+        self.forward_macro_color = forward_macro_color
+        self.reverse_macro_color = reverse_macro_color
+        self.button_macro_color = button_macro_color
+        self.color = color
+
+
 class SideKnobHandler:
     """
     Klasse zur Verwaltung eines seitlichen Drehknopfs (Side Knob) am Macropad.
@@ -12,101 +40,147 @@ class SideKnobHandler:
     
     BUTTON_PIN = 24
     NEOPIXEL_PIN = 6
-    DEBOUNCE_DELAY = 100  # Milliseconds for debounce delay
+    DEBOUNCE_DELAY = 100  # Millisekunden, die die Drückfarbe nach dem Loslassen stehen bleibt
+    KEY_HOLD_TIME = 30  # Millisekunden zwischen Drücken und Loslassen des Taster-Makros
+    BUS_PRIORITY = PRIORITY_ENCODER  # Prioritätsklasse von poll() im Bus-Scheduler
+    CONTROL_SLOTS = ('forward', 'reverse', 'button')  # Namen der Bedienelemente, z.B. 'knob_1L.forward'
 
-    def __init__(self, main_instance, hw_address, macroIndices):
+    def __init__(self, main_instance, hw_address, macroIndices, i2c_bus=None, name=''):
         """
         Initialisiert eine neue Instanz der SideKnobHandler-Klasse.
 
         :param main_instance: Die Hauptinstanz der Anwendung, die das Macropad und andere Komponenten verwaltet.
         :param hw_address: Die Hardware-Adresse des Seesaw-Objekts auf dem I2C-Bus.
-        :param macroIndices: Eine Liste von Indizes, die den Makros entsprechen.
+        :param macroIndices: Positionen der Makros für Vorwärts, Rückwärts und Taster in der Makroliste;
+                             None = nur benannte Belegung.
+        :param i2c_bus: Der I2C-Bus des Geräts; None = Standardbus der Hauptinstanz.
+        :param name: Der Name des Drehknopfs für die benannte Belegung, z.B. 'knob_1L'.
         """
         self.main = main_instance
-        self.seesaw = seesaw.Seesaw(self.main.i2c_bus, addr=hw_address)
-        self.macroindices = macroIndices
+        self.i2c_bus = i2c_bus if i2c_bus is not None else self.main.i2c_bus
+        self.seesaw = seesaw.Seesaw(self.i2c_bus, addr=hw_address)
+        self.macroindices = macroIndices if macroIndices is not None else [None] * len(self.CONTROL_SLOTS)
+        self.control_names = [name + '.' + slot for slot in self.CONTROL_SLOTS]
+        self.polling = False
+        self.pressed_macro = EMPTY_MACRO
         self._initialize_hardware()
-        self._initialize_macros()
-        self.set_macros()
+        self.bindings = [None] * len(self.main.apps)  # Vorberechnete Belegung je App, gefüllt über load_app
 
     def _initialize_hardware(self):
         """
         Initialisiert die Hardware-Komponenten des Drehknopfs.
         """
         self.seesaw.pin_mode(self.BUTTON_PIN, self.seesaw.INPUT_PULLUP)
+        if Config.Globals.calibrate_read_delays:
+            self.seesaw.calibrate_read_delays(encoder=True)
         self.button = digitalio.DigitalIO(self.seesaw, self.BUTTON_PIN)
         self.encoder = rotaryio.IncrementalEncoder(self.seesaw)
         self.pixel = neopixel.NeoPixel(self.seesaw, self.NEOPIXEL_PIN, 1)
-        self.pixel.brightness = Config.SideKnob.led_pixels_color_brightness
-        self.color = Config.SideKnob.led_pixels_color_default
+        self.leds = self.main.leds.add(self.pixel, 1, Config.SideKnob.led_pixels_color_brightness, owner=self)
         self.led_pixels_color_default = Config.SideKnob.led_pixels_color_default
-        self.led_pixels_color_enabled = Config.SideKnob.led_pixels_color_enabled
-        self.led_pixels_color_off = Config.Globals.led_color_off
         self.led_pixels_color_pressed_default = Config.SideKnob.led_pixels_color_pressed_default
-        self.toggle_knob_led(self.color)
+        self.toggle_knob_led(self.led_pixels_color_default)
         self.button_down = False
+        self.button_value = True
+        self.button_press_time = None  # get_millis() beim Drücken, bis das Makro losgelassen ist
         self.last_position = 0
-        self.last_change_time = Config.GlobalFunctions.get_millis()
+        self.interrupt_gating = Config.SideKnob.interrupt_gating and self.main.interrupt_line is not None
+        if self.interrupt_gating:
+            self.seesaw.enable_encoder_interrupt()
+            self.seesaw.set_GPIO_interrupts(1 << self.BUTTON_PIN, True)
+        self.poll_rate = None
+        if Config.Globals.adaptive_polling:
+            self.poll_rate = AdaptivePollRate(Config.SideKnob.idle_poll_period, Config.SideKnob.poll_period,
+                                              Config.Globals.poll_quiet_time)
 
     def toggle_knob_led(self, color):
         """
-        Schaltet die LED-Beleuchtung an oder aus, basierend auf der globalen Einstellung.
+        Setzt die gewünschte LED-Farbe im Frame-Puffer. Der LED-Manager schreibt sie nur,
+        wenn sie sich geändert hat, und berücksichtigt die globale LED-Freigabe.
 
         :param color: Die Farbe, die die LED anzeigen soll.
         """
-        if self.led_pixels_color_enabled:
-            self.pixel.fill(color)
-        else:
-            self.pixel.fill(self.led_pixels_color_off)
+        self.leds[0] = color
 
-    def _initialize_macros(self):
+    def load_app(self, index, app):
         """
-        Initialisiert die Makro-Konfigurationen für den Drehknopf.
+        Löst beim Laden einer App die Belegung des Drehknopfs und ihre LED-Palette einmal auf.
+        Zur Laufzeit wird nur noch über Config.Globals.app_index in die Tabellen gegriffen.
+
+        :param index: Der Index der App.
+        :param app: Die geladene App.
         """
-        self.forward_macro = []
-        self.reverse_macro = []
-        self.button_macro = []
-    
-    def set_macros(self):
+        entries = [app.control(name, macro_index)
+                   for name, macro_index in zip(self.control_names, self.macroindices)]
+        self.leds.set_palette(index, self._app_colors(entries))
+        self.bindings[index] = self._app_binding(entries)
+
+    def unload_app(self, index):
+        """
+        Gibt Belegung und Palette einer verdrängten App frei.
+
+        :param index: Der Index der App.
         """
-        Lädt die Makros für die aktuell ausgewählte App und aktualisiert die Makro-Zuweisungen.
+        self.leds.drop_palette(index)
+        self.bindings[index] = None
+
+    def _app_binding(self, entries):
         """
-        app_macros = self.main.apps[Config.Globals.app_index].macros
+        Liefert die Belegung des Drehknopfs für eine App. Drehen führt das tap-Programm aus,
+        der Taster press und release.
 
-        # Funktion zum Extrahieren der Farbe, behandelt explizit `None` als fehlende Farbe
-        def extract_color(macro_entry):
-            return macro_entry[0] if macro_entry and macro_entry[0] is not None else self.led_pixels_color_default
+        :param entries: Belegung von Vorwärts, Rückwärts und Taster, je (Farbe, CompiledMacro) oder None.
+        :return: Die KnobBinding der App oder None, wenn der Drehknopf nicht belegt ist.
+        """
+        forward, reverse, button = entries
+        if forward is None and reverse is None and button is None:
+            return None
+        extract_color = self._extract_color
 
-        if len(app_macros) > self.macroindices[0]:
-            self.forward_macro = app_macros[self.macroindices[0]][2]
-            self.forward_macro_color = extract_color(app_macros[self.macroindices[0]])
+        if forward is not None:
+            forward_macro = forward[1].tap
+            forward_macro_color = extract_color(forward)
         else:
-            self.forward_macro = None
-            self.forward_macro_color = self.led_pixels_color_default
+            forward_macro = EMPTY_PROGRAM
+            forward_macro_color = self.led_pixels_color_default
 
-        if len(app_macros) > self.macroindices[1]:
-            self.reverse_macro = app_macros[self.macroindices[1]][2]
-            self.reverse_macro_color = extract_color(app_macros[self.macroindices[1]])
+        if reverse is not None:
+            reverse_macro = reverse[1].tap
+            reverse_macro_color = extract_color(reverse)
         else:
-            self.reverse_macro = None
-            self.reverse_macro_color = self.led_pixels_color_default
+            reverse_macro = EMPTY_PROGRAM
+            reverse_macro_color = self.led_pixels_color_default
 
-        if len(app_macros) > self.macroindices[2]:
-            self.button_macro = app_macros[self.macroindices[2]][2]
-            self.button_macro_color = extract_color(app_macros[self.macroindices[2]])
+        if button is not None:
+            button_macro = button[1]
+            button_macro_color = extract_color(button)
         else:
-            self.button_macro = None
-            self.button_macro_color = self.led_pixels_color_pressed_default
+            button_macro = EMPTY_MACRO
+            button_macro_color = self.led_pixels_color_pressed_default
+
+        # Verwende die erste gültige Farbe oder die Standardfarbe, wenn alle `None` sind
+        color = (forward_macro_color if forward_macro_color is not None else
+                 reverse_macro_color if reverse_macro_color is not None else
+                 button_macro_color if button_macro_color is not None else
+                 self.led_pixels_color_default)
 
-        # Verwende die erste gültige Farbe oder fallback zum Default, wenn alle `None` sind
-        self.color = (self.forward_macro_color if self.forward_macro_color is not None else
-                    self.reverse_macro_color if self.reverse_macro_color is not None else
-                    self.button_macro_color if self.button_macro_color is not None else
-                    self.led_pixels_color_default)
+        return KnobBinding(forward_macro, reverse_macro, button_macro,
+                           forward_macro_color, reverse_macro_color, button_macro_color, color)
+
+    def _extract_color(self, entry):
+        """
+        Liefert die Farbe einer Belegung; `None` gilt explizit als fehlende Farbe.
+        """
+        return entry[0] if entry and entry[0] is not None else self.led_pixels_color_default
 
-        time.sleep(0.05)
-        self.toggle_knob_led(self.color)
+    def _app_colors(self, entries):
+        """
+        Liefert die Grundfarbe des Drehknopfs für eine App (Farbe des Vorwärts-Makros).
 
+        :param entries: Belegung von Vorwärts, Rückwärts und Taster.
+        :return: Liste mit der Farbe der LED.
+        """
+        return [self._extract_color(entries[0])]
 
     def _process_encoder_movement(self, position):
         """
@@ -118,68 +192,120 @@ class SideKnobHandler:
         if movement != 0:
             # Bestimme die Richtung der Bewegung
             direction = "forward" if movement > 0 else "reverse"
-            # Führe das entsprechende Makro aus
-            macro_to_process = self.forward_macro if direction == "forward" else self.reverse_macro
-            self._execute_macro(macro_to_process)
-
-            # Aktualisiere die Farbe basierend auf der Richtung
-            new_color = self.forward_macro_color if direction == "forward" else self.reverse_macro_color
-            self.pixel.fill(new_color)
-            self.pixel.show()
-
+            binding = self.bindings[Config.Globals.app_index]
             self.last_position = position  # Aktualisiere die letzte Position
+            if binding is None:  # Drehknopf in dieser App nicht belegt
+                return
+            # Führe das entsprechende Makro aus
+            macro_to_process = binding.forward_macro if direction == "forward" else binding.reverse_macro
+            self.main.macro_runner.run(macro_to_process)
 
-    def _execute_macro(self, macro):
-        """
-        Führt ein gegebenes Makro aus.
-
-        :param macro: Das auszuführende Makro.
-        """
-        for action in macro:
-            if action == 'Wheel up':
-                # Führe eine Scroll-Aktion nach oben aus
-                self.main.macropad.mouse.move(wheel=1)
-            elif action == 'Wheel down':
-                # Führe eine Scroll-Aktion nach unten aus
-                self.main.macropad.mouse.move(wheel=-1)
-            elif action == 'Mouse right':
-                # Bewege die Maus nach rechts
-                self.main.macropad.mouse.move(x=10)
-            elif action == 'Mouse left':
-                # Bewege die Maus nach links
-                self.main.macropad.mouse.move(x=-10)
-            else:
-                # Standard-Verarbeitung für Tastendrücke
-                self.main.macropad.keyboard.press(action)
-                self.main.macropad.keyboard.release_all()
+            # Kurzes Aufleuchten in der Farbe der Richtung, danach zurück zur Grundfarbe
+            new_color = binding.forward_macro_color if direction == "forward" else binding.reverse_macro_color
+            if not self.button_down:
+                self.main.leds.animator.flash(self.leds, 0, new_color, binding.color, 0, Config.Globals.led_fade_time)
 
     def _process_button_press(self):
         """
-        Verarbeitet den Druck auf den Knopf des Drehknopfs.
+        Verarbeitet den Druck auf den Knopf des Drehknopfs. Die Tasten des Makros werden
+        nach KEY_HOLD_TIME von _process_state losgelassen, ohne die Abfrage zu blockieren.
         """
-        self.main.macropad.keyboard.press(*self.button_macro)
+        binding = self.bindings[Config.Globals.app_index]
+        if binding is None:  # Drehknopf in dieser App nicht belegt
+            return
+        self.pressed_macro = binding.button_macro
+        self.main.macro_runner.run(self.pressed_macro.press)
+        self.button_press_time = Config.GlobalFunctions.get_millis()
         self.toggle_knob_led(
-            self.button_macro_color if self.button_macro_color else
+            binding.button_macro_color if binding.button_macro_color else
             self.led_pixels_color_pressed_default
         )
-        time.sleep(0.03)  
-        self.main.macropad.keyboard.release(*self.button_macro)
 
-    def update(self):
+    def _process_button_release(self):
         """
-        Aktualisiert den Status des Drehknopfs und verarbeitet Ereignisse.
+        Verarbeitet das Loslassen des Knopfs: Die Druckfarbe bleibt DEBOUNCE_DELAY stehen
+        und wird dann zur Grundfarbe übergeblendet.
+        """
+        binding = self.bindings[Config.Globals.app_index]
+        if binding is None:
+            return
+        self.main.leds.animator.flash(self.leds, 0, self.leds[0], binding.color,
+                                      self.DEBOUNCE_DELAY, Config.Globals.led_fade_time)
+
+    def poll(self):
+        """
+        Generator, der den Drehknopf einmal abfragt und die Ereignisse verarbeitet.
+
+        Nach jedem Register-Select wird die benötigte Wartezeit in Sekunden geliefert,
+        damit der Aufrufer (Hauptschleife oder asyncio-Runtime) in der Zwischenzeit
+        andere Geräte bedienen kann.
+        """
+        if self.interrupt_gating and self.main.interrupt_line.value:
+            # INT-Leitung inaktiv: kein Seesaw meldet eine Änderung, Buszugriffe entfallen
+            self._record_activity(False)
+            self._process_state(self.last_position, self.button_value)
+            return
+        self.polling = True
+        yield self.seesaw.encoder_position_start()
+        current_position = -self.seesaw.encoder_position_finish()
+        read_button = True
+        if self.interrupt_gating:
+            # Flag-Register klärt, ob der Taster dieses Geräts die Leitung ausgelöst hat
+            yield self.seesaw.get_GPIO_interrupt_flag_start()
+            read_button = self.seesaw.get_GPIO_interrupt_flag_finish(1 << self.BUTTON_PIN)
+        if read_button:
+            yield self.seesaw.digital_read_bulk_start()
+            self.button_value = self.seesaw.digital_read_bulk_finish(1 << self.BUTTON_PIN) != 0
+        self.polling = False
+        self._record_activity(current_position != self.last_position or self.button_value == self.button_down)
+        self._process_state(current_position, self.button_value)
+
+    def _record_activity(self, changed):
+        """
+        Meldet das Ergebnis einer Abfrage an die adaptive Abfragerate (falls aktiv) und
+        eine Änderung als Eingabe an die Leerlaufverwaltung.
+
+        :param changed: True, wenn die Abfrage eine Änderung ergeben hat.
+        """
+        if changed:
+            self.main.idle.touch()
+        if self.poll_rate:
+            self.poll_rate.record(changed)
+
+    def _process_state(self, current_position, button_value):
+        """
+        Verarbeitet die gelesene Position und den Tasterzustand des Drehknopfs.
+
+        :param current_position: Die aktuelle Position des Drehknopfs.
+        :param button_value: Der gelesene Pegel des Tasters (False = gedrückt).
         """
-        current_position = -self.encoder.position
         if current_position != self.last_position:
             self._process_encoder_movement(current_position)
 
-        if not self.button.value and not self.button_down:
+        if not button_value and not self.button_down:
             self.button_down = True
             self._process_button_press()
-            self.last_change_time = Config.GlobalFunctions.get_millis()
-        elif self.button.value and self.button_down:
+        elif button_value and self.button_down:
             self.button_down = False
-            self.last_change_time = Config.GlobalFunctions.get_millis()
+            self._process_button_release()
+
+        if (self.button_press_time is not None
+                and Config.GlobalFunctions.ticks_diff(Config.GlobalFunctions.get_millis(),
+                                                      self.button_press_time) >= self.KEY_HOLD_TIME):
+            self.button_press_time = None
+            self.main.macro_runner.run(self.pressed_macro.release)
 
-        if (Config.GlobalFunctions.get_millis() - self.last_change_time > self.DEBOUNCE_DELAY):
-            self.toggle_knob_led(self.color)
+    def update(self):
+        """
+        Aktualisiert den Status des Drehknopfs und verarbeitet Ereignisse.
+        """
+        for delay in self.poll():
+            time.sleep(delay)
+
+    def record_i2c(self, recorder):
+        """
+        Leitet alle weiteren I2C-Transaktionen des Drehknopfs über einen Mitschnitt.
+
+        :param recorder: Der I2CRecorder, der die Transaktionen aufnimmt.
+        """
+        self.seesaw.i2c_device = RecordingI2CDevice(self.seesaw.i2c_device, recorder)
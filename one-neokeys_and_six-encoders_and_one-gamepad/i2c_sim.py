@@ -0,0 +1,302 @@
+import struct
+import time
+
+class SimulatedI2C:
+    """
+    Nachbildung von busio.I2C für Messungen unter CPython.
+
+    Geräte werden über add_device registriert. Jede Transaktion wird gezählt und
+    ihre Übertragungszeit (9 Takte pro Byte inkl. Adressbyte) aufsummiert, sodass
+    Busbelastung und Abfragerate ohne Hardware verglichen werden können.
+    """
+    def __init__(self, frequency=100000):
+        """
+        Initialisiert einen leeren simulierten Bus.
+
+        :param frequency: Simulierte Taktfrequenz in Hz.
+        """
+        self.frequency = frequency
+        self.devices = {}
+        self.transactions = 0
+        self.bus_time = 0.0
+        self._locked = False
+
+    def add_device(self, device):
+        """
+        Registriert ein simuliertes Gerät unter seiner Adresse.
+
+        :param device: Objekt mit address, write(data) und read(count).
+        :return: Das registrierte Gerät.
+        """
+        self.devices[device.address] = device
+        return device
+
+    def _device(self, address):
+        if address not in self.devices:
+            raise OSError(19, "No device at address 0x%x" % address)
+        return self.devices[address]
+
+    def _account(self, count):
+        self.transactions += 1
+        self.bus_time += (count + 1) * 9 / self.frequency
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._device(address).write(bytes(buffer[start:end]))
+        self._account(end - start)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        buffer[start:end] = self._device(address).read(end - start)
+        self._account(end - start)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        self.writeto(address, buffer_out, start=out_start, end=out_end)
+        self.readfrom_into(address, buffer_in, start=in_start, end=in_end)
+
+
+class SimulatedSeesaw:
+    """
+    Registermodell eines ATtiny817-Seesaw mit Encoder, GPIO und NeoPixel
+    (z.B. Stemma QT Rotary Encoder oder NeoKey 1x4).
+
+    Wird früher als settle_time nach dem Register-Select gelesen, liefert das Modell
+    wie die Firmware noch die vorherige Antwort.
+    """
+    HW_ID = 0x87
+    PRODUCT_ID = 4991
+
+    def __init__(self, address, settle_time=0.001):
+        """
+        Initialisiert ein Seesaw-Modell mit offenen (Pull-up) Eingängen.
+
+        :param address: Die I2C-Adresse des Geräts.
+        :param settle_time: Sekunden, die das Gerät nach einem Register-Select zum Antworten braucht.
+        """
+        self.address = address
+        self.settle_time = settle_time
+        self.select_time = 0.0
+        self.last_response = bytes(4)
+        self.gpio = 0xFFFFFFFF
+        self.position = 0
+        self.gpio_int_mask = 0
+        self.gpio_int_flags = 0
+        self.encoder_int = False
+        self.pixel_writes = 0
+        self.selected = (0, 0)
+
+    def write(self, data):
+        if not data:
+            return
+        base, reg, payload = data[0], data[1], data[2:]
+        self.selected = (base, reg)
+        self.select_time = time.monotonic()
+        if base == 0x01 and reg == 0x08:
+            self.gpio_int_mask |= struct.unpack(">I", payload)[0]
+        elif base == 0x01 and reg == 0x09:
+            self.gpio_int_mask &= ~struct.unpack(">I", payload)[0]
+        elif base == 0x11 and reg == 0x30 and payload:
+            self.position = struct.unpack(">i", payload)[0]
+        elif base == 0x0E and reg == 0x04:
+            self.pixel_writes += 1
+
+    def read(self, count):
+        if time.monotonic() - self.select_time < self.settle_time:
+            return (self.last_response + bytes(count))[:count]
+        base, reg = self.selected
+        if (base, reg) == (0x00, 0x01):
+            data = bytes([self.HW_ID])
+        elif (base, reg) == (0x00, 0x02):
+            data = struct.pack(">I", self.PRODUCT_ID << 16)
+        elif (base, reg) == (0x01, 0x04):
+            data = struct.pack(">I", self.gpio)
+        elif (base, reg) == (0x01, 0x0A):
+            data = struct.pack(">I", self.gpio_int_flags)
+            self.gpio_int_flags = 0
+        elif (base, reg) == (0x11, 0x30):
+            data = struct.pack(">i", self.position)
+            self.encoder_int = False
+        else:
+            data = bytes(count)
+        self.last_response = (data + bytes(count))[:count]
+        return self.last_response
+
+    def turn(self, steps):
+        """
+        Dreht den Encoder um die angegebene Anzahl Rastungen.
+        """
+        self.position += steps
+        self.encoder_int = True
+
+    def set_pin(self, pin, value):
+        """
+        Setzt den Pegel eines GPIO-Eingangs (False = gedrückt bei Pull-up).
+        """
+        old = self.gpio
+        if value:
+            self.gpio |= 1 << pin
+        else:
+            self.gpio &= ~(1 << pin)
+        self.gpio_int_flags |= (old ^ self.gpio) & self.gpio_int_mask
+
+    @property
+    def interrupt(self):
+        """
+        True, solange eine Interrupt-Bedingung ansteht (INT-Leitung aktiv).
+        """
+        return bool(self.encoder_int or self.gpio_int_flags)
+
+
+class SimulatedJoystick:
+    """
+    Registermodell des SparkFun Qwiic Joystick (Mittelstellung, Taster offen).
+    """
+    def __init__(self, address=0x20):
+        """
+        Initialisiert ein Joystick-Modell in Mittelstellung.
+
+        :param address: Die I2C-Adresse des Geräts.
+        """
+        self.address = address
+        self.registers = bytearray(11)
+        self.pointer = 0
+        self.set_position(512, 512)
+        self.set_button(False)
+
+    def set_position(self, x, y):
+        """
+        Setzt die 10-Bit-Position beider Achsen.
+        """
+        self.registers[0x03:0x05] = struct.pack(">H", x << 6)
+        self.registers[0x05:0x07] = struct.pack(">H", y << 6)
+
+    def set_button(self, pressed):
+        """
+        Setzt den Zustand des Tasters.
+        """
+        self.registers[0x07] = 0 if pressed else 1
+
+    def write(self, data):
+        if not data:
+            return
+        self.pointer = data[0]
+        if len(data) > 1:
+            self.registers[self.pointer] = data[1]
+
+    def read(self, count):
+        start = self.pointer
+        data = bytes(self.registers[start:start + count])
+        self.pointer = min(start + count, len(self.registers) - 1)
+        return (data + bytes(count))[:count]
+
+
+class SimulatedInterruptLine:
+    """
+    Gemeinsame, low-aktive INT-Leitung mehrerer simulierter Seesaw-Geräte.
+    """
+    def __init__(self, devices):
+        """
+        :param devices: Die Seesaw-Modelle, die die Leitung treiben.
+        """
+        self.devices = devices
+
+    @property
+    def value(self):
+        return not any(device.interrupt for device in self.devices)
+
+
+class ReplayI2C(SimulatedI2C):
+    """
+    Ersatz für board.I2C(), der einen mit I2CRecorder aufgezeichneten Mitschnitt abspielt.
+
+    Jede aufgezeichnete Leseantwort wird dem zuletzt davor an dasselbe Gerät geschriebenen
+    Register-Select (die ersten zwei Bytes) zugeordnet. Beim Abspielen liefert ein Lesezugriff
+    die nächste Antwort für Adresse und aktuellen Select; ist die Reihe erschöpft, wird die
+    letzte Antwort wiederholt. So lassen sich umgebaute Handler gegen denselben Mitschnitt
+    laufen lassen und Transaktionszahl und Buszeit vergleichen.
+    """
+    def __init__(self, entries, frequency=100000):
+        """
+        Initialisiert den Bus aus einem Mitschnitt.
+
+        :param entries: Tupel (Zeitstempel_ms, Adresse, Lesen, Länge, Daten) wie von I2CRecorder.entries().
+        :param frequency: Simulierte Taktfrequenz in Hz.
+        """
+        super().__init__(frequency)
+        self.responses = {}
+        self.positions = {}
+        self.selects = {}
+        self.unmatched = 0
+        selects = {}
+        for _, address, read, length, data in entries:
+            if read:
+                key = (address, selects.get(address, b''))
+                self.responses.setdefault(key, []).append((data + bytes(length))[:length])
+            else:
+                selects[address] = bytes(data[:2])
+            self.selects.setdefault(address, b'')
+
+    @classmethod
+    def load(cls, path, frequency=100000):
+        """
+        Liest einen mit I2CRecorder.dump() geschriebenen Mitschnitt aus einer Datei.
+
+        :param path: Pfad der Mitschnittdatei.
+        :param frequency: Simulierte Taktfrequenz in Hz.
+        :return: Die ReplayI2C-Instanz.
+        """
+        entries = []
+        with open(path) as stream:
+            for line in stream:
+                fields = line.split()
+                if len(fields) < 4:
+                    continue
+                data = bytes.fromhex(fields[4]) if len(fields) > 4 else b''
+                entries.append((int(fields[0]), int(fields[1], 16), fields[2] == 'R', int(fields[3]), data))
+        return cls(entries, frequency)
+
+    def _device(self, address):
+        if address not in self.selects:
+            raise OSError(19, "No device at address 0x%x" % address)
+
+    def scan(self):
+        return sorted(self.selects)
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._device(address)
+        if end > start:
+            self.selects[address] = bytes(buffer[start:min(end, start + 2)])
+        self._account(end - start)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._device(address)
+        key = (address, self.selects[address])
+        responses = self.responses.get(key)
+        if responses:
+            position = self.positions.get(key, 0)
+            data = responses[min(position, len(responses) - 1)]
+            self.positions[key] = position + 1
+        else:
+            data = b''
+            self.unmatched += 1
+        buffer[start:end] = (data + bytes(end - start))[:end - start]
+        self._account(end - start)
@@ -0,0 +1,74 @@
+import time
+
+class IdleManager:
+    """
+    Leerlaufverwaltung der LEDs.
+
+    Bleibt das Macropad dim_timeout Sekunden unberührt, wird die globale LED-Helligkeit
+    über fade_time Sekunden in DIM_STEPS Stufen auf dim_brightness abgesenkt, sodass jedes
+    Gerät beim Abdunkeln nur wenige Male neu beschrieben wird. Nach off_timeout Sekunden
+    werden alle LEDs ausgeschaltet und die LED-Schreibzugriffe ruhen ganz. Die erste
+    Eingabe (touch) stellt Helligkeit und Farben in einem gemeinsamen Flush wieder her.
+    """
+    ACTIVE = 0
+    DIMMING = 1
+    DIMMED = 2
+    OFF = 3
+    DIM_STEPS = 4
+
+    def __init__(self, leds, dim_timeout, off_timeout, dim_brightness, fade_time):
+        """
+        Initialisiert die Leerlaufverwaltung im aktiven Zustand.
+
+        :param leds: Der LedManager.
+        :param dim_timeout: Sekunden ohne Eingabe bis zum Abdunkeln, 0 = nie.
+        :param off_timeout: Sekunden ohne Eingabe bis zum Abschalten, 0 = nie.
+        :param dim_brightness: Helligkeitsfaktor im abgedunkelten Zustand (0.0 - 1.0).
+        :param fade_time: Dauer des Abdunkelns in Sekunden.
+        """
+        self.leds = leds
+        self.dim_timeout = dim_timeout
+        self.off_timeout = off_timeout
+        self.dim_brightness = dim_brightness
+        self.fade_time = fade_time
+        self.state = self.ACTIVE
+        self.brightness = leds.brightness
+        self.last_input = time.monotonic()
+        self.dim_start = None
+
+    def touch(self):
+        """
+        Meldet eine Eingabe; im Leerlauf werden die LEDs sofort wiederhergestellt.
+        """
+        self.last_input = time.monotonic()
+        if self.state != self.ACTIVE:
+            self.state = self.ACTIVE
+            self.leds.set_brightness(self.brightness)
+            self.leds.wake()
+
+    def update(self):
+        """
+        Prüft die Leerlaufzeit und führt Abdunkeln bzw. Abschalten durch.
+        """
+        if self.state == self.OFF:
+            return
+        now = time.monotonic()
+        idle = now - self.last_input
+        if self.off_timeout and idle >= self.off_timeout:
+            self.state = self.OFF
+            self.leds.power_down()
+            return
+        if not self.dim_timeout or idle < self.dim_timeout:
+            return
+        if self.state == self.ACTIVE:
+            self.state = self.DIMMING
+            self.brightness = self.leds.brightness
+            self.dim_start = now
+        if self.state == self.DIMMING:
+            progress = (now - self.dim_start) / self.fade_time if self.fade_time else 1.0
+            if progress >= 1.0:
+                progress = 1.0
+                self.state = self.DIMMED
+            progress = int(progress * self.DIM_STEPS) / self.DIM_STEPS
+            target = self.brightness * self.dim_brightness
+            self.leds.set_brightness(self.brightness + (target - self.brightness) * progress)
@@ -0,0 +1,115 @@
+"""
+Vergleich der Label-Backends für die OLED-Tastenlabels (Config.Globals.display_label_backend).
+
+Läuft auf dem Gerät, da adafruit_display_text dort nur als .mpy vorliegt und displayio zum
+Kern von CircuitPython gehört: label_bench.py auf CIRCUITPY kopieren, code.py mit Strg-C
+anhalten und in der REPL "import label_bench; label_bench.main()" eingeben.
+
+Für 'label' (adafruit_display_text.label, eine TileGrid-Kachel je Zeichen), 'bitmap_label'
+(eine neu angelegte Bitmap je Text) und 'cell' (CellLabel, eine vorallokierte Bitmap je
+Tastenzelle) werden gemessen:
+- Heap der 13 Labels einer Display-Gruppe mit typischen Texten (gc.mem_free vorher/nachher)
+- mittlere Dauer einer Textänderung über ROUNDS Runden
+Zusätzlich wird geprüft, dass CellLabel für jeden in die Zelle passenden Text dieselben Pixel
+setzt wie bitmap_label, das dieselben Glyphen wie label rendert.
+"""
+import gc
+import time
+import terminalio # type: ignore
+from adafruit_display_text import label, bitmap_label
+from cell_label import CellLabel
+
+# Typische Texte aus macros/0-win-quanta.py und die App-Namen der Kopfzeile
+TEXTS = ['PhaB', 'S/Qm', 'Scan', 'Red+/-', 'ACB', 'LinkZ', 'AF', 'Stigm', 'Spot', 'ScaCon',
+         'SaveI', 'LPos', 'Quanta', 'Lisa.LIMS', '']
+LABEL_COUNT = 13  # 12 Tasten und die Kopfzeile
+CELL_WIDTH = 128 // 3  # Breite einer Tastenzelle auf dem 128 Pixel breiten OLED
+ROUNDS = 20
+BACKENDS = ('label', 'bitmap_label', 'cell')
+
+
+def make_label(backend, font, text=''):
+    """
+    Erstellt ein Label des Backends wie Main._create_label.
+    """
+    if backend == 'cell':
+        return CellLabel(font, CELL_WIDTH, 0xFFFFFF, text=text)
+    if backend == 'bitmap_label':
+        return bitmap_label.Label(font, text=text, color=0xFFFFFF)
+    return label.Label(font, text=text, color=0xFFFFFF)
+
+
+def heap_bytes(backend, font):
+    """
+    :return: Paar (belegter Heap in Bytes, die erstellten Labels).
+    """
+    gc.collect()
+    before = gc.mem_free()
+    labels = [make_label(backend, font, TEXTS[index % len(TEXTS)]) for index in range(LABEL_COUNT)]
+    gc.collect()
+    return before - gc.mem_free(), labels
+
+
+def update_time(labels):
+    """
+    :return: Mittlere Dauer einer Textänderung in Mikrosekunden.
+    """
+    updates = 0
+    start = time.monotonic_ns()
+    for round_index in range(ROUNDS):
+        for index, item in enumerate(labels):
+            item.text = TEXTS[(index + round_index + 1) % len(TEXTS)]
+            updates += 1
+    return (time.monotonic_ns() - start) / updates / 1000
+
+
+def pixels(bitmap):
+    """
+    :return: Menge der gesetzten Pixel, verschoben auf das kleinste x und y.
+    """
+    found = [(x, y) for y in range(bitmap.height) for x in range(bitmap.width) if bitmap[x, y]]
+    if not found:
+        return set()
+    left = min(x for x, _ in found)
+    top = min(y for _, y in found)
+    return set((x - left, y - top) for x, y in found)
+
+
+def text_width(font, text):
+    width = 0
+    for char in text:
+        glyph = font.get_glyph(ord(char))
+        if glyph is not None:
+            width += glyph.shift_x
+    return width
+
+
+def check_cell(font):
+    """
+    :return: Liste der Texte, bei denen CellLabel andere Pixel setzt als bitmap_label.
+    """
+    mismatches = []
+    for text in TEXTS:
+        if not text or text_width(font, text) > CELL_WIDTH:
+            continue  # CellLabel schneidet breitere Texte ab
+        cell = CellLabel(font, CELL_WIDTH, 0xFFFFFF, text=text)
+        reference = bitmap_label.Label(font, text=text, color=0xFFFFFF)
+        if pixels(cell.bitmap) != pixels(reference.bitmap):
+            mismatches.append(text)
+    return mismatches
+
+
+def main():
+    font = terminalio.FONT
+    print("%-14s %12s %14s" % ('Backend', 'Heap Bytes', 'us/Textupdate'))
+    for backend in BACKENDS:
+        used, labels = heap_bytes(backend, font)
+        print("%-14s %12d %14.0f" % (backend, used, update_time(labels)))
+        labels = None
+        gc.collect()
+    mismatches = check_cell(font)
+    print("CellLabel = bitmap_label:", "ja" if not mismatches else "nein, " + ", ".join(mismatches))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import time
+from config import Config
+
+def blend(start, end, t):
+    """
+    Mischt zwei 0xRRGGBB-Farben mit ganzzahligem Festkomma-Anteil.
+
+    :param start: Ausgangsfarbe.
+    :param end: Zielfarbe.
+    :param t: Anteil der Zielfarbe in 1/256 (0 = start, 256 = end).
+    :return: Die gemischte Farbe.
+    """
+    r = (start >> 16) & 0xFF
+    g = (start >> 8) & 0xFF
+    b = start & 0xFF
+    r += (((end >> 16) & 0xFF) - r) * t >> 8
+    g += (((end >> 8) & 0xFF) - g) * t >> 8
+    b += ((end & 0xFF) - b) * t >> 8
+    return (r << 16) | (g << 8) | b
+
+
+class Animation:
+    """
+    Zeitgesteuerter Farbverlauf einer einzelnen LED.
+
+    Nach hold Millisekunden mit der Farbe color_from wird über fade Millisekunden zu
+    color_to überblendet. Mit pulses > 0 wird stattdessen pulses-mal zwischen color_from
+    und color_to hin und zurück geblendet (Periode fade) und auf color_from geendet.
+    """
+    def __init__(self, strip, index, color_from, color_to, hold, fade, pulses, start):
+        """
+        :param strip: Der LedStrip der LED.
+        :param index: Der Index der LED im Strip.
+        :param color_from: Ausgangsfarbe.
+        :param color_to: Zielfarbe.
+        :param hold: Millisekunden, die color_from vor dem Überblenden gehalten wird.
+        :param fade: Dauer der Überblendung bzw. Periode eines Pulses in Millisekunden.
+        :param pulses: Anzahl der Pulse, 0 = einfache Überblendung.
+        :param start: Startzeitpunkt in Millisekunden.
+        """
+        self.strip = strip
+        self.index = index
+        self.color_from = color_from
+        self.color_to = color_to
+        self.hold = hold
+        self.fade = fade
+        self.pulses = pulses
+        self.start = start
+
+    def step(self, now):
+        """
+        Schreibt die Farbe zum Zeitpunkt now in den Frame-Puffer.
+
+        :param now: Aktuelle Zeit in Millisekunden.
+        :return: True, solange die Animation noch läuft.
+        """
+        elapsed = Config.GlobalFunctions.ticks_diff(now, self.start) - self.hold
+        if elapsed < 0:
+            self.strip.set_frame(self.index, self.color_from)
+            return True
+        fade = self.fade or 1
+        if self.pulses:
+            if elapsed >= fade * self.pulses:
+                self.strip.set_frame(self.index, self.color_from)
+                return False
+            phase = (elapsed % fade << 9) // fade
+            t = phase if phase <= 256 else 512 - phase
+        else:
+            if elapsed >= fade:
+                self.strip.set_frame(self.index, self.color_to)
+                return False
+            t = (elapsed << 8) // fade
+        self.strip.set_frame(self.index, blend(self.color_from, self.color_to, t))
+        return True
+
+
+class Animator:
+    """
+    Tick-gesteuerte LED-Animationen (Überblenden, Pulsieren, Zeitablauf).
+
+    Der LedManager ruft tick einmal pro Frame auf. Die Animationen schreiben nur in die
+    Frame-Puffer und blockieren nie; übersteigt ein Tick das Zeitbudget, werden die übrigen
+    Animationen im nächsten Frame fortgesetzt. Da jede Animation ihre Farbe aus der
+    verstrichenen Zeit berechnet, geht dabei kein Fortschritt verloren.
+    """
+    def __init__(self, budget):
+        """
+        Initialisiert einen Animator ohne laufende Animationen.
+
+        :param budget: Zeitbudget pro Frame in Sekunden.
+        """
+        self.budget = budget * 1000  # Millisekunden, gemessen mit get_millis/ticks_diff
+        self.animations = []
+        self.next_index = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.last_tick_time = 0.0
+        self.max_tick_time = 0.0
+
+    def start(self, strip, index, color_from, color_to, hold=0, fade=0, pulses=0):
+        """
+        Startet eine Animation; eine laufende Animation derselben LED wird ersetzt.
+
+        :param strip: Der LedStrip der LED.
+        :param index: Der Index der LED im Strip.
+        :param color_from: Ausgangsfarbe.
+        :param color_to: Zielfarbe.
+        :param hold: Millisekunden, die color_from gehalten wird.
+        :param fade: Dauer der Überblendung bzw. Periode eines Pulses in Millisekunden.
+        :param pulses: Anzahl der Pulse, 0 = einfache Überblendung.
+        :return: Die gestartete Animation.
+        """
+        self.cancel(strip, index)
+        animation = Animation(strip, index, color_from, color_to, hold, fade, pulses,
+                              Config.GlobalFunctions.get_millis())
+        self.animations.append(animation)
+        strip.animated += 1
+        animation.step(animation.start)
+        return animation
+
+    def fade(self, strip, index, color_from, color_to, duration):
+        """
+        Blendet eine LED über duration Millisekunden von color_from zu color_to.
+        """
+        return self.start(strip, index, color_from, color_to, fade=duration)
+
+    def flash(self, strip, index, color, color_after, hold, duration=0):
+        """
+        Zeigt color für hold Millisekunden und blendet danach über duration Millisekunden
+        zu color_after (duration 0 = Zeitablauf ohne Überblendung).
+        """
+        return self.start(strip, index, color, color_after, hold=hold, fade=duration)
+
+    def pulse(self, strip, index, color, color_base, period, count):
+        """
+        Pulsiert eine LED count-mal zwischen color_base und color und endet auf color_base.
+        """
+        return self.start(strip, index, color_base, color, fade=period, pulses=count)
+
+    def cancel(self, strip, index):
+        """
+        Beendet eine laufende Animation der LED, ohne ihre Farbe zu ändern.
+
+        :param strip: Der LedStrip der LED.
+        :param index: Der Index der LED im Strip.
+        """
+        if not strip.animated:
+            return
+        for animation in self.animations:
+            if animation.strip is strip and animation.index == index:
+                self._remove(animation)
+                return
+
+    def _remove(self, animation):
+        self.animations.remove(animation)
+        animation.strip.animated -= 1
+
+    def tick(self):
+        """
+        Schreibt die aktuellen Farben aller laufenden Animationen in die Frame-Puffer,
+        solange das Zeitbudget reicht. Beginnt jeweils dort, wo der letzte Tick aufgehört hat.
+        """
+        if not self.animations:
+            return
+        get_millis = Config.GlobalFunctions.get_millis
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        start = time.monotonic()  # nur Statistik
+        now = get_millis()
+        self.ticks += 1
+        count = len(self.animations)
+        index = self.next_index % count
+        finished = []
+        for n in range(count):
+            if n and ticks_diff(get_millis(), now) >= self.budget:
+                self.overruns += 1
+                break
+            animation = self.animations[index]
+            if not animation.step(now):
+                finished.append(animation)
+            index = (index + 1) % count
+        self.next_index = index
+        for animation in finished:
+            self._remove(animation)
+        self.last_tick_time = time.monotonic() - start
+        self.max_tick_time = max(self.max_tick_time, self.last_tick_time)
@@ -0,0 +1,385 @@
+from bus_scheduler import PRIORITY_LED
+from led_animation import Animator
+from config import Config
+
+def encode_color(buf, offset, color, order, level):
+    """
+    Schreibt eine 0xRRGGBB-Farbe in Leitungsreihenfolge und mit eingerechneter Helligkeit.
+
+    :param buf: Der Zielpuffer.
+    :param offset: Position des ersten Bytes der LED im Puffer.
+    :param color: Die Farbe.
+    :param order: Tupel der Byte-Positionen von Rot, Grün und Blau (z.B. (1, 0, 2) für GRB).
+    :param level: Helligkeit in 1/256 (256 = volle Helligkeit).
+    """
+    buf[offset + order[0]] = ((color >> 16) & 0xFF) * level >> 8
+    buf[offset + order[1]] = ((color >> 8) & 0xFF) * level >> 8
+    buf[offset + order[2]] = (color & 0xFF) * level >> 8
+
+
+class Palette:
+    """
+    Vorberechnete Farben eines Geräts für eine App: die Farbliste für den Frame-Puffer
+    und dieselben Farben als Byte-Puffer in Leitungsreihenfolge mit eingerechneter Helligkeit.
+    """
+    def __init__(self, colors, order, level):
+        """
+        :param colors: Liste der 0xRRGGBB-Farben, eine je LED.
+        :param order: Tupel der Byte-Positionen von Rot, Grün und Blau.
+        :param level: Helligkeit in 1/256.
+        """
+        self.colors = list(colors)
+        self.buf = bytearray(3 * len(self.colors))
+        self.level = None
+        self.encode(order, level)
+
+    def encode(self, order, level):
+        """
+        Berechnet den Byte-Puffer neu, z.B. nach einer Änderung der Helligkeit.
+        """
+        self.level = level
+        for index, color in enumerate(self.colors):
+            encode_color(self.buf, 3 * index, color, order, level)
+
+
+class LedStrip:
+    """
+    Frame-Puffer der LEDs eines Geräts (MacroPad, NeoKey oder Drehknopf).
+
+    Handler schreiben nur die gewünschten Farben in den Puffer; auf das Gerät geschrieben
+    wird ausschließlich beim Flush des LedManagers, höchstens einmal pro Frame. Der Strip
+    hält die Bytes selbst in Leitungsreihenfolge mit eingerechneter Helligkeit und übergibt
+    sie direkt an _transmit des Pixel-Objekts. Zeigt der Frame eine vorberechnete Palette,
+    wird deren Byte-Puffer als Ganzes kopiert, ohne Arbeit pro LED.
+    """
+    def __init__(self, manager, pixels, count, brightness, owner=None, order="GRB"):
+        """
+        Initialisiert einen Frame-Puffer mit ausgeschalteten LEDs.
+
+        :param manager: Der LedManager, zu dem der Puffer gehört.
+        :param pixels: Das Pixel-Objekt des Geräts (NeoPixel mit _transmit-Methode, 3 Bytes pro LED).
+        :param count: Anzahl der LEDs.
+        :param brightness: Helligkeit des Geräts (0.0 - 1.0), wird mit der globalen multipliziert.
+        :param owner: Der Handler des I2C-Geräts, None für direkt angeschlossene LEDs.
+        :param order: Byte-Reihenfolge der LEDs auf der Leitung.
+        """
+        self.manager = manager
+        self.pixels = pixels
+        self.count = count
+        self.brightness = brightness
+        self.owner = owner
+        self.order = (order.index("R"), order.index("G"), order.index("B"))
+        self.level = self._level()
+        self.frame = [manager.color_off] * count
+        self.shown = [None] * count
+        self.wire = bytearray(3 * count)
+        self.palettes = []
+        self.palette = None
+        self.shown_palette = None
+        self.off_palette = Palette([manager.color_off] * count, self.order, self.level)
+        self.dirty = True
+        self.animated = 0
+        self.last_write = None  # get_millis() des letzten Schreibzugriffs
+        pixels.auto_write = False
+
+    def _level(self):
+        return int(self.brightness * self.manager.brightness * 256)
+
+    def set_palette(self, index, colors):
+        """
+        Berechnet die Palette einer App vor (beim Laden ihrer Makros).
+
+        :param index: Der Index der App; palettes[index] gehört zu dieser App.
+        :param colors: Liste der Farben, eine je LED.
+        :return: Die Palette für show_palette.
+        """
+        palette = Palette(colors, self.order, self.level)
+        while len(self.palettes) <= index:
+            self.palettes.append(None)
+        self.palettes[index] = palette
+        return palette
+
+    def drop_palette(self, index):
+        """
+        Gibt die Palette einer entladenen App frei.
+
+        :param index: Der Index der App.
+        """
+        if index < len(self.palettes):
+            self.palettes[index] = None
+
+    def app_color(self, app_index, index):
+        """
+        Liefert die Ruhefarbe einer LED in der Palette einer App, z.B. als Ziel einer Überblendung.
+
+        :param app_index: Der Index der App.
+        :param index: Der Index der LED.
+        :return: Die Farbe der Palette; color_off des Managers, wenn die App keine Palette hat
+                 (noch nicht geladen oder vom AppCatalog verdrängt) oder die LED außerhalb liegt.
+        """
+        palette = self.palettes[app_index] if app_index < len(self.palettes) else None
+        if palette is None or index >= len(palette.colors):
+            return self.manager.color_off
+        return palette.colors[index]
+
+    def show_palette(self, palette, fade=0):
+        """
+        Zeigt eine vorberechnete Palette an, wahlweise mit Überblendung.
+
+        :param palette: Die mit set_palette erzeugte Palette.
+        :param fade: Dauer der Überblendung in Millisekunden, 0 = sofort.
+        """
+        self.palette = palette
+        animator = self.manager.animator
+        for index in range(self.count):
+            color = palette.colors[index]
+            if fade and self.frame[index] != color:
+                animator.fade(self, index, self.frame[index], color, fade)
+            else:
+                self[index] = color
+
+    def __setitem__(self, index, color):
+        if self.animated:
+            self.manager.animator.cancel(self, index)
+        self.set_frame(index, color)
+
+    def set_frame(self, index, color):
+        """
+        Setzt die Farbe einer LED, ohne eine laufende Animation zu beenden.
+
+        :param index: Der Index der LED.
+        :param color: Die gewünschte Farbe.
+        """
+        if self.frame[index] != color:
+            self.frame[index] = color
+            self.dirty = True
+
+    def __getitem__(self, index):
+        return self.frame[index]
+
+    def fill(self, color):
+        """
+        Setzt alle LEDs auf dieselbe Farbe.
+
+        :param color: Die gewünschte Farbe.
+        """
+        for index in range(self.count):
+            self[index] = color
+
+    def write(self):
+        """
+        Überträgt den Frame einmal auf das Gerät. Entspricht er einer Palette (oder sind die
+        LEDs global aus), wird deren Byte-Puffer kopiert, sonst werden nur geänderte LEDs
+        kodiert. Ist nichts geändert, entfällt der Zugriff. Nach einer Helligkeitsänderung
+        wird nur die angezeigte Palette neu berechnet, die übrigen erst bei ihrer Anzeige.
+        """
+        self.dirty = False
+        self.last_write = Config.GlobalFunctions.get_millis()
+        manager = self.manager
+        level = self._level()
+        if level != self.level:
+            self.level = level
+            self.shown_palette = None
+            for index in range(self.count):
+                self.shown[index] = None
+        changed = False
+        palette = self.palette
+        if not manager.enabled or manager.blanked:
+            palette = self.off_palette
+        elif palette is not None and (self.animated or self.frame != palette.colors):
+            palette = None
+        if palette is not None:
+            if palette.level != level:
+                palette.encode(self.order, level)
+            if palette is not self.shown_palette:
+                if self.shown != palette.colors:
+                    self.wire[:] = palette.buf
+                    self.shown[:] = palette.colors
+                    changed = True
+                self.shown_palette = palette
+        else:
+            for index in range(self.count):
+                color = self.frame[index]
+                if color != self.shown[index]:
+                    encode_color(self.wire, 3 * index, color, self.order, level)
+                    self.shown[index] = color
+                    self.shown_palette = None
+                    changed = True
+        if changed:
+            self.pixels._transmit(self.wire)
+            manager.shows += 1
+
+
+class LedManager:
+    """
+    Zentrale Verwaltung aller LEDs im System.
+
+    Jedes Gerät meldet seine LEDs als LedStrip an. Der Manager schreibt die geänderten
+    Puffer gesammelt und mit begrenzter Bildrate auf die Geräte. Globale Freigabe und
+    Helligkeit gelten für alle Geräte gleichermaßen. Vor jedem Frame schreibt der Animator
+    die laufenden Animationen in die Puffer.
+
+    I2C-Geräte bilden eine Schreibwarteschlange: Pro Frame werden höchstens bus_writes_per_frame
+    von ihnen reihum beschrieben, jedes frühestens min_write_spacing nach seinem letzten
+    Schreibzugriff. Ein App-Wechsel verteilt sich so über wenige Frames, statt die Abfrage
+    mit Wartezeiten zu blockieren.
+    """
+    def __init__(self, frame_period, enabled=True, brightness=1.0, color_off=0x000000, bus_scheduler=None,
+                 animation_budget=0.002, bus_writes_per_frame=4, min_write_spacing=0.005):
+        """
+        Initialisiert einen Manager ohne Geräte.
+
+        :param frame_period: Mindestabstand zwischen zwei Frames in Sekunden.
+        :param enabled: Globale LED-Freigabe.
+        :param brightness: Globaler Helligkeitsfaktor (0.0 - 1.0).
+        :param color_off: Farbe für ausgeschaltete LEDs.
+        :param bus_scheduler: Der BusScheduler für I2C-Geräte, None = direkt schreiben.
+        :param animation_budget: Zeitbudget des Animators pro Frame in Sekunden.
+        :param bus_writes_per_frame: Höchstzahl beschriebener I2C-Geräte pro Frame.
+        :param min_write_spacing: Mindestabstand zwischen zwei Schreibzugriffen auf ein I2C-Gerät in Sekunden.
+        """
+        self.frame_period = frame_period * 1000  # Millisekunden, Vergleich über ticks_diff
+        self.enabled = enabled
+        self.brightness = brightness
+        self.color_off = color_off
+        self.bus_scheduler = bus_scheduler
+        self.animator = Animator(animation_budget)
+        self.bus_writes_per_frame = bus_writes_per_frame
+        self.min_write_spacing = min_write_spacing * 1000  # Millisekunden
+        self.strips = []
+        self.next_strip = 0
+        self.blanked = False
+        self.suspended = False
+        self.last_flush = None
+        self.frames = 0
+        self.shows = 0
+
+    def add(self, pixels, count, brightness, owner=None, order="GRB"):
+        """
+        Meldet die LEDs eines Geräts an.
+
+        :param pixels: Das Pixel-Objekt des Geräts.
+        :param count: Anzahl der LEDs.
+        :param brightness: Helligkeit des Geräts (0.0 - 1.0).
+        :param owner: Der Handler des I2C-Geräts, None für direkt angeschlossene LEDs.
+        :param order: Byte-Reihenfolge der LEDs auf der Leitung.
+        :return: Der LedStrip, in den der Handler seine Farben schreibt.
+        """
+        strip = LedStrip(self, pixels, count, brightness, owner, order)
+        self.strips.append(strip)
+        return strip
+
+    def show_app(self, app_index, fade=0):
+        """
+        Zeigt auf allen Geräten die vorberechnete Palette einer App an. Die Handler legen
+        ihre Paletten beim Laden der Makros in App-Reihenfolge an (palettes[i] gehört zu App i).
+
+        :param app_index: Der Index der App.
+        :param fade: Dauer der Überblendung in Millisekunden, 0 = sofort.
+        """
+        for strip in self.strips:
+            if app_index < len(strip.palettes) and strip.palettes[app_index] is not None:
+                strip.show_palette(strip.palettes[app_index], fade)
+
+    def _invalidate(self):
+        for strip in self.strips:
+            strip.dirty = True
+
+    def set_enabled(self, enabled):
+        """
+        Schaltet alle LEDs ein oder aus; die gewünschten Farben bleiben erhalten.
+
+        :param enabled: True = Farben anzeigen, False = alle LEDs aus.
+        """
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self._invalidate()
+
+    def toggle(self):
+        """
+        Kehrt die globale LED-Freigabe um.
+        """
+        self.set_enabled(not self.enabled)
+
+    def power_down(self):
+        """
+        Schaltet alle LEDs aus, ohne die Freigabe zu ändern. Sobald alle Geräte
+        geschrieben sind, ruhen die LED-Schreibzugriffe vollständig (suspended).
+        """
+        if not self.blanked:
+            self.blanked = True
+            self._invalidate()
+
+    def wake(self):
+        """
+        Hebt power_down auf und stellt alle LEDs in einem gemeinsamen Flush wieder her.
+        """
+        if self.blanked or self.suspended:
+            self.blanked = False
+            self.suspended = False
+            self._invalidate()
+            self.flush(force=True)
+
+    def set_brightness(self, brightness):
+        """
+        Setzt den globalen Helligkeitsfaktor.
+
+        :param brightness: Helligkeitsfaktor (0.0 - 1.0).
+        """
+        if brightness != self.brightness:
+            self.brightness = brightness
+            self._invalidate()
+
+    def flush(self, force=False):
+        """
+        Schreibt alle geänderten Puffer, sofern seit dem letzten Frame frame_period vergangen ist.
+        I2C-Geräte werden bei aktivem Bus-Scheduler als LED-Job eingereicht; ohne Scheduler wird
+        ein Gerät mit offener geteilter Leseoperation (polling) im nächsten Frame bedient.
+        Im Ruhezustand (suspended) entfällt der Flush.
+
+        :param force: True schreibt unabhängig von Bildrate und bus_writes_per_frame.
+        """
+        if self.suspended:
+            return
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        now = Config.GlobalFunctions.get_millis()
+        if not force and self.last_flush is not None and ticks_diff(now, self.last_flush) < self.frame_period:
+            return
+        self.last_flush = now
+        self.frames += 1
+        self.animator.tick()
+        count = len(self.strips)
+        writes = 0
+        first = self.next_strip
+        for n in range(count):
+            index = (first + n) % count
+            strip = self.strips[index]
+            if not strip.dirty:
+                continue
+            owner = strip.owner
+            if owner is None:
+                strip.write()
+                continue
+            if writes >= self.bus_writes_per_frame and not force:
+                continue
+            if strip.last_write is not None and ticks_diff(now, strip.last_write) < self.min_write_spacing:
+                continue
+            if self.bus_scheduler:
+                self.bus_scheduler.submit(PRIORITY_LED, owner, 'led', strip.write)
+            elif getattr(owner, 'polling', False):
+                continue
+            else:
+                strip.write()
+            writes += 1
+            self.next_strip = index + 1
+        if self.blanked:
+            for strip in self.strips:
+                if strip.dirty:
+                    return
+            self.suspended = True
+
+    def update(self):
+        """
+        Alias für flush, damit der Manager als Task in der Runtime laufen kann.
+        """
+        self.flush()
@@ -8,6 +8,16 @@
 """
 
 import time
+from array import array
+
+try:
+    from supervisor import ticks_ms
+except ImportError:
+
+    def ticks_ms() -> int:
+        """Millisecond counter wrapping at 2**29, like ``supervisor.ticks_ms``"""
+        return (time.monotonic_ns() // 1000000) & 0x1FFFFFFF
+
 
 try:
     from typing import Optional, Type
@@ -54,7 +64,7 @@ class I2CDevice:
                 device.write(bytes_read)
     """
 
-    def __init__(self, i2c: I2C, device_address: int, probe: bool = True) -> None:
+    def __init__(self, i2c: "I2C", device_address: int, probe: bool = True) -> None:
         self.i2c = i2c
         self.device_address = device_address
 
@@ -62,7 +72,7 @@ class I2CDevice:
             self.__probe_for_device()
 
     def readinto(
-        self, buf: WriteableBuffer, *, start: int = 0, end: Optional[int] = None
+        self, buf: "WriteableBuffer", *, start: int = 0, end: Optional[int] = None
     ) -> None:
         """
         Read into ``buf`` from the device. The number of bytes read will be the
@@ -81,7 +91,7 @@ class I2CDevice:
         self.i2c.readfrom_into(self.device_address, buf, start=start, end=end)
 
     def write(
-        self, buf: ReadableBuffer, *, start: int = 0, end: Optional[int] = None
+        self, buf: "ReadableBuffer", *, start: int = 0, end: Optional[int] = None
     ) -> None:
         """
         Write the bytes from ``buffer`` to the device, then transmit a stop
@@ -102,8 +112,8 @@ class I2CDevice:
     # pylint: disable-msg=too-many-arguments
     def write_then_readinto(
         self,
-        out_buffer: ReadableBuffer,
-        in_buffer: WriteableBuffer,
+        out_buffer: "ReadableBuffer",
+        in_buffer: "WriteableBuffer",
         *,
         out_start: int = 0,
         out_end: Optional[int] = None,
@@ -185,3 +195,169 @@ class I2CDevice:
                 # pylint: enable=raise-missing-from
         finally:
             self.i2c.unlock()
+
+
+class I2CRecorder:
+    """
+    Compact, preallocated ring buffer of I2C transactions. Once full, the oldest
+    entries are overwritten, so recording can stay enabled indefinitely without
+    allocating.
+
+    Each entry holds a timestamp in milliseconds from ``supervisor.ticks_ms``
+    (wrapping at 2**29, so it stays a small int and recording allocates nothing),
+    the address byte as it appears on the wire (``address << 1 | read``), the
+    transfer length and the first ``data_size`` bytes of the transfer.
+
+    :param int size: Number of entries kept
+    :param int data_size: Number of bytes stored per entry; longer transfers are truncated
+    """
+
+    def __init__(self, size: int = 256, data_size: int = 8) -> None:
+        self.size = size
+        self.data_size = data_size
+        self.timestamps = array("L", [0]) * size
+        self.addresses = bytearray(size)
+        self.lengths = array("H", [0]) * size
+        self.data = bytearray(size * data_size)
+        self.count = 0
+
+    def record(
+        self, address: int, read: bool, buf: "ReadableBuffer", start: int, end: int
+    ) -> None:
+        """
+        Append one transaction, overwriting the oldest entry once the buffer is full.
+
+        :param int address: The 7 bit device address
+        :param bool read: True for a read, False for a write
+        :param ~ReadableBuffer buf: Buffer holding the transferred bytes
+        :param int start: Index of the first transferred byte
+        :param int end: Index after the last transferred byte
+        """
+        index = self.count % self.size
+        self.timestamps[index] = ticks_ms()
+        self.addresses[index] = (address << 1) | (1 if read else 0)
+        self.lengths[index] = end - start
+        base = index * self.data_size
+        for i in range(min(end - start, self.data_size)):
+            self.data[base + i] = buf[start + i]
+        self.count += 1
+
+    def clear(self) -> None:
+        """Discard all recorded entries."""
+        self.count = 0
+
+    def entries(self):
+        """
+        Yield the recorded transactions, oldest first, as tuples of
+        ``(timestamp_ms, address, read, length, data)``. ``data`` holds at most
+        ``data_size`` bytes.
+        """
+        first = max(0, self.count - self.size)
+        for n in range(first, self.count):
+            index = n % self.size
+            base = index * self.data_size
+            length = self.lengths[index]
+            yield (
+                self.timestamps[index],
+                self.addresses[index] >> 1,
+                bool(self.addresses[index] & 1),
+                length,
+                bytes(self.data[base : base + min(length, self.data_size)]),
+            )
+
+    def dump(self, stream=None) -> None:
+        """
+        Write the recorded transactions as text, one per line:
+        ``<timestamp_ms> <address hex> <R|W> <length> <data hex>``. Without a
+        stream the lines are printed, e.g. to the serial console.
+
+        :param stream: Object with a ``write`` method, or None to print
+        """
+        for timestamp, address, read, length, data in self.entries():
+            line = "%d %02x %s %d %s" % (
+                timestamp,
+                address,
+                "R" if read else "W",
+                length,
+                "".join("%02x" % b for b in data),
+            )
+            if stream is None:
+                print(line)
+            else:
+                stream.write(line + "\n")
+
+
+class RecordingI2CDevice:
+    """
+    Wraps an :class:`I2CDevice` and logs every transaction into an
+    :class:`I2CRecorder`. Drop-in replacement for the wrapped device, e.g.
+    ``driver.i2c_device = RecordingI2CDevice(driver.i2c_device, recorder)``.
+
+    :param I2CDevice device: The device to wrap
+    :param I2CRecorder recorder: The ring buffer receiving the transactions
+    """
+
+    def __init__(self, device: I2CDevice, recorder: I2CRecorder) -> None:
+        self.device = device
+        self.recorder = recorder
+        self.i2c = device.i2c
+        self.device_address = device.device_address
+
+    def readinto(
+        self, buf: "WriteableBuffer", *, start: int = 0, end: Optional[int] = None
+    ) -> None:
+        """See :meth:`I2CDevice.readinto`."""
+        if end is None:
+            end = len(buf)
+        self.device.readinto(buf, start=start, end=end)
+        self.recorder.record(self.device_address, True, buf, start, end)
+
+    def write(
+        self, buf: "ReadableBuffer", *, start: int = 0, end: Optional[int] = None
+    ) -> None:
+        """See :meth:`I2CDevice.write`."""
+        if end is None:
+            end = len(buf)
+        self.device.write(buf, start=start, end=end)
+        self.recorder.record(self.device_address, False, buf, start, end)
+
+    # pylint: disable-msg=too-many-arguments
+    def write_then_readinto(
+        self,
+        out_buffer: "ReadableBuffer",
+        in_buffer: "WriteableBuffer",
+        *,
+        out_start: int = 0,
+        out_end: Optional[int] = None,
+        in_start: int = 0,
+        in_end: Optional[int] = None
+    ) -> None:
+        """See :meth:`I2CDevice.write_then_readinto`. Recorded as a write and a read."""
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        self.device.write_then_readinto(
+            out_buffer,
+            in_buffer,
+            out_start=out_start,
+            out_end=out_end,
+            in_start=in_start,
+            in_end=in_end,
+        )
+        self.recorder.record(self.device_address, False, out_buffer, out_start, out_end)
+        self.recorder.record(self.device_address, True, in_buffer, in_start, in_end)
+
+    # pylint: enable-msg=too-many-arguments
+
+    def __enter__(self) -> "RecordingI2CDevice":
+        self.device.__enter__()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[type]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> bool:
+        return self.device.__exit__(exc_type, exc_val, exc_tb)
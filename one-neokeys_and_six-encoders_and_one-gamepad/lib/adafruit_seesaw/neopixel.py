@@ -39,6 +39,9 @@ _NEOPIXEL_SHOW = const(0x05)
 
 # try lower values if IO errors
 _OUTPUT_BUFFER_SIZE = const(24)
+# unchanged bytes between two changed ranges below which both are sent as one
+# write; a separate write costs an address byte, register and offset header
+_MERGE_GAP = const(5)
 
 # Pixel color order constants
 RGB = "RGB"
@@ -95,17 +98,65 @@ class NeoPixel(PixelBuf):
         cmd = struct.pack(">H", n * self.bpp)
         self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_BUF_LENGTH, cmd)
         self.output_buffer = bytearray(_OUTPUT_BUFFER_SIZE)
+        # shadow copy of the last transmitted buffer, None until the first show
+        self._shown = None
 
     def _transmit(self, buffer: bytearray) -> None:
-        """Update the pixels even if auto_write is False"""
-
-        step = _OUTPUT_BUFFER_SIZE - 2
-        for i in range(0, len(buffer), step):
-            self.output_buffer[0:2] = struct.pack(">H", i)
-            self.output_buffer[2:] = buffer[i : i + step]
-            self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_BUF, self.output_buffer)
+        """Update the pixels even if auto_write is False. Only the byte ranges
+        that differ from the last transmitted buffer are sent; ranges separated
+        by fewer than ``_MERGE_GAP`` unchanged bytes are merged into one write.
+        Nothing is sent when the buffer is unchanged."""
+
+        shown = self._shown
+        length = len(buffer)
+        if shown is None:
+            self._write_range(buffer, 0, length)
+            self._shown = bytearray(buffer)
+        else:
+            if shown == buffer:
+                return
+            i = 0
+            while i < length:
+                if buffer[i] == shown[i]:
+                    i += 1
+                    continue
+                start = i
+                end = i + 1
+                i = end
+                while i < length and i - end < _MERGE_GAP:
+                    if buffer[i] != shown[i]:
+                        end = i + 1
+                    i += 1
+                self._write_range(buffer, start, end)
+            shown[:] = buffer
 
         self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_SHOW)
 
+    def _write_range(self, buffer: bytearray, start: int, end: int) -> None:
+        """Write ``buffer[start:end]`` to the same offset of the seesaw pixel
+        buffer, in chunks that fit the output buffer."""
+
+        step = _OUTPUT_BUFFER_SIZE - 2
+        output_buffer = self.output_buffer
+        # a while loop: MicroPython only compiles range() with a literal step
+        # into a plain counter, range(start, end, step) would allocate
+        i = start
+        while i < end:
+            # offset header and chunk are copied in place to avoid allocations
+            output_buffer[0] = i >> 8
+            output_buffer[1] = i & 0xFF
+            count = min(step, end - i)
+            for j in range(count):
+                output_buffer[2 + j] = buffer[i + j]
+            self._seesaw.write(
+                _NEOPIXEL_BASE, _NEOPIXEL_BUF, output_buffer, end=2 + count
+            )
+            i += step
+
+    def invalidate(self):
+        """Forget the shadow copy so the next show is transmitted, e.g. after
+        the seesaw was reset."""
+        self._shown = None
+
     def deinit(self):
         pass
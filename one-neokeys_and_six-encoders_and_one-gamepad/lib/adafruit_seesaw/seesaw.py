@@ -125,6 +125,83 @@ _5690_PID = const(5690)
 _5681_PID = const(5681)
 _5743_PID = const(5743)
 
+# size of the per-device transfer buffers; covers the 24 byte NeoPixel chunks
+_WRITE_BUFFER_SIZE = const(32)
+_READ_BUFFER_SIZE = const(4)
+
+# settle delay between register select and read unless calibrated
+_DEFAULT_READ_DELAY = 0.008
+_CALIBRATION_DELAYS = (0.0, 0.00025, 0.0005, 0.001, 0.002, 0.004)
+
+# default pin mask for the flag reads: pins 0-29, the largest mask that is
+# still a small int on CircuitPython; pass a wider mask explicitly for 30/31
+_ALL_PINS_SMALL = const(0x3FFFFFFF)
+
+
+def _uint32_masked(buf, mask):
+    """Combine four big-endian bytes and ``mask``.
+
+    CircuitPython small ints hold 31 bits, anything from ``2**30`` up is a
+    heap-allocated long int. With a mask below ``2**30`` (such as
+    ``_ALL_PINS_SMALL``) the top byte is masked before the shift, so neither
+    the intermediate values nor the result allocate."""
+    return (
+        (buf[0] & (mask >> 24)) << 24
+        | (buf[1] & (mask >> 16) & 0xFF) << 16
+        | (buf[2] & (mask >> 8) & 0xFF) << 8
+        | (buf[3] & mask & 0xFF)
+    )
+
+
+def _int32(buf):
+    """Decode four big-endian bytes as a signed value.
+
+    Every intermediate stays within the magnitude of the result, so values in
+    the small int range (-2**30 to 2**30 - 1, e.g. any encoder position) do
+    not allocate a long int. The negative branch subtracts the 1 last, so that
+    -2**30 does not pass through 2**30."""
+    if buf[0] & 0x80:
+        return -(
+            (buf[0] ^ 0xFF) << 24
+            | (buf[1] ^ 0xFF) << 16
+            | (buf[2] ^ 0xFF) << 8
+            | (buf[3] ^ 0xFF)
+        ) - 1
+    return buf[0] << 24 | buf[1] << 16 | buf[2] << 8 | buf[3]
+
+
+def read_pipelined(pollers):
+    """Run several split-phase readers so that their settle delays overlap.
+
+    Each poller is a generator bound to its own device. It selects a register
+    with `Seesaw.read_start` (or one of the ``*_start`` helpers), yields the
+    settle delay it needs and collects the data with `Seesaw.read_finish`
+    once resumed. All pollers are advanced in lockstep: the register selects
+    for every device go out first, a single sleep covers the longest
+    requested delay, then every response is collected. Refreshing N devices
+    costs one settle delay per phase instead of N.
+
+    :param pollers: Iterable of generators, each talking to a different device"""
+    pending = []
+    delay = 0
+    for poller in pollers:
+        try:
+            delay = max(delay, next(poller))
+            pending.append(poller)
+        except StopIteration:
+            pass
+    while pending:
+        time.sleep(delay)
+        active = pending
+        pending = []
+        delay = 0
+        for poller in active:
+            try:
+                delay = max(delay, next(poller))
+                pending.append(poller)
+            except StopIteration:
+                pass
+
 
 class Seesaw:
     """Driver for Seesaw i2c generic conversion trip
@@ -145,6 +222,11 @@ class Seesaw:
             drdy.switch_to_input()
 
         self.i2c_device = I2CDevice(i2c_bus, addr)
+        # preallocated transfer buffers, reused by every register access
+        self._write_buf = bytearray(_WRITE_BUFFER_SIZE)
+        self._read_buf = bytearray(_READ_BUFFER_SIZE)
+        # calibrated settle delays by register base, see calibrate_read_delays
+        self.read_delays = {}
         if reset:
             self.sw_reset()
 
@@ -233,18 +315,23 @@ class Seesaw:
             return self.digital_read_bulk_b((1 << (pin - 32))) != 0
         return self.digital_read_bulk((1 << pin)) != 0
 
-    def digital_read_bulk(self, pins, delay=0.008):
+    def digital_read_bulk(self, pins, delay=None):
         """Get the values of all the pins on the 'A' port as a bitmask"""
-        buf = bytearray(4)
-        self.read(_GPIO_BASE, _GPIO_BULK, buf, delay=delay)
-        try:
-            ret = struct.unpack(">I", buf)[0]
-        except OverflowError:
-            buf[0] = buf[0] & 0x3F
-            ret = struct.unpack(">I", buf)[0]
-        return ret & pins
+        self.read(_GPIO_BASE, _GPIO_BULK, self._read_buf, delay=delay)
+        return _uint32_masked(self._read_buf, pins)
+
+    def digital_read_bulk_start(self):
+        """Select the 'A' port for a following `digital_read_bulk_finish`.
+        Returns the settle delay to wait before collecting."""
+        self.read_start(_GPIO_BASE, _GPIO_BULK)
+        return self.read_delay(_GPIO_BASE)
+
+    def digital_read_bulk_finish(self, pins):
+        """Collect the 'A' port selected by `digital_read_bulk_start` as a bitmask"""
+        self.read_finish(self._read_buf)
+        return _uint32_masked(self._read_buf, pins)
 
-    def digital_read_bulk_b(self, pins, delay=0.008):
+    def digital_read_bulk_b(self, pins, delay=None):
         """Get the values of all the pins on the 'B' port as a bitmask"""
         buf = bytearray(8)
         self.read(_GPIO_BASE, _GPIO_BULK, buf, delay=delay)
@@ -259,13 +346,26 @@ class Seesaw:
         else:
             self.write(_GPIO_BASE, _GPIO_INTENCLR, cmd)
 
-    def get_GPIO_interrupt_flag(self, delay=0.008):
-        """Read and clear GPIO interrupts that have fired"""
-        buf = bytearray(4)
-        self.read(_GPIO_BASE, _GPIO_INTFLAG, buf, delay=delay)
-        return struct.unpack(">I", buf)[0]
-
-    def analog_read(self, pin, delay=0.008):
+    def get_GPIO_interrupt_flag(self, delay=None, pins=_ALL_PINS_SMALL):
+        """Read and clear GPIO interrupts that have fired, masked by ``pins``
+        (default: pins 0-29, see `_ALL_PINS_SMALL`)"""
+        self.read(_GPIO_BASE, _GPIO_INTFLAG, self._read_buf, delay=delay)
+        return _uint32_masked(self._read_buf, pins)
+
+    def get_GPIO_interrupt_flag_start(self):
+        """Select the GPIO interrupt flags for a following `get_GPIO_interrupt_flag_finish`.
+        Returns the settle delay to wait before collecting."""
+        self.read_start(_GPIO_BASE, _GPIO_INTFLAG)
+        return self.read_delay(_GPIO_BASE)
+
+    def get_GPIO_interrupt_flag_finish(self, pins=_ALL_PINS_SMALL):
+        """Collect and clear the GPIO interrupt flags selected by
+        `get_GPIO_interrupt_flag_start`, masked by ``pins``
+        (default: pins 0-29, see `_ALL_PINS_SMALL`)"""
+        self.read_finish(self._read_buf)
+        return _uint32_masked(self._read_buf, pins)
+
+    def analog_read(self, pin, delay=None):
         """Read the value of an analog pin by number"""
         buf = bytearray(2)
         if pin not in self.pin_mapping.analog_pins:
@@ -403,9 +503,19 @@ class Seesaw:
 
     def encoder_position(self, encoder=0):
         """The current position of the encoder"""
-        buf = bytearray(4)
-        self.read(_ENCODER_BASE, _ENCODER_POSITION + encoder, buf)
-        return struct.unpack(">i", buf)[0]
+        self.read(_ENCODER_BASE, _ENCODER_POSITION + encoder, self._read_buf)
+        return _int32(self._read_buf)
+
+    def encoder_position_start(self, encoder=0):
+        """Select the encoder position for a following `encoder_position_finish`.
+        Returns the settle delay to wait before collecting."""
+        self.read_start(_ENCODER_BASE, _ENCODER_POSITION + encoder)
+        return self.read_delay(_ENCODER_BASE)
+
+    def encoder_position_finish(self):
+        """Collect the encoder position selected by `encoder_position_start`"""
+        self.read_finish(self._read_buf)
+        return _int32(self._read_buf)
 
     def set_encoder_position(self, pos, encoder=0):
         """Set the current position of the encoder"""
@@ -414,9 +524,8 @@ class Seesaw:
 
     def encoder_delta(self, encoder=0):
         """The change in encoder position since it was last read"""
-        buf = bytearray(4)
-        self.read(_ENCODER_BASE, _ENCODER_DELTA + encoder, buf)
-        return struct.unpack(">i", buf)[0]
+        self.read(_ENCODER_BASE, _ENCODER_DELTA + encoder, self._read_buf)
+        return _int32(self._read_buf)
 
     def enable_encoder_interrupt(self, encoder=0):
         """Enable the interrupt to fire when the encoder changes position"""
@@ -488,33 +597,127 @@ class Seesaw:
 
     def write8(self, reg_base, reg, value):
         """Write an arbitrary I2C byte register on the device"""
-        self.write(reg_base, reg, bytearray([value]))
+        self._write_buf[2] = value
+        self._write_prepared(reg_base, reg, 1)
 
     def read8(self, reg_base, reg):
         """Read an arbitrary I2C byte register on the device"""
-        ret = bytearray(1)
-        self.read(reg_base, reg, ret)
-        return ret[0]
-
-    def read(self, reg_base, reg, buf, delay=0.008):
-        """Read an arbitrary I2C register range on the device"""
+        self.read(reg_base, reg, self._read_buf, end=1)
+        return self._read_buf[0]
+
+    def read(self, reg_base, reg, buf, delay=None, *, end=None):
+        """Read an arbitrary I2C register range on the device
+
+        Without an explicit ``delay`` the calibrated settle delay of the
+        register family is used, see `calibrate_read_delays`."""
+        self.read_start(reg_base, reg)
+        if self._drdy is None:
+            time.sleep(self.read_delay(reg_base) if delay is None else delay)
+        self.read_finish(buf, end=end)
+
+    def read_delay(self, reg_base):
+        """The settle delay used for registers of the ``reg_base`` module"""
+        return self.read_delays.get(reg_base, _DEFAULT_READ_DELAY)
+
+    def calibrate_read_delay(
+        self, reg_base, reg, length=4, margin=1.5, guard=0.0005, samples=3
+    ):
+        """Find the shortest settle delay that still returns stable data for a
+        register family and store it for all later reads of ``reg_base``.
+
+        A reference value is read with the default delay. Candidate delays are
+        then tried from short to long; before every sample a different
+        register is read so that a stale response would be noticed. The first
+        candidate that reproduces the reference ``samples`` times is used,
+        scaled by ``margin`` plus ``guard`` seconds and capped at the default.
+        If the reference changes meanwhile (input moved during calibration)
+        or the bus reports an error, the default delay is kept.
+
+        Returns the stored delay."""
+        delay = _DEFAULT_READ_DELAY
+        reference = bytearray(length)
+        sample = bytearray(length)
+        try:
+            self.read(reg_base, reg, reference, _DEFAULT_READ_DELAY)
+            for candidate in _CALIBRATION_DELAYS:
+                stable = True
+                for _ in range(samples):
+                    self.read(_STATUS_BASE, _STATUS_HW_ID, sample, end=1)
+                    try:
+                        self.read(reg_base, reg, sample, candidate)
+                    except OSError:
+                        stable = False
+                        break
+                    if sample != reference:
+                        stable = False
+                        break
+                if stable:
+                    delay = min(_DEFAULT_READ_DELAY, candidate * margin + guard)
+                    break
+            self.read(reg_base, reg, sample, _DEFAULT_READ_DELAY)
+            if sample != reference:
+                delay = _DEFAULT_READ_DELAY
+        except OSError:
+            delay = _DEFAULT_READ_DELAY
+        self.read_delays[reg_base] = delay
+        return delay
+
+    def calibrate_read_delays(self, encoder=False):
+        """Calibrate the settle delay of the GPIO registers and, if ``encoder``
+        is set, of the encoder registers. Returns the stored delays."""
+        if self._drdy is None:
+            self.calibrate_read_delay(_GPIO_BASE, _GPIO_BULK)
+            if encoder:
+                self.calibrate_read_delay(_ENCODER_BASE, _ENCODER_POSITION)
+        return self.read_delays
+
+    def read_start(self, reg_base, reg):
+        """Select a register range for a following `read_finish`.
+
+        This is the first half of `read`. The caller is responsible for
+        waiting the settle delay before calling `read_finish`, which lets it
+        service other devices in the meantime. No other transfer to this
+        device may happen in between."""
         self.write(reg_base, reg)
+
+    def read_finish(self, buf, *, end=None):
+        """Read the register range selected by `read_start` into ``buf``,
+        or into ``buf[:end]`` without slicing it"""
         if self._drdy is not None:
             while self._drdy.value is False:
                 pass
-        else:
-            time.sleep(delay)
         with self.i2c_device as i2c:
-            i2c.readinto(buf)
+            i2c.readinto(buf, end=end)
 
-    def write(self, reg_base, reg, buf=None):
-        """Write an arbitrary I2C register range on the device"""
-        full_buffer = bytearray([reg_base, reg])
-        if buf is not None:
-            full_buffer += buf
+    def write(self, reg_base, reg, buf=None, *, start=0, end=None):
+        """Write an arbitrary I2C register range on the device
 
+        The payload ``buf[start:end]`` is copied into the device's preallocated
+        transfer buffer, so writes up to the buffer size do not allocate."""
+        count = 0
+        if buf is not None:
+            if end is None:
+                end = len(buf)
+            count = end - start
+        if count > _WRITE_BUFFER_SIZE - 2:
+            full_buffer = bytearray([reg_base, reg])
+            full_buffer += buf[start:end]
+            self._write_full(full_buffer, len(full_buffer))
+            return
+        write_buf = self._write_buf
+        for i in range(count):
+            write_buf[2 + i] = buf[start + i]
+        self._write_prepared(reg_base, reg, count)
+
+    def _write_prepared(self, reg_base, reg, count):
+        """Send the ``count`` payload bytes already placed in the transfer buffer"""
+        self._write_buf[0] = reg_base
+        self._write_buf[1] = reg
+        self._write_full(self._write_buf, 2 + count)
+
+    def _write_full(self, full_buffer, end):
         if self._drdy is not None:
             while self._drdy.value is False:
                 pass
         with self.i2c_device as i2c:
-            i2c.write(full_buffer)
+            i2c.write(full_buffer, end=end)
@@ -104,6 +104,9 @@ class Sparkfun_QwiicJoystick:
         # save handle to i2c bus in case address is changed
         self._i2c = i2c
         self._debug = debug
+        # preallocated buffers for read_state burst reads
+        self._state_cmd = bytes([_JOYSTICK_X_MSB])
+        self._state_buf = bytearray(_JOYSTICK_BUTTON - _JOYSTICK_X_MSB + 1)
 
     # public properites
 
@@ -167,6 +170,23 @@ class Sparkfun_QwiicJoystick:
 
     # public functions
 
+    def read_state(self):
+        """Read X, Y and button in one sequential burst of registers 0x03-0x07.
+
+        Both axes are sampled at the same instant and only one register select
+        plus one read go over the bus, into a preallocated buffer.
+        Returns a tuple (x, y, button) with x and y from 0 - 1023 and button
+        0 if down, 1 if up."""
+        buf = self._state_buf
+        with self._device as device:
+            device.write(self._state_cmd)
+            device.readinto(buf)
+        if self._debug:
+            print("$%02X => %s" % (_JOYSTICK_X_MSB, [hex(i) for i in buf]))
+        x = (buf[0] << 8 | buf[1]) >> 6
+        y = (buf[2] << 8 | buf[3]) >> 6
+        return x, y, buf[4]
+
     def set_i2c_address(self, new_address):
         """Change the i2c address of Joystick snd return True if successful."""
         # check range of new address
@@ -0,0 +1,295 @@
+"""
+Hostseitiger Benchmark der Abfragerate unter CPython (python3 loop_bench.py [Mitschnitt]).
+
+Baut die Handler der Drehknöpfe, der NeoKey und des Joysticks wie Main aus der Config auf,
+aber auf einem simulierten Bus (i2c_sim.SimulatedI2C mit Seesaw- und Joystick-Modellen).
+Wird ein mit I2CRecorder.dump() geschriebener Mitschnitt übergeben, spielen die Geräte nach
+dem Aufbau dessen Antworten über i2c_sim.ReplayI2C ab. Gemessen werden je DURATION Sekunden:
+- die Hauptschleife in den Varianten von Main._run_loop (Bus-Scheduler, pipelined, nacheinander)
+- die asyncio-Runtime mit einem Task je Handler (runtime.Runtime)
+ohne Mitschnitt jeweils im Leerlauf und mit ständig gedrehten Drehknöpfen. Ausgegeben werden
+Durchläufe der Hauptschleife pro Sekunde, die Abfragerate je Gerätetyp sowie Bustransaktionen
+und simulierte Buszeit pro Sekunde. MacroPad und Display hängen an board und fehlen in der Messung.
+
+Die Treiber importieren digitalio, micropython und busio nur für Konstanten und Typangaben;
+ohne Blinka werden dafür minimale Ersatzmodule bereitgestellt (busio.I2C = SimulatedI2C).
+"""
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib'))
+
+import i2c_sim
+
+
+class _Constants:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class _PixelBuf:
+    def __init__(self, n, byteorder='GRB', brightness=1.0, auto_write=False):
+        self.n = n
+        self.bpp = len(byteorder)
+        self.auto_write = auto_write
+
+
+def _provide_host_modules():
+    """
+    Stellt die CircuitPython-Module bereit, die unter CPython ohne Blinka fehlen.
+    """
+    stand_ins = {
+        'micropython': {'const': lambda value: value},
+        'digitalio': {'Direction': _Constants(INPUT='input', OUTPUT='output'),
+                      'Pull': _Constants(UP='up', DOWN='down'),
+                      'DriveMode': _Constants(PUSH_PULL='push_pull', OPEN_DRAIN='open_drain')},
+        'busio': {'I2C': i2c_sim.SimulatedI2C},
+        'adafruit_pixelbuf': {'PixelBuf': _PixelBuf},
+    }
+    for name, attributes in stand_ins.items():
+        try:
+            __import__(name)
+        except ImportError:
+            module = types.ModuleType(name)
+            module.__dict__.update(attributes)
+            sys.modules[name] = module
+
+
+_provide_host_modules()
+
+from config import Config
+from adafruit_seesaw.seesaw import read_pipelined
+from bus_scheduler import BusScheduler
+from led_manager import LedManager
+from idle_manager import IdleManager
+from macro_program import MacroRunner, compile_macro
+from runtime import Runtime
+from handler_sideknob import SideKnobHandler
+from handler_sidekeys import SideKeysHandler
+from handler_joystick import JoyStickHandler
+
+DURATION = 2.0
+SETTLE_TIME = 0.001  # Sekunden, die ein simuliertes Seesaw nach dem Register-Select braucht
+TURN_PERIOD = 0.01  # Sekunden zwischen zwei Rastungen je Drehknopf im Szenario 'aktiv'
+CALIBRATED = {}  # Adresse -> kalibrierte Wartezeiten, einmal ermittelt und für jeden Aufbau übernommen
+
+
+class CountingDevice:
+    """
+    Attrappe für Keyboard und Maus, die nur die Aufrufe zählt.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def press(self, *codes):
+        self.calls += 1
+
+    def release(self, *codes):
+        self.calls += 1
+
+    def release_all(self):
+        self.calls += 1
+
+    def move(self, x=0, y=0, wheel=0):
+        self.calls += 1
+
+    def click(self, buttons):
+        self.calls += 1
+
+
+class BenchApp:
+    """
+    App mit einer Belegung für jeden Drehknopf und jede Seitentaste; control() entspricht App.control.
+    """
+    name = 'Bench'
+    macros = []
+
+    def control(self, name, index):
+        return (0x00FF00, compile_macro([0x4F]))
+
+
+class BenchMain:
+    """
+    Die Teile von Main, die die Handler benutzen: Busse, INT-Leitung, LED- und
+    Leerlaufverwaltung, Makro-Interpreter, eine geladene App und die HID-Maus des
+    MacroPads für den Joystick.
+    """
+    def __init__(self, replay=None):
+        self.i2c_bus = i2c_sim.SimulatedI2C(400000)
+        self.knob_models = [self.i2c_bus.add_device(i2c_sim.SimulatedSeesaw(entry[1], SETTLE_TIME))
+                            for entry in Config.SideKnob.sideknob_list]
+        key_models = [self.i2c_bus.add_device(i2c_sim.SimulatedSeesaw(entry[1], SETTLE_TIME))
+                      for entry in Config.SideKeys.sidekey_list]
+        for entry in Config.JoyStick.joystick_list:
+            self.i2c_bus.add_device(i2c_sim.SimulatedJoystick(entry[1]))
+        self.interrupt_line = None
+        if replay is None:
+            self.interrupt_line = i2c_sim.SimulatedInterruptLine(self.knob_models + key_models)
+        self.apps = [BenchApp()]
+        self.bus_scheduler = BusScheduler(Config.Globals.bus_budget) if Config.Globals.bus_budget else None
+        self.leds = LedManager(Config.Globals.led_frame_period, True, Config.Globals.led_brightness,
+                               Config.Globals.led_color_off, self.bus_scheduler,
+                               Config.Globals.led_animation_budget, Config.Globals.led_bus_writes_per_frame,
+                               Config.Globals.led_min_write_spacing)
+        self.idle = IdleManager(self.leds, 0, 0, Config.Globals.idle_dim_brightness, Config.Globals.idle_fade_time)
+        self.keyboard, self.mouse = CountingDevice(), CountingDevice()
+        self.macro_runner = MacroRunner(self.keyboard, self.mouse, lambda app_number: None)
+        self.macropad = _Constants(keyboard=self.keyboard, mouse=self.mouse,
+                                   Mouse=_Constants(LEFT_BUTTON=1, RIGHT_BUTTON=2, MIDDLE_BUTTON=4))
+        self._build_handlers()
+        self.bus = self.i2c_bus
+        if replay is not None:
+            self.bus = replay
+            for device in self.i2c_devices():
+                device.i2c = replay
+        self.bus.transactions = 0
+        self.bus.bus_time = 0.0
+
+    def _build_handlers(self):
+        calibrate = Config.Globals.calibrate_read_delays
+        Config.Globals.calibrate_read_delays = calibrate and not CALIBRATED
+        try:
+            self.sideknobs = [SideKnobHandler(self, entry[1], entry[2], None, entry[0])
+                              for entry in Config.SideKnob.sideknob_list]
+            self.sidekeys = [SideKeysHandler(self, entry[1], entry[2], None, entry[0])
+                             for entry in Config.SideKeys.sidekey_list]
+            self.joysticks = [JoyStickHandler(self, entry[1]) for entry in Config.JoyStick.joystick_list]
+        finally:
+            Config.Globals.calibrate_read_delays = calibrate
+        seesaws = [knob.seesaw for knob in self.sideknobs] + [keys.neoKey for keys in self.sidekeys]
+        for seesaw in seesaws:
+            address = seesaw.i2c_device.device_address
+            if address in CALIBRATED:
+                seesaw.read_delays = dict(CALIBRATED[address])
+            elif calibrate:
+                CALIBRATED[address] = dict(seesaw.read_delays)
+        for interface in self.sideknobs + self.sidekeys:
+            interface.load_app(0, self.apps[0])
+        self.poll_order = self.sideknobs + self.sidekeys + self.joysticks
+
+    def i2c_devices(self):
+        return ([knob.seesaw.i2c_device for knob in self.sideknobs]
+                + [keys.neoKey.i2c_device for keys in self.sidekeys]
+                + [stick.joystick._device for stick in self.joysticks])
+
+
+class Turner:
+    """
+    Dreht im Szenario 'aktiv' alle TURN_PERIOD Sekunden jeden simulierten Drehknopf um eine Rastung.
+    """
+    def __init__(self, models):
+        self.models = models
+        self.last_turn = time.monotonic()
+        self.turns = 0
+
+    def update(self):
+        now = time.monotonic()
+        if now - self.last_turn >= TURN_PERIOD:
+            self.last_turn = now
+            self.turns += 1
+            for model in self.models:
+                model.turn(1)
+
+
+def _due(interface):
+    poll_rate = getattr(interface, 'poll_rate', None)
+    return poll_rate is None or poll_rate.due()
+
+
+def run_loop(main, mode, turner):
+    """
+    Führt den Steuerungsteil von Main._run_loop für DURATION Sekunden aus.
+
+    :param mode: 'scheduler', 'pipelined' oder 'sequential'.
+    :return: Paar (Durchläufe, Dictionary Handler -> Abfragen).
+    """
+    polls = {interface: 0 for interface in main.poll_order}
+    loops = 0
+    end = time.monotonic() + DURATION
+    while time.monotonic() < end:
+        if turner:
+            turner.update()
+        if mode == 'scheduler':
+            for interface in main.poll_order:
+                if _due(interface):
+                    main.bus_scheduler.submit(interface.BUS_PRIORITY, interface, 'poll', interface.poll)
+                    polls[interface] += 1
+            main.bus_scheduler.run_tick()
+        elif mode == 'pipelined':
+            pollers = []
+            for interface in main.poll_order:
+                if _due(interface):
+                    pollers.append(interface.poll())
+                    polls[interface] += 1
+            read_pipelined(pollers)
+        else:
+            for interface in main.poll_order:
+                if _due(interface):
+                    interface.update()
+                    polls[interface] += 1
+        main.idle.update()
+        main.leds.update()
+        loops += 1
+    return loops, polls
+
+
+def run_async(main, turner):
+    """
+    Betreibt jeden Handler wie Main._run_async als eigenen Task für DURATION Sekunden.
+
+    :return: Dictionary Handler -> Abfragen.
+    """
+    runtime = Runtime()
+    tasks = {}
+    for interface in main.sideknobs:
+        tasks[interface] = runtime.add('knob', interface, Config.SideKnob.poll_period)
+    for interface in main.sidekeys:
+        tasks[interface] = runtime.add('keys', interface, Config.SideKeys.poll_period)
+    for interface in main.joysticks:
+        tasks[interface] = runtime.add('joystick', interface, Config.JoyStick.poll_period)
+    runtime.add('leds', main.leds, Config.Globals.led_frame_period)
+    runtime.add('idle', main.idle, Config.Globals.led_frame_period)
+    if turner:
+        runtime.add('turner', turner, TURN_PERIOD)
+    if main.bus_scheduler:
+        # Die Tasks lesen selbst; der Scheduler schreibt nur die eingereichten LED-Jobs
+        runtime.add('bus', main.bus_scheduler, Config.Globals.bus_period)
+    runtime.run(DURATION)
+    return {interface: task.polls for interface, task in tasks.items()}
+
+
+def report(name, main, loops, polls):
+    def rate(interfaces):
+        if not interfaces:
+            return 0.0
+        return sum(polls[interface] for interface in interfaces) / len(interfaces) / DURATION
+    loop_rate = "%10.0f" % (loops / DURATION) if loops is not None else "%10s" % '-'
+    print("%-22s %s %10.1f %10.1f %10.1f %10.0f %10.1f" % (
+        name, loop_rate, rate(main.sideknobs), rate(main.sidekeys), rate(main.joysticks),
+        main.bus.transactions / DURATION, main.bus.bus_time / DURATION * 1000))
+
+
+def main(replay_path=None):
+    modes = []
+    if Config.Globals.bus_budget:
+        modes.append('scheduler')
+    modes += ['pipelined', 'sequential']
+    print("%-22s %10s %10s %10s %10s %10s %10s" % ('Variante', 'Schleife/s', 'Knopf/s', 'NeoKey/s',
+                                                   'Joystick/s', 'I2C/s', 'Bus ms/s'))
+    # Ein Mitschnitt liefert seine eigenen Ereignisse
+    for scenario in (('mitschnitt',) if replay_path else ('leerlauf', 'aktiv')):
+        for mode in modes + ['asyncio']:
+            replay = i2c_sim.ReplayI2C.load(replay_path, 400000) if replay_path else None
+            bench = BenchMain(replay)
+            turner = Turner(bench.knob_models) if scenario == 'aktiv' else None
+            if mode == 'asyncio':
+                loops, polls = None, run_async(bench, turner)
+            else:
+                loops, polls = run_loop(bench, mode, turner)
+            report("%s %s" % (mode, scenario), bench, loops, polls)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,161 @@
+"""
+Hostseitiger Benchmark der Makroausführung unter CPython (python3 macro_bench.py).
+
+Misst die Dispatch-Kosten je Ereignis für die bisherige Auswertung der rohen Makrolisten
+(isinstance-Prüfungen, Textvergleiche, Zerlegen von 'AppSwitch_N') und für die beim Laden
+übersetzten Programme mit dem gemeinsamen MacroRunner. Keyboard und Maus sind Attrappen,
+die nur die HID-Aufrufe zählen; gemessen wird also allein der Dispatch. Angegeben wird
+die kürzeste von REPEATS Messungen, da einzelne Läufe auf dem Host stark streuen.
+"""
+import time
+from macro_program import compile_macro, MacroRunner
+
+SHIFT, CONTROL, ALT = 0xE1, 0xE0, 0xE2
+F2, F9, RIGHT_ARROW, C = 0x3B, 0x42, 0x4F, 0x06
+
+# Typische Einträge aus macros/0-win-quanta.py
+KEY_MACROS = [[F2], [SHIFT, F9], [CONTROL, 'k'], [CONTROL, C], [{'buttons': 1, 'x': 5}]]
+KNOB_MACROS = [[SHIFT, 'Wheel up'], [CONTROL, 'Mouse left'], [RIGHT_ARROW, RIGHT_ARROW, RIGHT_ARROW]]
+SIDEKEY_MACROS = [['AppSwitch_0'], [CONTROL, C]]
+REPEATS = 5
+
+
+class CountingDevice:
+    """
+    Attrappe für Keyboard und Maus, die nur die Aufrufe zählt.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def press(self, *codes):
+        self.calls += 1
+
+    def release(self, *codes):
+        self.calls += 1
+
+    def release_all(self):
+        self.calls += 1
+
+    def move(self, x=0, y=0, wheel=0):
+        self.calls += 1
+
+
+def legacy_key(keyboard, mouse, sequence, press):
+    """Bisherige Auswertung in MacroPadHandler.process_macro_sequence."""
+    for item in sequence:
+        if isinstance(item, int):
+            if item >= 0 and press:
+                keyboard.press(item)
+            elif item < 0 or not press:
+                keyboard.release(abs(item))
+        elif isinstance(item, dict):
+            if 'buttons' in item and (press or item['buttons'] < 0):
+                method = mouse.press if press else mouse.release
+                method(abs(item['buttons']))
+            mouse.move(item.get('x', 0), item.get('y', 0), item.get('wheel', 0))
+
+
+def legacy_knob(keyboard, mouse, macro):
+    """Bisherige Auswertung in SideKnobHandler._execute_macro."""
+    for action in macro:
+        if action == 'Wheel up':
+            mouse.move(wheel=1)
+        elif action == 'Wheel down':
+            mouse.move(wheel=-1)
+        elif action == 'Mouse right':
+            mouse.move(x=10)
+        elif action == 'Mouse left':
+            mouse.move(x=-10)
+        else:
+            keyboard.press(action)
+            keyboard.release_all()
+
+
+def legacy_sidekey(keyboard, key_macro, app_switch):
+    """Bisherige Auswertung in SideKeysHandler._handle_key_press und _handle_key_release."""
+    if key_macro and isinstance(key_macro[0], str) and 'appswitch_' in key_macro[0].lower():
+        app_switch(int(key_macro[0].split('_')[-1]))
+    else:
+        for command in key_macro:
+            if isinstance(command, int):
+                keyboard.press(command)
+    for command in key_macro:
+        if isinstance(command, int):
+            keyboard.release(command)
+
+
+def measure(old, new, events):
+    """
+    Misst beide Varianten abwechselnd, damit Schwankungen des Hosts beide gleich treffen.
+
+    :return: Paar der mittleren Dauern je Ereignis in Mikrosekunden, je die kürzeste von REPEATS Messungen.
+    """
+    best = [None, None]
+    for _ in range(REPEATS):
+        for index, function in enumerate((old, new)):
+            start = time.perf_counter()
+            function()
+            duration = time.perf_counter() - start
+            if best[index] is None or duration < best[index]:
+                best[index] = duration
+    return best[0] / events * 1e6, best[1] / events * 1e6
+
+
+def main(rounds=20000):
+    keyboard, mouse = CountingDevice(), CountingDevice()
+    runner = MacroRunner(keyboard, mouse, lambda app_number: None)
+    key_programs = [compile_macro(macro) for macro in KEY_MACROS]
+    knob_programs = [compile_macro(macro).tap for macro in KNOB_MACROS]
+    sidekey_programs = [compile_macro(macro) for macro in SIDEKEY_MACROS]
+
+    def old_keys():
+        for _ in range(rounds):
+            for sequence in KEY_MACROS:
+                legacy_key(keyboard, mouse, sequence, True)
+                legacy_key(keyboard, mouse, sequence, False)
+
+    def new_keys():
+        for _ in range(rounds):
+            for macro in key_programs:
+                runner.run(macro.press)
+                runner.run(macro.release)
+
+    def old_knob():
+        for _ in range(rounds):
+            for macro in KNOB_MACROS:
+                legacy_knob(keyboard, mouse, macro)
+
+    def new_knob():
+        for _ in range(rounds):
+            for program in knob_programs:
+                runner.run(program)
+
+    def old_sidekeys():
+        for _ in range(rounds):
+            for macro in SIDEKEY_MACROS:
+                legacy_sidekey(keyboard, macro, runner.app_switch)
+
+    def new_sidekeys():
+        for _ in range(rounds):
+            for macro in sidekey_programs:
+                runner.run(macro.press)
+                runner.run(macro.release)
+
+    cases = [('MacroPad-Taste', old_keys, new_keys, len(KEY_MACROS)),
+             ('Drehknopf-Rastung', old_knob, new_knob, len(KNOB_MACROS)),
+             ('Seitentaste', old_sidekeys, new_sidekeys, len(SIDEKEY_MACROS))]
+    print("%-18s %12s %12s %12s %12s" % ('Ereignis', 'vorher us', 'nachher us', 'HID vorher', 'HID nachher'))
+    for name, old, new, count in cases:
+        events = rounds * count
+        old_time, new_time = measure(old, new, events)
+        keyboard.calls = mouse.calls = 0
+        old()
+        old_calls = (keyboard.calls + mouse.calls) / events
+        keyboard.calls = mouse.calls = 0
+        new()
+        new_calls = (keyboard.calls + mouse.calls) / events
+        print("%-18s %12.2f %12.2f %12.2f %12.2f" % (name, old_time, new_time, old_calls, new_calls))
+
+
+if __name__ == '__main__':
+    main()
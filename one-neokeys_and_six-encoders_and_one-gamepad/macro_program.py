@@ -0,0 +1,166 @@
+# Opcodes der Makroprogramme; jede Anweisung ist ein Paar (Opcode, Operandentupel)
+OP_KEY_PRESS = 0         # (Keycode, ...), in einem HID-Report gedrückt
+OP_KEY_RELEASE = 1       # (Keycode, ...), in einem HID-Report losgelassen
+OP_KEY_RELEASE_ALL = 2   # ()
+OP_MOUSE_PRESS = 3       # (Maustasten,)
+OP_MOUSE_RELEASE = 4     # (Maustasten,)
+OP_MOUSE_MOVE = 5        # (x, y, wheel)
+OP_APP_SWITCH = 6        # (App-Index,)
+
+# Sondertasten als Text in der Makrosequenz (Groß-/Kleinschreibung egal) -> (x, y, wheel)
+MOUSE_ACTIONS = {
+    'wheel up': (0, 0, 1),
+    'wheel down': (0, 0, -1),
+    'mouse right': (10, 0, 0),
+    'mouse left': (-10, 0, 0),
+}
+APP_SWITCH_PREFIX = 'appswitch_'
+
+
+class MacroProgram:
+    """
+    Vorübersetztes Aktionsprogramm: eine Folge von Anweisungen (Opcode, Operanden).
+    """
+    def __init__(self, code):
+        """
+        :param code: Tupel der Anweisungen als Paare (Opcode, Operandentupel).
+        """
+        self.code = code
+
+    def __len__(self):
+        return len(self.code)
+
+
+EMPTY_PROGRAM = MacroProgram(())
+
+
+class CompiledMacro:
+    """
+    Übersetzung einer Makrosequenz in die Programme, die die Handler ausführen.
+
+    press und release laufen beim Drücken und Loslassen einer Taste (MacroPad, Seitentasten,
+    Taster der Drehknöpfe), tap bei einer Rastung eines Drehknopfs: Jede Taste wird einzeln
+    gedrückt und sofort wieder losgelassen.
+    """
+    def __init__(self, press, release, tap):
+        self.press = press
+        self.release = release
+        self.tap = tap
+
+
+EMPTY_MACRO = CompiledMacro(EMPTY_PROGRAM, EMPTY_PROGRAM, EMPTY_PROGRAM)
+
+
+class _ProgramBuilder:
+    """
+    Sammelt Opcodes und Operanden; aufeinanderfolgende Tastendrücke bzw. -freigaben
+    werden zu einer Anweisung (einem HID-Report) zusammengefasst.
+    """
+    def __init__(self):
+        self.ops = []
+        self.args = []
+
+    def add(self, op, arg=()):
+        self.ops.append(op)
+        self.args.append(arg)
+
+    def add_keys(self, op, keycode):
+        if self.ops and self.ops[-1] == op:
+            self.args[-1] = self.args[-1] + (keycode,)
+        else:
+            self.add(op, (keycode,))
+
+    def build(self):
+        if not self.ops:
+            return EMPTY_PROGRAM
+        return MacroProgram(tuple(zip(self.ops, self.args)))
+
+
+def compile_macro(sequence, app_count=None):
+    """
+    Übersetzt eine Makrosequenz beim Laden der Makros in ein CompiledMacro.
+
+    Verstanden werden Keycodes (negativ = beim Drücken loslassen), Dictionaries mit
+    'buttons', 'x', 'y' und 'wheel' für die Maus sowie die Texte 'Wheel up', 'Wheel down',
+    'Mouse right', 'Mouse left' und 'AppSwitch_N'. Andere Texte werden ignoriert, ebenso
+    ein 'AppSwitch_N' mit ungültiger App-Nummer (mit Fehlermeldung beim Laden).
+
+    :param sequence: Die Makrosequenz aus der Makrodatei (None = leeres Makro).
+    :param app_count: Anzahl der Apps im Makroverzeichnis, None = App-Nummer nicht prüfen.
+    :return: Das übersetzte Makro.
+    """
+    if not sequence:
+        return EMPTY_MACRO
+    press = _ProgramBuilder()
+    release = _ProgramBuilder()
+    tap = _ProgramBuilder()
+    for item in sequence:
+        if isinstance(item, int):
+            if item >= 0:
+                press.add_keys(OP_KEY_PRESS, item)
+                tap.add_keys(OP_KEY_PRESS, item)
+                tap.add(OP_KEY_RELEASE_ALL)
+            else:
+                press.add_keys(OP_KEY_RELEASE, -item)
+                tap.add_keys(OP_KEY_RELEASE, -item)
+            release.add_keys(OP_KEY_RELEASE, abs(item))
+        elif isinstance(item, dict):
+            buttons = item.get('buttons', 0)
+            move = (item.get('x', 0), item.get('y', 0), item.get('wheel', 0))
+            if buttons:
+                press.add(OP_MOUSE_PRESS, (abs(buttons),))
+                tap.add(OP_MOUSE_PRESS, (abs(buttons),))
+            press.add(OP_MOUSE_MOVE, move)
+            tap.add(OP_MOUSE_MOVE, move)
+            if buttons:
+                tap.add(OP_MOUSE_RELEASE, (abs(buttons),))
+            if buttons < 0:
+                release.add(OP_MOUSE_RELEASE, (-buttons,))
+            release.add(OP_MOUSE_MOVE, move)
+        elif isinstance(item, str):
+            name = item.lower()
+            if name in MOUSE_ACTIONS:
+                press.add(OP_MOUSE_MOVE, MOUSE_ACTIONS[name])
+                tap.add(OP_MOUSE_MOVE, MOUSE_ACTIONS[name])
+            elif name.startswith(APP_SWITCH_PREFIX):
+                try:
+                    app_number = int(name.split('_')[-1])
+                except ValueError:
+                    app_number = -1
+                if app_number < 0 or (app_count is not None and app_number >= app_count):
+                    print("Fehler: Ungültige App-Nummer in Makro", item)
+                    continue
+                press.add(OP_APP_SWITCH, (app_number,))
+                tap.add(OP_APP_SWITCH, (app_number,))
+    return CompiledMacro(press.build(), release.build(), tap.build())
+
+
+class MacroRunner:
+    """
+    Gemeinsamer Interpreter der Makroprogramme für alle Handler.
+
+    Der Opcode ist der Index in eine Tabelle gebundener Methoden; jede Anweisung kostet
+    damit einen Tabellenzugriff und einen Aufruf, ohne Typprüfungen oder Textvergleiche.
+    """
+    def __init__(self, keyboard, mouse, app_switch):
+        """
+        :param keyboard: Das HID-Keyboard.
+        :param mouse: Die HID-Maus.
+        :param app_switch: Funktion, die mit dem App-Index zur App wechselt.
+        """
+        self.keyboard = keyboard
+        self.mouse = mouse
+        self.app_switch = app_switch
+        # Reihenfolge entspricht den OP_*-Werten
+        self.dispatch = (keyboard.press, keyboard.release, keyboard.release_all,
+                         mouse.press, mouse.release, mouse.move, app_switch)
+
+    def run(self, program):
+        """
+        Führt ein Makroprogramm aus.
+
+        :param program: Das MacroProgram.
+        """
+        dispatch = self.dispatch
+        for op, arg in program.code:
+            dispatch[op](*arg)
@@ -0,0 +1,85 @@
+import math
+from config import Config
+
+class AdaptivePollRate:
+    """
+    Aktivitätsgesteuerte Abfragerate eines Geräts.
+
+    Ein unberührtes Gerät wird mit der langsamen Leerlaufperiode abgefragt. Die erste
+    erkannte Änderung schaltet sofort auf die schnelle Aktivperiode um; bleibt das Gerät
+    für quiet_time Sekunden unverändert, fällt die Rate wieder auf den Leerlauf zurück.
+
+    Perioden und Zeitpunkte werden in Millisekunden (get_millis/ticks_diff) geführt, damit
+    die Abstände auch nach langer Laufzeit auf dem Gerät genau bleiben.
+    """
+    def __init__(self, idle_period, active_period, quiet_time):
+        """
+        Initialisiert die Abfragerate im Leerlauf.
+
+        :param idle_period: Sekunden zwischen zwei Abfragen im Leerlauf.
+        :param active_period: Sekunden zwischen zwei Abfragen bei Aktivität.
+        :param quiet_time: Sekunden ohne Änderung bis zur Rückkehr in den Leerlauf.
+        """
+        self.idle_period = idle_period * 1000  # Millisekunden
+        self.active_period = active_period * 1000
+        self.quiet_time = quiet_time * 1000
+        self.period = self.idle_period
+        self.last_poll = None  # get_millis() der letzten Abfrage
+        self.last_activity = None
+        self.polls = 0
+        self.skipped = 0  # Abfragen, die eine feste Abfrage mit active_period ausgeführt hätte
+        self.last_fixed = None  # get_millis() der letzten Abfrage einer gedachten festen Abfrage
+
+    def due(self):
+        """
+        Prüft, ob die nächste Abfrage fällig ist. Als übersprungen zählt eine nicht fällige
+        Abfrage nur, wenn eine feste Abfrage mit active_period jetzt gelesen hätte; der Zähler
+        ist damit unabhängig davon, wie oft die Hauptschleife nachfragt, und entspricht den
+        eingesparten Buszugriffen.
+
+        :return: True, wenn seit der letzten Abfrage mindestens eine Periode vergangen ist.
+        """
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        now = Config.GlobalFunctions.get_millis()
+        if self.last_poll is None or ticks_diff(now, self.last_poll) >= self.period:
+            return True
+        if ticks_diff(now, self.last_fixed) >= self.active_period:
+            self.skipped += 1
+            self.last_fixed = now
+        return False
+
+    def count_skipped(self, period):
+        """
+        Zählt für einen Abfrager, der selbst bis zur nächsten Abfrage wartet (asyncio-Runtime),
+        die Abfragen, die eine feste Abfrage mit active_period in diesem Abstand zusätzlich
+        ausgeführt hätte; entspricht der Zählung in due().
+
+        :param period: Millisekunden von dieser bis zur nächsten Abfrage.
+        """
+        fixed = math.ceil(round(period / self.active_period, 6))
+        if fixed > 1:
+            self.skipped += fixed - 1
+
+    def record(self, changed):
+        """
+        Vermerkt eine durchgeführte Abfrage und passt die Periode an.
+
+        :param changed: True, wenn die Abfrage eine Änderung am Gerät ergeben hat.
+        """
+        now = Config.GlobalFunctions.get_millis()
+        self.last_poll = now
+        self.last_fixed = now
+        self.polls += 1
+        if changed:
+            self.last_activity = now
+            self.period = self.active_period
+        elif (self.period != self.idle_period
+              and Config.GlobalFunctions.ticks_diff(now, self.last_activity) >= self.quiet_time):
+            self.period = self.idle_period
+
+    @property
+    def rate(self):
+        """
+        Gibt die aktuelle Soll-Abfragerate in Hz zurück.
+        """
+        return 1000 / self.period if self.period else float('inf')
@@ -0,0 +1,125 @@
+import time
+import asyncio
+from config import Config
+
+class PollTask:
+    """
+    Ein Handler, der als eigener asyncio-Task mit fester Abfrageperiode läuft.
+
+    Handler mit einer poll-Methode (Generator, der Wartezeiten in Sekunden liefert)
+    geben während ihrer I2C-Wartezeiten die Kontrolle ab. Handler ohne poll werden
+    über update aufgerufen. Besitzt der Handler eine adaptive Abfragerate (poll_rate),
+    ersetzt deren aktuelle Periode die feste Periode; die dabei gegenüber der festen
+    Periode eingesparten Abfragen werden in poll_rate.skipped gezählt. Die Abstände werden
+    mit get_millis/ticks_diff gemessen, time.monotonic() dient nur der groben Statistik (rate).
+    """
+    def __init__(self, name, handler, period):
+        """
+        Initialisiert eine neue Instanz der PollTask-Klasse.
+
+        :param name: Name des Tasks (z.B. der Name aus der Config-Liste).
+        :param handler: Das Handler-Objekt mit poll- oder update-Methode.
+        :param period: Abfrageperiode in Sekunden, gemessen von Start zu Start.
+        """
+        self.name = name
+        self.handler = handler
+        self.period = period * 1000  # Millisekunden
+        self.polls = 0
+        self.busy_time = 0.0
+        self.max_interval = 0.0
+        self.started = None
+        self.last_start = None
+
+    async def run(self):
+        """
+        Fragt den Handler endlos ab und führt die Statistik.
+        """
+        poll = getattr(self.handler, 'poll', None)
+        poll_rate = getattr(self.handler, 'poll_rate', None)
+        get_millis = Config.GlobalFunctions.get_millis
+        ticks_diff = Config.GlobalFunctions.ticks_diff
+        self.started = time.monotonic()
+        while True:
+            start = get_millis()
+            if self.last_start is not None:
+                self.max_interval = max(self.max_interval, ticks_diff(start, self.last_start) / 1000)
+            self.last_start = start
+            if poll:
+                for delay in poll():
+                    await asyncio.sleep(delay)
+            else:
+                self.handler.update()
+            self.polls += 1
+            busy = ticks_diff(get_millis(), start)
+            self.busy_time += busy / 1000
+            period = self.period
+            if poll_rate:
+                period = poll_rate.period
+                poll_rate.count_skipped(period)
+            await asyncio.sleep(max(0, period - busy) / 1000)
+
+    @property
+    def rate(self):
+        """
+        Gibt die bisherige Abfragerate in Hz zurück.
+        """
+        if self.started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return self.polls / elapsed if elapsed > 0 else 0.0
+
+
+class Runtime:
+    """
+    Kooperative asyncio-Runtime, die jeden Handler als eigenen Task betreibt.
+
+    Ein langsames I2C-Gerät blockiert damit nicht mehr die Abfrage der übrigen Geräte:
+    Während ein Gerät seine Settle-Zeit abwartet, laufen die anderen Tasks weiter.
+    Die Runtime importiert keine Board-Module und läuft auch unter CPython.
+    """
+    def __init__(self):
+        """
+        Initialisiert eine neue, leere Runtime.
+        """
+        self.tasks = []
+
+    def add(self, name, handler, period):
+        """
+        Fügt einen Handler als Task hinzu.
+
+        :param name: Name des Tasks.
+        :param handler: Das Handler-Objekt mit poll- oder update-Methode.
+        :param period: Abfrageperiode in Sekunden.
+        :return: Die erzeugte PollTask-Instanz.
+        """
+        task = PollTask(name, handler, period)
+        self.tasks.append(task)
+        return task
+
+    async def _main(self, duration):
+        """
+        Startet alle Tasks und wartet entweder endlos oder für die angegebene Dauer.
+        """
+        tasks = [asyncio.create_task(task.run()) for task in self.tasks]
+        if duration is None:
+            await asyncio.gather(*tasks)
+        else:
+            await asyncio.sleep(duration)
+            for task in tasks:
+                task.cancel()
+
+    def run(self, duration=None):
+        """
+        Führt die Runtime aus.
+
+        :param duration: Laufzeit in Sekunden; None läuft endlos (Normalbetrieb).
+        """
+        asyncio.run(self._main(duration))
+
+    def stats(self):
+        """
+        Gibt die Abfragestatistik aller Tasks zurück.
+
+        :return: Dictionary Name -> (Rate in Hz, längster Abstand zwischen zwei Abfragen in s).
+        """
+        return {task.name: (task.rate, task.max_interval) for task in self.tasks}
@@ -0,0 +1,34 @@
+"""
+Gemeinsame Einrichtung der Host-Tests unter CPython, Aufruf im Projektverzeichnis mit
+"pytest tests". ("python3 -m pytest" stellt das Projektverzeichnis mit code.py vor die
+Standardbibliothek und scheitert daher schon beim Start von pytest.)
+
+Projektverzeichnis und lib/ kommen in den Suchpfad, damit die Tests dieselben Module
+wie das Gerät importieren. adafruit_pixelbuf liegt in lib/ nur als .mpy vor; ist das
+gleichnamige Paket auf dem Host nicht installiert, wird ein minimaler Ersatz
+bereitgestellt, der nur den Pixelpuffer hält. Die Tests rufen NeoPixel._transmit direkt
+mit eigenen Puffern auf und brauchen die Farbumrechnung von PixelBuf nicht.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# lib/ vor installierte Pakete, das Projektverzeichnis hinter die Standardbibliothek (code.py)
+sys.path.insert(0, os.path.join(ROOT, 'lib'))
+sys.path.append(ROOT)
+
+
+class _PixelBuf:
+    def __init__(self, n, byteorder='GRB', brightness=1.0, auto_write=False):
+        self.n = n
+        self.bpp = len(byteorder)
+        self.auto_write = auto_write
+
+
+try:
+    import adafruit_pixelbuf  # noqa: F401
+except ImportError:
+    _module = types.ModuleType('adafruit_pixelbuf')
+    _module.PixelBuf = _PixelBuf
+    sys.modules['adafruit_pixelbuf'] = _module
@@ -0,0 +1,127 @@
+"""
+Bytes auf dem Bus beim Delta-Versand der Seesaw-NeoPixel (lib/adafruit_seesaw/neopixel.py).
+
+Jeder Fall wird zweimal übertragen: mit Schattenkopie (nur geänderte Bereiche) und nach
+invalidate() als vollständiger Frame wie bisher. Gezählt wird mit I2CRecorder über
+RecordingI2CDevice am simulierten Bus; je Transaktion zählt das Adressbyte mit. Mit
+"pytest -s tests/test_neopixel_delta.py" wird die Vergleichstabelle ausgegeben.
+"""
+import pytest
+
+from i2c_sim import SimulatedI2C, SimulatedSeesaw
+from adafruit_bus_device.i2c_device import I2CRecorder, RecordingI2CDevice
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.neopixel import NeoPixel, _MERGE_GAP
+
+ADDRESS = 0x30
+BPP = 3
+OFF = (0, 0, 0)
+APP_A = [(0x00, 0x40, 0x00), (0x80, 0x20, 0x00), (0x00, 0x00, 0x80), (0x20, 0x30, 0x20)]
+APP_B = [(0x40, 0x00, 0x00), (0x00, 0x40, 0x40), (0x80, 0x00, 0x80), (0x20, 0x30, 0x20)]
+PRESSED = (0xFF, 0x10, 0x40)
+
+
+def frame(colors):
+    buffer = bytearray()
+    for color in colors:
+        buffer.extend(color)
+    return buffer
+
+
+class Strip:
+    """
+    NeoPixel eines NeoKey 1x4 am simulierten Bus mit Mitschnitt aller Transaktionen.
+    """
+    def __init__(self, count=4):
+        bus = SimulatedI2C()
+        bus.add_device(SimulatedSeesaw(ADDRESS, settle_time=0.0))
+        seesaw = Seesaw(bus, ADDRESS, reset=False)
+        self.pixels = NeoPixel(seesaw, 3, count, auto_write=False)
+        self.recorder = I2CRecorder(64, data_size=32)
+        seesaw.i2c_device = RecordingI2CDevice(seesaw.i2c_device, self.recorder)
+
+    def send(self, buffer, full=False):
+        """
+        Überträgt einen Frame.
+
+        :return: Liste der Schreibzugriffe als (Länge, Daten) und Bytes auf dem Bus.
+        """
+        if full:
+            self.pixels.invalidate()
+        self.recorder.clear()
+        self.pixels._transmit(buffer)
+        writes = [(length, data) for _, _, read, length, data in self.recorder.entries() if not read]
+        return writes, sum(length + 1 for length, _ in writes)
+
+
+def pixel_writes(writes):
+    """
+    :return: (Offset, Anzahl Datenbytes) je _NEOPIXEL_BUF-Schreibzugriff.
+    """
+    return [(data[2] << 8 | data[3], length - 4) for length, data in writes if data[:2] == b'\x0e\x04']
+
+
+# Ablauf: (Name, Frame vorher, Frame nachher)
+PATTERNS = [
+    ('Taste drücken', APP_A, [APP_A[0], PRESSED, APP_A[2], APP_A[3]]),
+    ('Taste loslassen', [APP_A[0], PRESSED, APP_A[2], APP_A[3]], APP_A),
+    ('App-Wechsel', APP_A, APP_B),
+    ('LEDs aus', APP_A, [OFF] * 4),
+    ('unverändert', APP_A, APP_A),
+]
+
+
+def test_bytes_on_the_wire():
+    rows = []
+    for name, before, after in PATTERNS:
+        strip = Strip()
+        strip.send(frame(before))
+        _, delta = strip.send(frame(after))
+        strip.send(frame(before))
+        _, full = strip.send(frame(after), full=True)
+        rows.append((name, full, delta))
+        assert delta <= full
+    print()
+    print("%-16s %10s %10s" % ('Ablauf', 'voll B', 'Delta B'))
+    for name, full, delta in rows:
+        print("%-16s %10d %10d" % (name, full, delta))
+    results = {name: (full, delta) for name, full, delta in rows}
+    # Voller Frame: 12 Datenbytes + Kopf (2 Register, 2 Offset) + Adresse, dann SHOW (2 + Adresse)
+    # Ausschalten: alles außer dem ohnehin leeren ersten Byte
+    assert results['LEDs aus'] == (20, 19)
+    # App-Wechsel: die gleich bleibende letzte Taste und unveränderte Randbytes entfallen
+    assert results['App-Wechsel'] == (20, 15)
+    # Eine Taste: nur ihre 3 Farbbytes an Offset 3
+    assert results['Taste drücken'] == (20, 11)
+    assert results['Taste loslassen'] == (20, 11)
+    # Unveränderter Frame: weder Daten noch SHOW
+    assert results['unverändert'] == (20, 0)
+
+
+def test_single_key_writes_its_offset():
+    strip = Strip()
+    strip.send(frame(APP_A))
+    writes, _ = strip.send(frame([APP_A[0], APP_A[1], PRESSED, APP_A[3]]))
+    assert pixel_writes(writes) == [(2 * BPP, BPP)]
+    assert writes[-1][1][:2] == b'\x0e\x05'  # SHOW
+
+
+@pytest.mark.parametrize('gap, expected', [
+    (_MERGE_GAP - 1, [(0, _MERGE_GAP + 1)]),  # zu kleine Lücke: ein gemeinsamer Schreibzugriff
+    (_MERGE_GAP, [(0, 1), (_MERGE_GAP + 1, 1)]),  # ab _MERGE_GAP unveränderten Bytes: zwei
+])
+def test_merge_gap(gap, expected):
+    strip = Strip()
+    buffer = frame(APP_A)
+    strip.send(buffer)
+    changed = bytearray(buffer)
+    changed[0] ^= 0xFF
+    changed[gap + 1] ^= 0xFF
+    writes, _ = strip.send(changed)
+    assert pixel_writes(writes) == expected
+
+
+def test_long_range_is_chunked():
+    strip = Strip(count=12)
+    writes, _ = strip.send(bytearray(range(36)))
+    assert pixel_writes(writes) == [(0, 22), (22, 14)]
@@ -0,0 +1,188 @@
+"""
+Prüft, dass die Abfragepfade des Seesaw-Treibers (lib/adafruit_seesaw/seesaw.py) nach dem
+Aufwärmen keine Puffer mehr anlegen.
+
+Gezählt wird mit tracemalloc auf zwei Arten:
+- Während jeder Bustransaktion (im simulierten Bus) wird ein Snapshot genommen. Alles, was
+  der Treiber für die Übertragung anlegt (Sende- und Empfangspuffer, Slices, struct.pack),
+  ist in diesem Moment noch lebendig und erscheint mit einer Zeile aus seesaw.py,
+  neopixel.py oder i2c_device.py.
+- Nach vielen Durchläufen darf der Treiber keinen zusätzlichen Speicher halten.
+"""
+import linecache
+import tracemalloc
+
+import pytest
+
+from i2c_sim import SimulatedI2C, SimulatedSeesaw
+from adafruit_seesaw.seesaw import Seesaw, _uint32_masked, _int32
+from adafruit_seesaw.neopixel import NeoPixel
+
+DRIVER_FILES = ('*/adafruit_seesaw/seesaw.py', '*/adafruit_seesaw/neopixel.py',
+                '*/adafruit_bus_device/i2c_device.py')
+ADDRESS = 0x36
+BUTTON_MASK = 1 << 24
+ROUNDS = 200
+SMALL_INT_LIMIT = 1 << 30  # CircuitPython: ab 2**30 (bzw. unter -2**30) ein Long-Int im Heap
+
+
+# Zeilen, deren Allokation nur unter CPython entsteht, je mit Begründung für MicroPython.
+# Jede Zeile ist einzeln mit Datei und Quelltext aufgeführt; ändert sich eine davon,
+# wird sie wieder gezählt und muss neu beurteilt werden.
+CPYTHON_ONLY = {
+    # CPython legt für with die gebundene Methode __exit__ an. MicroPython lädt sie mit
+    # mp_load_method als Funktion und self in zwei Stack-Plätze, ohne Objekt im Heap.
+    ('seesaw.py', 'with self.i2c_device as i2c:'):
+        'read_finish/_write_full: __exit__ liegt auf dem Stack',
+}
+
+
+def _cpython_only(frame):
+    """
+    :return: True, wenn die Allokation aus einer Zeile in CPYTHON_ONLY stammt.
+    """
+    line = linecache.getline(frame.filename, frame.lineno).strip()
+    return (frame.filename.rsplit('/', 1)[-1], line) in CPYTHON_ONLY
+
+
+def driver_blocks():
+    """
+    :return: Anzahl der lebendigen Allokationen aus den Treiberdateien.
+    """
+    filters = [tracemalloc.Filter(True, pattern) for pattern in DRIVER_FILES]
+    snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+    return sum(stat.count for stat in snapshot.statistics('lineno')
+               if not _cpython_only(stat.traceback[0]))
+
+
+class SnapshotI2C(SimulatedI2C):
+    """
+    Simulierter Bus, der bei jeder Transaktion die Allokationen des Treibers zählt, die
+    über den Ruhezustand (start_watch) hinaus lebendig sind.
+    """
+    def __init__(self):
+        super().__init__()
+        self.baseline = None
+        self.driver_blocks = 0
+
+    def start_watch(self):
+        self.baseline = driver_blocks()
+
+    def stop_watch(self):
+        self.baseline = None
+
+    def _snapshot(self):
+        if self.baseline is not None:
+            self.driver_blocks += max(0, driver_blocks() - self.baseline)
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._snapshot()
+        super().writeto(address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self._snapshot()
+        super().readfrom_into(address, buffer, start=start, end=end)
+
+
+@pytest.fixture
+def device():
+    bus = SnapshotI2C()
+    model = bus.add_device(SimulatedSeesaw(ADDRESS, settle_time=0.0))
+    seesaw = Seesaw(bus, ADDRESS, reset=False)
+    # Ohne Wartezeit lesen, der simulierte Seesaw antwortet sofort
+    for reg_base in (0x00, 0x01, 0x0E, 0x11):
+        seesaw.read_delays[reg_base] = 0.0
+    pixels = NeoPixel(seesaw, 6, 4, auto_write=False)
+    return bus, model, seesaw, pixels
+
+
+def poll(model, seesaw, pixels, frame, step):
+    """
+    Ein Durchlauf aller heißen Pfade, wie ihn die Handler ausführen.
+    """
+    model.turn(1)
+    model.set_pin(24, step & 1)
+    seesaw.encoder_position()
+    seesaw.encoder_delta()
+    seesaw.digital_read_bulk(BUTTON_MASK)
+    seesaw.get_GPIO_interrupt_flag()
+    seesaw.read8(0x00, 0x01)
+    seesaw.write8(0x0E, 0x05, 0)
+    seesaw.encoder_position_start()
+    seesaw.encoder_position_finish()
+    seesaw.digital_read_bulk_start()
+    seesaw.digital_read_bulk_finish(BUTTON_MASK)
+    seesaw.get_GPIO_interrupt_flag_start()
+    seesaw.get_GPIO_interrupt_flag_finish(BUTTON_MASK)
+    frame[step % len(frame)] ^= 0xFF
+    pixels._transmit(frame)
+
+
+def test_hot_paths_allocate_no_transfer_buffers(device):
+    bus, model, seesaw, pixels = device
+    frame = bytearray(4 * pixels.bpp)
+    tracemalloc.start()
+    try:
+        for step in range(3):  # Aufwärmen: Schattenkopie der NeoPixel, Caches
+            poll(model, seesaw, pixels, frame, step)
+        bus.start_watch()
+        for step in range(10):
+            poll(model, seesaw, pixels, frame, step)
+        bus.stop_watch()
+    finally:
+        tracemalloc.stop()
+    assert bus.driver_blocks == 0
+
+
+def test_hot_paths_hold_no_memory(device):
+    bus, model, seesaw, pixels = device
+    frame = bytearray(4 * pixels.bpp)
+    filters = [tracemalloc.Filter(True, pattern) for pattern in DRIVER_FILES]
+    tracemalloc.start()
+    try:
+        for step in range(3):
+            poll(model, seesaw, pixels, frame, step)
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        for step in range(ROUNDS):
+            poll(model, seesaw, pixels, frame, step)
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, 'lineno'))
+    assert growth <= 0
+
+
+def test_snapshot_detects_allocating_write(device):
+    """
+    Gegenprobe: Ein Schreibzugriff mit mehr Nutzdaten, als der vorallokierte Puffer fasst,
+    legt einen Puffer an und muss gezählt werden.
+    """
+    bus, model, seesaw, pixels = device
+    tracemalloc.start()
+    try:
+        bus.start_watch()
+        seesaw.write(0x0E, 0x04, bytes(40))
+        bus.stop_watch()
+    finally:
+        tracemalloc.stop()
+    assert bus.driver_blocks > 0
+
+
+def test_default_pin_masks_are_small_ints(device):
+    """
+    Die Standardmaske der Flag-Abfragen ist ein Small-Int und hält auch bei lauter
+    gesetzten Bits das Ergebnis unter 2**30.
+    """
+    bus, model, seesaw, pixels = device
+    for method in (seesaw.get_GPIO_interrupt_flag, seesaw.get_GPIO_interrupt_flag_finish):
+        mask = method.__defaults__[-1]
+        assert 0 < mask < SMALL_INT_LIMIT
+        assert _uint32_masked(b'\xff\xff\xff\xff', mask) == mask
+    model.gpio_int_flags = 0xFFFFFFFF
+    assert seesaw.get_GPIO_interrupt_flag() == SMALL_INT_LIMIT - 1
+
+
+@pytest.mark.parametrize('value', [0, 1, -1, 0x7FFFFF, -0x800000, SMALL_INT_LIMIT - 1,
+                                   -SMALL_INT_LIMIT, (1 << 31) - 1, -(1 << 31)])
+def test_int32_decodes_signed_values(value):
+    assert _int32((value & 0xFFFFFFFF).to_bytes(4, 'big')) == value